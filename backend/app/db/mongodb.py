@@ -1,18 +1,105 @@
-from pymongo import MongoClient
-from config.settings import MONGODB_URL, DATABASE_NAME, USERS_COLLECTION, ANNOUNCEMENTS_COLLECTION, FACULTY_COLLECTION, STUDENTS_COLLECTION, ATTENDANCE_COLLECTION, EXAMS_COLLECTION, PERMISSIONS_COLLECTION
+import threading
+from urllib.parse import urlsplit
+import pymongo
+from pymongo import DESCENDING
+from pymongo.errors import OperationFailure
+from app.utils.metrics import MongoCommandMetrics
+from config import settings
+from config.settings import USERS_COLLECTION, ANNOUNCEMENTS_COLLECTION, FACULTY_COLLECTION, STUDENTS_COLLECTION, ATTENDANCE_COLLECTION, EXAMS_COLLECTION, PERMISSIONS_COLLECTION, ALUMNI_COLLECTION, COUNTERS_COLLECTION, REVOCATIONS_COLLECTION, REFRESH_TOKENS_COLLECTION
 
-# Debug - print connection string
-print(f"Connecting to MongoDB with URL: {MONGODB_URL}")
+# The client is created on first use, normally by the app's lifespan, so
+# importing the app neither resolves the cluster address nor connects. The
+# connection settings are read at that point too, so benchmarks can
+# repoint them after import
+_client = None
+_client_lock = threading.Lock()
 
-# Create MongoDB client
-client = MongoClient(MONGODB_URL)
-db = client[DATABASE_NAME]
+def get_client():
+    """The shared MongoClient, created on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Only the host: the connection string carries credentials
+                print(f"Connecting to MongoDB at {urlsplit(settings.MONGODB_URL).hostname}")
+                # The listener feeds command latency into /metrics
+                _client = pymongo.MongoClient(settings.MONGODB_URL, event_listeners=[MongoCommandMetrics()])
+    return _client
+
+def get_database():
+    return get_client()[settings.DATABASE_NAME]
+
+def close_client():
+    """Close the client; the next use connects again"""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    for collection in _collections:
+        collection._collection = None
+    if client is not None:
+        client.close()
+
+# Every LazyCollection, so closing the client can drop their handles
+_collections = []
+
+class LazyCollection:
+    """Stands in for a collection and resolves it on first use
+
+    Handlers import these at module level as before; every attribute is
+    looked up on the real pymongo Collection.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._collection = None
+        _collections.append(self)
+
+    def __getattr__(self, attribute):
+        collection = self._collection
+        if collection is None:
+            collection = self._collection = get_database()[self._name]
+        return getattr(collection, attribute)
+
+    def __repr__(self):
+        return f"LazyCollection({self._name!r})"
 
 # Collections
-users_collection = db[USERS_COLLECTION]
-announcements_collection = db[ANNOUNCEMENTS_COLLECTION]
-faculty_collection = db[FACULTY_COLLECTION]
-students_collection = db[STUDENTS_COLLECTION]
-attendance_collection = db[ATTENDANCE_COLLECTION]
-exams_collection = db[EXAMS_COLLECTION]
-permissions_collection = db[PERMISSIONS_COLLECTION] 
\ No newline at end of file
+users_collection = LazyCollection(USERS_COLLECTION)
+announcements_collection = LazyCollection(ANNOUNCEMENTS_COLLECTION)
+faculty_collection = LazyCollection(FACULTY_COLLECTION)
+students_collection = LazyCollection(STUDENTS_COLLECTION)
+attendance_collection = LazyCollection(ATTENDANCE_COLLECTION)
+exams_collection = LazyCollection(EXAMS_COLLECTION)
+permissions_collection = LazyCollection(PERMISSIONS_COLLECTION)
+alumni_collection = LazyCollection(ALUMNI_COLLECTION)
+counters_collection = LazyCollection(COUNTERS_COLLECTION)
+revocations_collection = LazyCollection(REVOCATIONS_COLLECTION)
+refresh_tokens_collection = LazyCollection(REFRESH_TOKENS_COLLECTION)
+
+def __getattr__(name):
+    # ``client`` and ``db`` stay importable, and connect when first used
+    if name == "client":
+        return get_client()
+    if name == "db":
+        return get_database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Indexes required by the hot query paths; safe to call on every startup
+def ensure_indexes():
+    # Announcements saved before pinning existed sort with unpinned ones
+    announcements_collection.update_many({"pinned": {"$exists": False}}, {"$set": {"pinned": False}})
+    announcements_collection.create_index(
+        [("pinned", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="feed_order"
+    )
+    # Revocations are only needed until the tokens they cover have expired
+    revocations_collection.create_index("expires_at", expireAfterSeconds=0, name="revocation_expiry")
+    refresh_tokens_collection.create_index("expires_at", expireAfterSeconds=0, name="refresh_token_expiry")
+    refresh_tokens_collection.create_index("family", name="refresh_token_family")
+    # Uniqueness was only checked in the handlers before; existing duplicates
+    # must be cleaned up before these indexes can be built
+    for field in ("username", "email"):
+        try:
+            users_collection.create_index(field, unique=True, name=f"unique_{field}")
+        except OperationFailure as e:
+            print(f"Could not create unique index on users.{field}: {str(e)}")
@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from secrets import compare_digest
+from fastapi import FastAPI, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.auth import routes as auth_routes
 from app.routes.users import routes as users_routes
@@ -8,10 +11,42 @@ from app.routes.dashboards import routes as dashboard_routes
 from app.routes.students import routes as students_routes
 from app.routes.attendance import routes as attendance_routes
 from app.routes.exams import routes as exams_routes
-from config.settings import CORS_ORIGINS
+from app.routes.ops import routes as ops_routes
+from app.db.mongodb import get_client, close_client, ensure_indexes
+from app.schemas.adapters import warm_adapters
+from app.services.auth import bulk_password_pool
+from app.services.roster import roster_replica
+from app.services.profiling import ProfilingMiddleware
+from app.utils.metrics import MetricsMiddleware, render_metrics
+from app.utils.memory import MemoryDiagnosticsMiddleware
+from app.utils.fast_json import ORJSON_AVAILABLE
+from config.settings import (
+    CORS_ORIGINS, ROSTER_REPLICA_ENABLED, METRICS_ENABLED, METRICS_TOKEN, PROFILING_ENABLED,
+    MEMORY_DIAGNOSTICS_ENABLED, FAST_JSON_RESPONSES
+)
+
+# Connect, build indexes and start background workers when the server starts,
+# so importing the app has no side effects
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_client()
+    try:
+        ensure_indexes()
+    except Exception as e:
+        # The API can still serve requests without the indexes, only slower
+        print(f"Error creating indexes: {str(e)}")
+    warm_adapters()
+    if FAST_JSON_RESPONSES and not ORJSON_AVAILABLE:
+        print("orjson is not installed; fast JSON responses fall back to pydantic serialization")
+    if ROSTER_REPLICA_ENABLED:
+        roster_replica.start()
+    yield
+    bulk_password_pool.shutdown()
+    roster_replica.stop()
+    close_client()
 
 # Initialize FastAPI app
-app = FastAPI(title="GJC Vemulawada API")
+app = FastAPI(title="GJC Vemulawada API", lifespan=lifespan)
 
 # Configure CORS to allow requests from frontend
 app.add_middleware(
@@ -20,8 +55,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Request metrics, exposed at /metrics
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Peak allocation per route while memory diagnostics are switched on
+if MEMORY_DIAGNOSTICS_ENABLED:
+    app.add_middleware(MemoryDiagnosticsMiddleware)
+
+# Opt-in per-request profiling for principals
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(auth_routes.router, tags=["Authentication"])
 app.include_router(users_routes.router, prefix="/users", tags=["Users"])
@@ -38,7 +86,21 @@ app.include_router(students_routes.router, prefix="/students", tags=["Students"]
 app.include_router(attendance_routes.router, prefix="/attendance", tags=["Attendance"])
 # Exam management routes
 app.include_router(exams_routes.router, prefix="/exams", tags=["Exams"])
+# Operational diagnostics
+app.include_router(ops_routes.router, prefix="/ops", tags=["Operations"])
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to GJC Vemulawada API"} 
\ No newline at end of file
+    return {"message": "Welcome to GJC Vemulawada API"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str = Header(None)):
+    # Never public: without a token the endpoint does not exist
+    if not METRICS_ENABLED or not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token"
+        )
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -1,27 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
-from app.schemas.announcement import AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse
+from pymongo import ReturnDocument
+import base64
+import json
+from app.schemas.announcement import (
+    AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse, AnnouncementSummary, AnnouncementFeed
+)
 from app.services.auth import get_current_active_principal
 from app.db.mongodb import announcements_collection
+from app.utils.http_cache import cached_json_response, invalidate_public_cache
 
 router = APIRouter()
 
-@router.get("", response_model=List[AnnouncementResponse])
-async def get_all_announcements():
-    announcements = []
-    for announcement in announcements_collection.find().sort("created_at", -1):
-        announcements.append({
+# Newest first with pinned items on top; backed by the (pinned, created_at, _id) index
+FEED_SORT = [("pinned", -1), ("created_at", -1), ("_id", -1)]
+
+def format_announcement(announcement):
+    return {
+        "id": str(announcement["_id"]),
+        "title": announcement["title"],
+        "content": announcement["content"],
+        "link": announcement.get("link"),
+        "link_text": announcement.get("link_text"),
+        "pinned": announcement.get("pinned", False),
+        "publish_at": announcement.get("publish_at"),
+        "expires_at": announcement.get("expires_at"),
+        "created_at": announcement["created_at"],
+        "updated_at": announcement.get("updated_at")
+    }
+
+def visible_query(now=None):
+    """Announcements inside their publish/expiry window"""
+    now = now or datetime.utcnow()
+    return {"$and": [
+        {"$or": [{"publish_at": None}, {"publish_at": {"$lte": now}}]},
+        {"$or": [{"expires_at": None}, {"expires_at": {"$gt": now}}]}
+    ]}
+
+# Opaque feed cursors encode the sort key of the last item returned
+def encode_cursor(announcement):
+    position = {
+        "pinned": announcement.get("pinned", False),
+        "created_at": announcement["created_at"].isoformat(),
+        "id": str(announcement["_id"])
+    }
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return bool(position["pinned"]), datetime.fromisoformat(position["created_at"]), ObjectId(position["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def after_cursor_query(pinned, created_at, last_id):
+    """Items that sort strictly after (pinned, created_at, _id) in FEED_SORT order"""
+    same_pin = {"pinned": True} if pinned else {"pinned": {"$ne": True}}
+    conditions = [
+        {**same_pin, "created_at": {"$lt": created_at}},
+        {**same_pin, "created_at": created_at, "_id": {"$lt": last_id}}
+    ]
+    if pinned:
+        conditions.append({"pinned": {"$ne": True}})
+    return {"$or": conditions}
+
+def load_announcements():
+    return [
+        format_announcement(announcement)
+        for announcement in announcements_collection.find(visible_query()).sort(FEED_SORT)
+    ]
+
+def load_feed(cursor, limit):
+    query = visible_query()
+    if cursor:
+        query = {"$and": [query, after_cursor_query(*decode_cursor(cursor))]}
+    
+    # Read one extra item to know whether another page exists
+    page = list(announcements_collection.find(query).sort(FEED_SORT).limit(limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    
+    return {
+        "items": [format_announcement(announcement) for announcement in page],
+        "next_cursor": encode_cursor(page[-1]) if has_more else None
+    }
+
+def load_latest(limit):
+    projection = {"title": 1, "content": 1, "link": 1, "link_text": 1, "pinned": 1, "created_at": 1}
+    return [
+        {
             "id": str(announcement["_id"]),
             "title": announcement["title"],
             "content": announcement["content"],
             "link": announcement.get("link"),
             "link_text": announcement.get("link_text"),
-            "created_at": announcement["created_at"],
-            "updated_at": announcement.get("updated_at")
-        })
-    return announcements
+            "pinned": announcement.get("pinned", False),
+            "created_at": announcement["created_at"]
+        }
+        for announcement in announcements_collection.find(visible_query(), projection).sort(FEED_SORT).limit(limit)
+    ]
+
+# Public endpoints, served from the in-process response cache. Publish and
+# expiry windows take effect within the cache TTL.
+@router.get("", response_model=List[AnnouncementResponse])
+async def get_all_announcements(if_none_match: Optional[str] = Header(None)):
+    return cached_json_response(("announcements", "all"), load_announcements, if_none_match)
+
+@router.get("/feed", response_model=AnnouncementFeed)
+async def get_announcement_feed(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Cursor-paginated feed of visible announcements, pinned first"""
+    # Only the first page is cached; every client-supplied cursor would be its own entry
+    if cursor:
+        return load_feed(cursor, limit)
+    return cached_json_response(
+        ("announcements", "feed", limit),
+        lambda: load_feed(None, limit),
+        if_none_match
+    )
+
+@router.get("/latest", response_model=List[AnnouncementSummary])
+async def get_latest_announcements(
+    limit: int = Query(5, ge=1, le=20),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Compact list of the latest visible announcements for the landing page"""
+    return cached_json_response(("announcements", "latest", limit), lambda: load_latest(limit), if_none_match)
+
+# Every announcement, including scheduled and expired ones (Principal only)
+@router.get("/manage", response_model=List[AnnouncementResponse])
+async def get_managed_announcements(current_user = Depends(get_current_active_principal)):
+    return [format_announcement(announcement) for announcement in announcements_collection.find().sort(FEED_SORT)]
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=AnnouncementResponse)
 async def create_announcement(announcement: AnnouncementCreate, current_user = Depends(get_current_active_principal)):
@@ -30,6 +147,9 @@ async def create_announcement(announcement: AnnouncementCreate, current_user = D
         "content": announcement.content,
         "link": announcement.link,
         "link_text": announcement.link_text,
+        "pinned": announcement.pinned,
+        "publish_at": announcement.publish_at,
+        "expires_at": announcement.expires_at,
         "created_at": datetime.utcnow()
     }
     
@@ -37,18 +157,11 @@ async def create_announcement(announcement: AnnouncementCreate, current_user = D
     announcement_data = {k: v for k, v in announcement_data.items() if v is not None}
     
     result = announcements_collection.insert_one(announcement_data)
+    invalidate_public_cache("announcements")
     
     created_announcement = announcements_collection.find_one({"_id": result.inserted_id})
     
-    return {
-        "id": str(created_announcement["_id"]),
-        "title": created_announcement["title"],
-        "content": created_announcement["content"],
-        "link": created_announcement.get("link"),
-        "link_text": created_announcement.get("link_text"),
-        "created_at": created_announcement["created_at"],
-        "updated_at": created_announcement.get("updated_at")
-    }
+    return format_announcement(created_announcement)
 
 @router.put("/{announcement_id}", response_model=AnnouncementResponse)
 async def update_announcement(announcement_id: str, announcement: AnnouncementUpdate, current_user = Depends(get_current_active_principal)):
@@ -60,13 +173,6 @@ async def update_announcement(announcement_id: str, announcement: AnnouncementUp
             detail="Invalid announcement ID format"
         )
     
-    existing_announcement = announcements_collection.find_one({"_id": announcement_obj_id})
-    if not existing_announcement:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Announcement not found"
-        )
-    
     update_data = {
         "updated_at": datetime.utcnow()
     }
@@ -80,23 +186,33 @@ async def update_announcement(announcement_id: str, announcement: AnnouncementUp
         update_data["link"] = announcement.link
     if announcement.link_text is not None:
         update_data["link_text"] = announcement.link_text
+    if announcement.pinned is not None:
+        update_data["pinned"] = announcement.pinned
+    # Schedule fields sent as null are cleared: publish now, or never expire
+    unset_data = {}
+    for field in ("publish_at", "expires_at"):
+        value = getattr(announcement, field)
+        if value is not None:
+            update_data[field] = value
+        elif field in announcement.model_fields_set:
+            unset_data[field] = ""
     
-    announcements_collection.update_one(
+    update = {"$set": update_data}
+    if unset_data:
+        update["$unset"] = unset_data
+    updated_announcement = announcements_collection.find_one_and_update(
         {"_id": announcement_obj_id},
-        {"$set": update_data}
+        update,
+        return_document=ReturnDocument.AFTER
     )
+    if not updated_announcement:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Announcement not found"
+        )
+    invalidate_public_cache("announcements")
     
-    updated_announcement = announcements_collection.find_one({"_id": announcement_obj_id})
-    
-    return {
-        "id": str(updated_announcement["_id"]),
-        "title": updated_announcement["title"],
-        "content": updated_announcement["content"],
-        "link": updated_announcement.get("link"),
-        "link_text": updated_announcement.get("link_text"),
-        "created_at": updated_announcement["created_at"],
-        "updated_at": updated_announcement.get("updated_at")
-    }
+    return format_announcement(updated_announcement)
 
 @router.delete("/{announcement_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_announcement(announcement_id: str, current_user = Depends(get_current_active_principal)):
@@ -108,12 +224,14 @@ async def delete_announcement(announcement_id: str, current_user = Depends(get_c
             detail="Invalid announcement ID format"
         )
     
-    existing_announcement = announcements_collection.find_one({"_id": announcement_obj_id})
-    if not existing_announcement:
+    deleted_announcement = announcements_collection.find_one_and_delete(
+        {"_id": announcement_obj_id},
+        projection={"_id": 1}
+    )
+    if not deleted_announcement:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Announcement not found"
         )
-    
-    announcements_collection.delete_one({"_id": announcement_obj_id})
-    return None 
\ No newline at end of file
+    invalidate_public_cache("announcements")
+    return None
@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 from typing import List, Optional
 from datetime import datetime, date
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from app.schemas.attendance import (
     AttendanceCreate, AttendanceUpdate, AttendanceResponse,
-    WorkingDaysUpdate, MonthlyAttendanceSummary, ClassAttendanceSummary
+    WorkingDaysUpdate, MonthlyAttendanceSummary, ClassAttendanceSummary,
+    BulkAttendanceUpdate, BulkAttendanceResponse
 )
 from app.services.auth import get_current_active_staff, get_current_active_principal, get_current_user
-from app.db.mongodb import attendance_collection, students_collection
+from app.db.mongodb import attendance_collection
+from app.services.student_directory import get_student_entry, get_student_entries
+from app.services.roster import iter_roster
 from app.models.attendance import Month
+from app.utils.streaming import (
+    StreamFormat, batched, wants_ndjson, json_object_body, ndjson_body, streaming_json_response
+)
+from app.utils.etag import (
+    bump_collection_version, collection_etag, versions_etag, get_collection_versions, document_etag,
+    if_match_query, etag_matches, not_modified, set_etag
+)
+from config.settings import ATTENDANCE_COLLECTION, STUDENTS_COLLECTION, STREAM_BATCH_SIZE, BULK_ATTENDANCE_MAX_ROWS
+
+# Fields the report rows read from students and from attendance records
+ROSTER_ROW_PROJECTION = {"name": 1, "admission_number": 1, "year": 1, "group": 1}
+ATTENDANCE_ROW_PROJECTION = {"student_id": 1, "days_present": 1, "attendance_percentage": 1}
 
 # Helper function to convert date objects to strings
 def convert_dates_to_strings(data):
@@ -102,9 +119,11 @@ async def set_working_days(
             
             attendance_collection.update_one(
                 {"_id": record["_id"]},
-                {"$set": update_data}
+                {"$set": update_data, "$inc": {"version": 1}}
             )
         
+        bump_collection_version(ATTENDANCE_COLLECTION)
+        
         return {
             "message": f"Working days updated for {data.month} {data.academic_year}",
             "working_days": data.working_days
@@ -120,10 +139,17 @@ async def set_working_days(
 async def get_working_days(
     academic_year: str,
     month: Month,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(get_current_active_staff),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get working days for a specific month - Staff and Principal"""
     try:
+        etag = collection_etag(ATTENDANCE_COLLECTION, academic_year=academic_year, month=month.value)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        
         # Find global working days record for this month
         record = attendance_collection.find_one({
             "academic_year": academic_year,
@@ -159,13 +185,14 @@ async def update_student_attendance(
     academic_year: str,
     month: Month,
     attendance: AttendanceUpdate,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(get_current_active_staff),
+    if_match: Optional[str] = Header(None)
 ):
     """Update attendance for a specific student - Staff and Principal"""
     try:
         # Check if student exists
-        student = students_collection.find_one({"_id": ObjectId(student_id)})
-        if not student:
+        if not get_student_entry(student_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Student not found"
@@ -197,76 +224,44 @@ async def update_student_attendance(
         if isinstance(student_id, ObjectId):
             student_id = str(student_id)
             
-        # Check if attendance record already exists
-        existing_record = attendance_collection.find_one({
-            "student_id": student_id,
-            "academic_year": academic_year,
-            "month": month
-        })
-        
         current_date = datetime.now().date()
         
         # Calculate attendance percentage
         attendance_percentage = calculate_attendance_percentage(attendance.days_present, working_days)
         
-        if existing_record:
-            # Prepare update data
-            update_data = {
-                "days_present": attendance.days_present,
-                "attendance_percentage": attendance_percentage,
-                "last_updated": current_date,
-                "updated_by": current_user["username"]
-            }
-            # Convert dates to strings for MongoDB
-            update_data = convert_dates_to_strings(update_data)
-            
-            # Update existing record
-            update_result = attendance_collection.update_one(
-                {"_id": existing_record["_id"]},
-                {"$set": update_data}
+        update_data = {
+            "days_present": attendance.days_present,
+            "attendance_percentage": attendance_percentage,
+            "last_updated": current_date,
+            "updated_by": current_user["username"]
+        }
+        # Convert dates to strings for MongoDB
+        update_data = convert_dates_to_strings(update_data)
+        
+        # Update the month's record, creating it when missing. With If-Match the
+        # record must exist at the client's version instead.
+        record = attendance_collection.find_one_and_update(
+            if_match_query({"student_id": student_id, "academic_year": academic_year, "month": month}, if_match),
+            {
+                "$set": update_data,
+                "$setOnInsert": {"working_days": working_days},
+                "$inc": {"version": 1}
+            },
+            upsert=not if_match,
+            return_document=ReturnDocument.AFTER
+        )
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Attendance record was modified by another request"
             )
-            
-            if update_result.modified_count == 0 and update_result.matched_count == 0:
-                raise Exception("Failed to update attendance record")
-            
-            # Get updated record
-            updated_record = attendance_collection.find_one({"_id": existing_record["_id"]})
-            if not updated_record:
-                raise Exception("Updated record not found")
-                
-            updated_record["id"] = str(updated_record.pop("_id"))
-            # Convert date strings back to date objects
-            convert_strings_to_dates(updated_record)
-            return updated_record
-        else:
-            # Prepare new attendance record
-            new_record = {
-                "student_id": student_id,
-                "academic_year": academic_year,
-                "month": month,
-                "working_days": working_days,
-                "days_present": attendance.days_present,
-                "attendance_percentage": attendance_percentage,
-                "last_updated": current_date,
-                "updated_by": current_user["username"]
-            }
-            # Convert dates to strings for MongoDB
-            new_record = convert_dates_to_strings(new_record)
-            
-            # Insert new record
-            insert_result = attendance_collection.insert_one(new_record)
-            if not insert_result.inserted_id:
-                raise Exception("Failed to create attendance record")
-                
-            # Get created record
-            created_record = attendance_collection.find_one({"_id": insert_result.inserted_id})
-            if not created_record:
-                raise Exception("Created record not found")
-                
-            created_record["id"] = str(created_record.pop("_id"))
-            # Convert date strings back to date objects
-            convert_strings_to_dates(created_record)
-            return created_record
+        bump_collection_version(ATTENDANCE_COLLECTION)
+        
+        set_etag(response, document_etag(record))
+        record["id"] = str(record.pop("_id"))
+        # Convert date strings back to date objects
+        convert_strings_to_dates(record)
+        return record
     except HTTPException:
         # Re-raise HTTP exceptions as is
         raise
@@ -279,17 +274,113 @@ async def update_student_attendance(
             detail=f"Error updating attendance: {error_msg}"
         )
 
+# Update a month of attendance for many students in one request
+@router.put("/bulk/{academic_year}/{month}", response_model=BulkAttendanceResponse)
+async def update_attendance_bulk(
+    academic_year: str,
+    month: Month,
+    bulk: BulkAttendanceUpdate,
+    current_user = Depends(get_current_active_staff)
+):
+    """Update attendance for many students in one request, reporting the outcome of every row - Staff and Principal"""
+    if len(bulk.records) > BULK_ATTENDANCE_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_ATTENDANCE_MAX_ROWS} attendance records can be updated per request"
+        )
+    
+    results = [
+        {"row": row, "student_id": record.student_id, "status": "updated"}
+        for row, record in enumerate(bulk.records)
+    ]
+    
+    # Get current working days for this month
+    working_days_record = attendance_collection.find_one({
+        "academic_year": academic_year,
+        "month": month,
+        "student_id": {"$exists": False}  # This is a global working days record
+    })
+    working_days = working_days_record.get("working_days", 0) if working_days_record else 0
+    
+    # Check every student exists with one directory lookup
+    students = get_student_entries(
+        [record.student_id for record in bulk.records if ObjectId.is_valid(record.student_id)]
+    )
+    
+    update_data = convert_dates_to_strings({
+        "last_updated": datetime.now().date(),
+        "updated_by": current_user["username"]
+    })
+    operations = []
+    pending = []
+    seen = set()
+    for row, record in enumerate(bulk.records):
+        if record.student_id not in students:
+            results[row].update(status="not_found", detail="Student not found")
+        elif record.student_id in seen:
+            results[row].update(status="invalid", detail="Student appears more than once in the request")
+        elif record.days_present < 0:
+            results[row].update(status="invalid", detail="Days present cannot be negative")
+        elif working_days > 0 and record.days_present > working_days:
+            results[row].update(
+                status="invalid",
+                detail=f"Days present ({record.days_present}) cannot exceed working days ({working_days})"
+            )
+        else:
+            seen.add(record.student_id)
+            # Same update as the single-student endpoint, creating the month's record when missing
+            operations.append(UpdateOne(
+                {"student_id": record.student_id, "academic_year": academic_year, "month": month},
+                {
+                    "$set": {
+                        **update_data,
+                        "days_present": record.days_present,
+                        "attendance_percentage": calculate_attendance_percentage(record.days_present, working_days)
+                    },
+                    "$setOnInsert": {"working_days": working_days},
+                    "$inc": {"version": 1}
+                },
+                upsert=True
+            ))
+            pending.append(row)
+    
+    # Unordered, so one failing row does not stop the rest
+    if operations:
+        try:
+            attendance_collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                results[pending[error["index"]]].update(status="error", detail=error.get("errmsg", "Update failed"))
+        bump_collection_version(ATTENDANCE_COLLECTION)
+    
+    updated = sum(1 for result in results if result["status"] == "updated")
+    return {
+        "updated": updated,
+        "failed": len(results) - updated,
+        "results": results
+    }
+
 # Get attendance for a specific student
 @router.get("/student/{student_id}/{academic_year}/{month}", response_model=MonthlyAttendanceSummary)
 async def get_student_attendance(
     student_id: str,
     academic_year: str,
     month: Month,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(get_current_active_staff),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get attendance for a specific student - Staff and Principal"""
+    etag = collection_etag(
+        ATTENDANCE_COLLECTION, STUDENTS_COLLECTION,
+        student_id=student_id, academic_year=academic_year, month=month.value
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     # Check if student exists
-    student = students_collection.find_one({"_id": ObjectId(student_id)})
+    student = get_student_entry(student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -316,8 +407,8 @@ async def get_student_attendance(
         
         return {
             "student_id": student_id,
-            "student_name": student.get("name", ""),
-            "admission_number": student.get("admission_number", ""),
+            "student_name": student.name,
+            "admission_number": student.admission_number,
             "month": month,
             "academic_year": academic_year,
             "working_days": working_days,
@@ -335,8 +426,8 @@ async def get_student_attendance(
     
     return {
         "student_id": student_id,
-        "student_name": student.get("name", ""),
-        "admission_number": student.get("admission_number", ""),
+        "student_name": student.name,
+        "admission_number": student.admission_number,
         "month": month,
         "academic_year": academic_year,
         "working_days": working_days,
@@ -344,33 +435,78 @@ async def get_student_attendance(
         "attendance_percentage": round(attendance_percentage, 2)
     }
 
+# Attendance of a batch of students for one month, keyed by student id
+def _attendance_by_student(students, academic_year, month):
+    student_ids = [str(student["_id"]) for student in students]
+    cursor = attendance_collection.find(
+        {"student_id": {"$in": student_ids}, "academic_year": academic_year, "month": month},
+        ATTENDANCE_ROW_PROJECTION
+    ).batch_size(STREAM_BATCH_SIZE)
+    return {record["student_id"]: record for record in cursor}
+
+# Rows of the students below the threshold, one attendance query per batch of students
+def _low_attendance_rows(students, academic_year, month, working_days, percentage_threshold):
+    for batch in batched(students):
+        attendance_by_student = _attendance_by_student(batch, academic_year, month)
+        for student in batch:
+            student_id = str(student["_id"])
+            attendance = attendance_by_student.get(student_id)
+            
+            # If no attendance record, add student with 0% attendance
+            if not attendance:
+                attendance_percentage = 0.0
+                days_present = 0
+            else:
+                attendance_percentage = attendance.get("attendance_percentage", 0.0)
+                days_present = attendance.get("days_present", 0)
+                
+            # Check if attendance is below the threshold
+            if attendance_percentage < percentage_threshold:
+                yield {
+                    "student_id": student_id,
+                    "student_name": student.get("name", ""),
+                    "admission_number": student.get("admission_number", ""),
+                    "year": student.get("year", ""),
+                    "group": student.get("group", ""),
+                    "month": month,
+                    "academic_year": academic_year,
+                    "working_days": working_days,
+                    "days_present": days_present,
+                    "attendance_percentage": attendance_percentage
+                }
+
 # Get students with attendance below threshold
 @router.get("/low-attendance/{academic_year}/{month}")
 async def get_students_with_low_attendance(
     academic_year: str,
     month: Month,
+    response: Response,
     percentage_threshold: float = Query(..., description="Maximum attendance percentage threshold"),
     year: Optional[int] = None,
     group: Optional[str] = None,
     medium: Optional[str] = None,
-    current_user = Depends(get_current_active_staff)
+    format: Optional[StreamFormat] = Query(None, description="json (default) or ndjson"),
+    current_user = Depends(get_current_active_staff),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None)
 ):
-    """Get students with attendance percentage below the specified threshold"""
+    """Get students with attendance percentage below the specified threshold
+
+    Rows are streamed as they are found, as the "students" array of the
+    JSON object or as NDJSON lines.
+    """
     try:
-        # Build the query for students collection
-        students_query = {}
-        if year is not None:
-            students_query["year"] = year
-        if group is not None:
-            students_query["group"] = group
-        if medium is not None:
-            students_query["medium"] = medium
-            
-        # Get the students that match the basic filters
-        students = list(students_collection.find(students_query))
-        
-        if not students:
-            return {"students": []}
+        # The roster is streamed at the students counter the ETag is built from
+        versions = get_collection_versions(ATTENDANCE_COLLECTION, STUDENTS_COLLECTION)
+        etag = versions_etag(
+            (ATTENDANCE_COLLECTION, STUDENTS_COLLECTION), versions,
+            academic_year=academic_year, month=month.value, percentage_threshold=percentage_threshold,
+            year=year, group=group, medium=medium
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        ndjson = wants_ndjson(format, accept)
             
         # Get working days for this month
         working_days_record = attendance_collection.find_one({
@@ -381,57 +517,23 @@ async def get_students_with_low_attendance(
         
         if not working_days_record or working_days_record.get("working_days", 0) <= 0:
             # If no working days are set or it's zero, return empty list
+            if ndjson:
+                return streaming_json_response(ndjson_body(()), response, ndjson=True)
             return {"students": []}
             
         working_days = working_days_record.get("working_days", 0)
         
-        # Get attendance records for all students
-        student_ids = [str(student["_id"]) for student in students]
-        attendance_records = list(attendance_collection.find({
-            "student_id": {"$in": student_ids},
-            "academic_year": academic_year,
-            "month": month
-        }))
-        
-        # Create a dictionary to quickly lookup attendance by student_id
-        attendance_by_student = {record["student_id"]: record for record in attendance_records}
+        # Stream the students that match the basic filters, a batch at a time
+        students = iter_roster(year, group, medium, ROSTER_ROW_PROJECTION, version=versions[1])
+        rows = _low_attendance_rows(students, academic_year, month, working_days, percentage_threshold)
         
-        # Filter students with attendance below threshold
-        low_attendance_students = []
-        
-        for student in students:
-            student_id = str(student["_id"])
-            attendance = attendance_by_student.get(student_id)
-            
-            # If no attendance record, add student with 0% attendance
-            if not attendance:
-                attendance_percentage = 0.0
-                days_present = 0
-            else:
-                attendance_percentage = attendance.get("attendance_percentage", 0.0)
-                days_present = attendance.get("days_present", 0)
-                
-            # Check if attendance is below the threshold
-            if attendance_percentage < percentage_threshold:
-                low_attendance_students.append({
-                    "student_id": student_id,
-                    "student_name": student.get("name", ""),
-                    "admission_number": student.get("admission_number", ""),
-                    "year": student.get("year", ""),
-                    "group": student.get("group", ""),
-                    "month": month,
-                    "academic_year": academic_year,
-                    "working_days": working_days,
-                    "days_present": days_present,
-                    "attendance_percentage": attendance_percentage
-                })
-                
-        return {
+        if ndjson:
+            return streaming_json_response(ndjson_body(rows), response, ndjson=True)
+        return streaming_json_response(json_object_body({
             "academic_year": academic_year,
             "month": month,
-            "percentage_threshold": percentage_threshold,
-            "students": low_attendance_students
-        }
+            "percentage_threshold": percentage_threshold
+        }, "students", rows), response)
                 
     except Exception as e:
         raise HTTPException(
@@ -439,6 +541,27 @@ async def get_students_with_low_attendance(
             detail=f"Error finding students with low attendance: {str(e)}"
         )
 
+# Attendance rows of a class, one attendance query per batch of students
+def _class_attendance_rows(students, academic_year, month, working_days):
+    for batch in batched(students):
+        attendance_by_student = _attendance_by_student(batch, academic_year, month)
+        for student in batch:
+            student_id = str(student["_id"])
+            attendance_record = attendance_by_student.get(student_id)
+            days_present = attendance_record.get("days_present", 0) if attendance_record else 0
+            attendance_percentage = 0.0 if working_days == 0 else (days_present / working_days) * 100
+            
+            yield {
+                "student_id": student_id,
+                "student_name": student.get("name", ""),
+                "admission_number": student.get("admission_number", ""),
+                "month": month,
+                "academic_year": academic_year,
+                "working_days": working_days,
+                "days_present": days_present,
+                "attendance_percentage": round(attendance_percentage, 2)
+            }
+
 # Get attendance for all students in a class
 @router.get("/class/{year}/{group}/{academic_year}/{month}", response_model=ClassAttendanceSummary)
 async def get_class_attendance(
@@ -446,19 +569,29 @@ async def get_class_attendance(
     group: str,
     academic_year: str,
     month: Month,
+    response: Response,
     medium: Optional[str] = Query(None, description="Filter by medium (english/telugu)"),
-    current_user = Depends(get_current_active_staff)
+    format: Optional[StreamFormat] = Query(None, description="json (default) or ndjson"),
+    current_user = Depends(get_current_active_staff),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None)
 ):
-    """Get attendance for all students in a class - Staff and Principal"""
+    """Get attendance for all students in a class - Staff and Principal
+
+    Student rows are streamed, as in the low attendance report.
+    """
     try:
-        # Get all students in this class
-        query = {"year": year, "group": group}
+        # The roster is streamed at the students counter the ETag is built from
+        versions = get_collection_versions(ATTENDANCE_COLLECTION, STUDENTS_COLLECTION)
+        etag = versions_etag(
+            (ATTENDANCE_COLLECTION, STUDENTS_COLLECTION), versions,
+            year=year, group=group, academic_year=academic_year, month=month.value, medium=medium
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         
-        # Add medium filter if provided
-        if medium:
-            query["medium"] = medium
-            
-        students = list(students_collection.find(query))
+        ndjson = wants_ndjson(format, accept)
         
         # Get global working days for this month
         working_days_record = attendance_collection.find_one({
@@ -469,46 +602,19 @@ async def get_class_attendance(
         
         working_days = working_days_record.get("working_days", 0) if working_days_record else 0
         
-        # Get attendance for each student
-        student_attendance = []
-        for student in students:
-            student_id = str(student["_id"])
-            
-            # Get attendance record
-            attendance_record = attendance_collection.find_one({
-                "student_id": student_id,
-                "academic_year": academic_year,
-                "month": month
-            })
-            
-            if attendance_record:
-                # Convert date strings back to date objects
-                convert_strings_to_dates(attendance_record)
-                days_present = attendance_record.get("days_present", 0)
-            else:
-                days_present = 0
-                
-            attendance_percentage = 0.0 if working_days == 0 else (days_present / working_days) * 100
-            
-            student_attendance.append({
-                "student_id": student_id,
-                "student_name": student.get("name", ""),
-                "admission_number": student.get("admission_number", ""),
-                "month": month,
-                "academic_year": academic_year,
-                "working_days": working_days,
-                "days_present": days_present,
-                "attendance_percentage": round(attendance_percentage, 2)
-            })
+        # Stream the students in this class, a batch at a time
+        students = iter_roster(year, group, medium or None, ROSTER_ROW_PROJECTION, version=versions[1])
+        rows = _class_attendance_rows(students, academic_year, month, working_days)
         
-        return {
+        if ndjson:
+            return streaming_json_response(ndjson_body(rows), response, ndjson=True)
+        return streaming_json_response(json_object_body({
             "year": year,
             "group": group,
             "month": month,
             "academic_year": academic_year,
-            "working_days": working_days,
-            "students": student_attendance
-        }
+            "working_days": working_days
+        }, "students", rows), response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
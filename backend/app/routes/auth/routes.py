@@ -2,13 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status, Header
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime
 from typing import Optional
-from app.schemas.user import UserCreate, Token, UserResponse
+from app.schemas.user import UserCreate, Token, UserResponse, RefreshTokenRequest
 from app.models.user import UserRole
-from app.services.auth import authenticate_user, get_password_hash, create_access_token, get_current_user
+from app.services.auth import authenticate_user, get_password_hash, get_current_user, decode_access_token, revocation_list
+from app.services.sessions import start_session, rotate_session, end_session
 from app.db.mongodb import users_collection
-from config.settings import ACCESS_TOKEN_EXPIRE_DELTA
-from jose import jwt, JWTError
-from config.settings import SECRET_KEY, ALGORITHM
 
 router = APIRouter()
 
@@ -59,21 +57,20 @@ async def login_for_access_token(
     if authorization and authorization.startswith("Bearer "):
         token = authorization.replace("Bearer ", "")
         try:
-            # Check if token is valid
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            username = payload.get("sub")
-            if username:
-                # If token is valid, user is already logged in
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Already logged in. Please log out first."
-                )
-        except JWTError:
+            # Check if token is valid and has not been revoked
+            payload = decode_access_token(token)
+        except HTTPException:
             # If token is invalid, continue with login process
-            pass
+            payload = None
+        if payload:
+            # If token is valid, user is already logged in
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already logged in. Please log out first."
+            )
     
     # Continue with the normal login process
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,12 +78,28 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(
-        data={"sub": user["username"]}, 
-        expires_delta=ACCESS_TOKEN_EXPIRE_DELTA
-    )
+    return start_session(user)
+
+# Renew an access token without a password check; the refresh token is rotated
+@router.post("/token/refresh", response_model=Token)
+async def refresh_access_token(request: RefreshTokenRequest):
+    return rotate_session(request.refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    request: RefreshTokenRequest,
+    authorization: Optional[str] = Header(None)
+):
+    end_session(request.refresh_token)
     
-    return {"access_token": access_token, "token_type": "bearer", "role": user["role"]}
+    # Also retire the access token the client is holding, if it is still valid
+    if authorization and authorization.startswith("Bearer "):
+        try:
+            payload = decode_access_token(authorization.replace("Bearer ", ""))
+            revocation_list.revoke_token(payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+        except (HTTPException, KeyError):
+            pass
+    return None
 
 @router.get("/users/me", response_model=UserResponse)
 async def read_users_me(current_user = Depends(get_current_user)):
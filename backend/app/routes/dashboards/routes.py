@@ -1,26 +1,36 @@
-from fastapi import APIRouter, Depends, Request
-from app.services.auth import get_current_active_principal, get_current_active_staff, get_current_user
-from app.db.mongodb import users_collection, students_collection
-from app.models.user import UserRole
+from fastapi import APIRouter, Depends, Request, Query
+from typing import Optional
+from app.services.auth import get_current_active_principal, get_current_active_staff, get_current_principal
+from app.services.dashboard import (
+    get_dashboard_statistics, get_principal_overview, current_academic_year, current_month
+)
+from app.models.attendance import Month
+from app.schemas.common import ACADEMIC_YEAR_PATTERN
 
 router = APIRouter()
 
 @router.get("/principal")
 async def principal_dashboard(current_user = Depends(get_current_active_principal)):
-    # Count staff from users collection
-    total_staff = users_collection.count_documents({"role": UserRole.STAFF})
-    
-    # Count students from students collection
-    total_students = students_collection.count_documents({})
-    
     return {
         "message": "Principal dashboard",
-        "statistics": {
-            "total_students": total_students,
-            "total_staff": total_staff
-        }
+        "statistics": get_dashboard_statistics()
     }
 
+# Enrollment, attendance and exam summaries for the principal in one round trip
+@router.get("/overview")
+async def principal_overview(
+    academic_year: Optional[str] = Query(None, pattern=ACADEMIC_YEAR_PATTERN, description="Academic year such as 2024-2025"),
+    month: Optional[Month] = None,
+    low_attendance_threshold: float = Query(
+        75.0, ge=0, le=100, description="Attendance percentage below which a student is flagged"
+    ),
+    current_user = Depends(get_current_active_principal)
+):
+    """Principal dashboard overview, cached per academic year and month - Principal only"""
+    academic_year = academic_year or current_academic_year()
+    month = (month or current_month()).value
+    return get_principal_overview(academic_year, month, low_attendance_threshold)
+
 @router.get("/staff")
 async def staff_dashboard(current_user = Depends(get_current_active_staff)):
     # Staff-only data and functionality
@@ -31,7 +41,7 @@ async def staff_dashboard(current_user = Depends(get_current_active_staff)):
 
 # Universal dashboard endpoint that determines the correct data to return based on the URL path
 @router.get("/dashboard")
-async def unified_dashboard(request: Request, current_user = Depends(get_current_user)):
+async def unified_dashboard(request: Request, current_user = Depends(get_current_principal)):
     # Get the URL path to determine which dashboard data to serve
     path = request.url.path
     
@@ -43,16 +53,7 @@ async def unified_dashboard(request: Request, current_user = Depends(get_current
         }
     # Otherwise return principal dashboard data
     else:
-        # Count staff from users collection
-        total_staff = users_collection.count_documents({"role": UserRole.STAFF})
-    
-        # Count students from students collection
-        total_students = students_collection.count_documents({})
-        
         return {
             "message": "Principal dashboard",
-            "statistics": {
-                "total_students": total_students,
-                "total_staff": total_staff
-            }
+            "statistics": get_dashboard_statistics()
         } 
\ No newline at end of file
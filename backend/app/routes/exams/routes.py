@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 from typing import List, Optional, Dict
 from datetime import datetime
+from itertools import chain
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.schemas.exam import ExamCreate, ExamUpdate, ExamResponse, StudentExamsSummary, GroupSubjects
 from app.services.auth import get_current_active_staff, get_current_active_principal
-from app.db.mongodb import exams_collection, students_collection
+from app.db.mongodb import exams_collection
+from app.services.student_directory import get_student_entry, get_student_entries
 from app.models.exam import SubjectsByGroup, ExamType
+from app.utils.fast_json import fast_json_response, shape_document
+from app.utils.streaming import StreamFormat, batched, wants_ndjson, json_mapping_body, ndjson_body, streaming_json_response
+from app.utils.etag import (
+    bump_collection_version, collection_etag, document_etag, if_match_query, precondition_failed,
+    etag_matches, not_modified, set_etag
+)
+from config.settings import EXAMS_COLLECTION, STUDENTS_COLLECTION, STREAM_BATCH_SIZE
 
 router = APIRouter()
 
@@ -45,6 +55,7 @@ async def get_subjects_for_group(
 # Get all exams with filtering options
 @router.get("/", response_model=List[ExamResponse])
 async def get_all_exams(
+    response: Response,
     current_user = Depends(get_current_active_staff),
     student_id: Optional[str] = None,
     admission_number: Optional[str] = None,
@@ -52,9 +63,18 @@ async def get_all_exams(
     group: Optional[str] = None,
     exam_type: Optional[ExamType] = None,
     limit: int = 100,
-    skip: int = 0
+    skip: int = 0,
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get all exams with optional filtering - Accessible by staff and principal"""
+    etag = collection_etag(
+        EXAMS_COLLECTION, student_id=student_id, admission_number=admission_number,
+        year=year, group=group, exam_type=exam_type, limit=limit, skip=skip
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     query = {}
     
     # Apply filters if provided
@@ -76,13 +96,15 @@ async def get_all_exams(
         exam = convert_objectid(exam)
         exams.append(exam)
     
-    return exams
+    return fast_json_response(List[ExamResponse], exams, response, trusted=True)
 
 # Get a specific exam by ID
 @router.get("/{exam_id}", response_model=ExamResponse)
 async def get_exam(
     exam_id: str,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(get_current_active_staff),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get a specific exam by ID - Accessible by staff and principal"""
     exam = exams_collection.find_one({"_id": ObjectId(exam_id)})
@@ -93,6 +115,11 @@ async def get_exam(
             detail="Exam record not found"
         )
     
+    etag = document_etag(exam)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     exam = convert_objectid(exam)
     return exam
 
@@ -100,10 +127,17 @@ async def get_exam(
 @router.get("/student/{student_id}", response_model=StudentExamsSummary)
 async def get_student_exams(
     student_id: str,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(get_current_active_staff),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get all exams for a specific student - Accessible by staff and principal"""
-    student = students_collection.find_one({"_id": ObjectId(student_id)})
+    etag = collection_etag(EXAMS_COLLECTION, STUDENTS_COLLECTION, student_id=student_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    student = get_student_entry(student_id)
     
     if not student:
         raise HTTPException(
@@ -120,9 +154,9 @@ async def get_student_exams(
     
     return {
         "student_id": student_id,
-        "student_name": student["name"],
-        "admission_number": student["admission_number"],
-        "group": student["group"],
+        "student_name": student.name,
+        "admission_number": student.admission_number,
+        "group": student.group,
         "exams": exams
     }
 
@@ -130,12 +164,12 @@ async def get_student_exams(
 @router.post("/", response_model=ExamResponse, status_code=status.HTTP_201_CREATED)
 async def create_exam(
     exam: ExamCreate,
+    response: Response,
     current_user = Depends(get_current_active_staff)
 ):
     """Create a new exam record - Accessible by staff and principal"""
     # Verify student exists
-    student = students_collection.find_one({"_id": ObjectId(exam.student_id)})
-    if not student:
+    if not get_student_entry(exam.student_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
@@ -157,16 +191,19 @@ async def create_exam(
     total_marks, percentage = calculate_exam_stats(exam.subjects)
     
     # Prepare exam data
-    exam_data = exam.dict()
+    exam_data = exam.model_dump()
     exam_data["total_marks"] = total_marks
     exam_data["percentage"] = percentage
     exam_data["created_at"] = datetime.now()
+    exam_data["version"] = 1
     
     # Insert into database
     result = exams_collection.insert_one(exam_data)
+    bump_collection_version(EXAMS_COLLECTION)
     
     # Get and return the created exam
     created_exam = exams_collection.find_one({"_id": result.inserted_id})
+    set_etag(response, document_etag(created_exam))
     created_exam = convert_objectid(created_exam)
     
     return created_exam
@@ -176,19 +213,15 @@ async def create_exam(
 async def update_exam(
     exam_id: str,
     exam_update: ExamUpdate,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(get_current_active_staff),
+    if_match: Optional[str] = Header(None)
 ):
     """Update an exam record - Accessible by staff and principal"""
-    # Check if exam exists
-    exam = exams_collection.find_one({"_id": ObjectId(exam_id)})
-    if not exam:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Exam record not found"
-        )
+    exam_obj_id = ObjectId(exam_id)
     
     # Prepare update data
-    update_data = {k: v for k, v in exam_update.dict().items() if v is not None}
+    update_data = {k: v for k, v in exam_update.model_dump().items() if v is not None}
     
     # If updating subjects, recalculate total marks and percentage
     if "subjects" in update_data:
@@ -198,14 +231,25 @@ async def update_exam(
     
     update_data["updated_at"] = datetime.now()
     
-    # Update exam
-    exams_collection.update_one(
-        {"_id": ObjectId(exam_id)},
-        {"$set": update_data}
+    # Update exam, only at the client's version when If-Match is sent
+    updated_exam = exams_collection.find_one_and_update(
+        if_match_query({"_id": exam_obj_id}, if_match),
+        {"$set": update_data, "$inc": {"version": 1}},
+        return_document=ReturnDocument.AFTER
     )
+    if not updated_exam:
+        if if_match and precondition_failed(exams_collection, exam_obj_id):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Exam record was modified by another request"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam record not found"
+        )
+    bump_collection_version(EXAMS_COLLECTION)
     
-    # Get and return the updated exam
-    updated_exam = exams_collection.find_one({"_id": ObjectId(exam_id)})
+    set_etag(response, document_etag(updated_exam))
     updated_exam = convert_objectid(updated_exam)
     
     return updated_exam
@@ -214,75 +258,94 @@ async def update_exam(
 @router.delete("/{exam_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_exam(
     exam_id: str,
-    current_user = Depends(get_current_active_principal)  # Only principals can delete
+    current_user = Depends(get_current_active_principal),  # Only principals can delete
+    if_match: Optional[str] = Header(None)
 ):
     """Delete an exam record - Accessible by principals only"""
-    # Check if exam exists
-    exam = exams_collection.find_one({"_id": ObjectId(exam_id)})
+    exam_obj_id = ObjectId(exam_id)
+    
+    # Delete exam, only at the client's version when If-Match is sent
+    exam = exams_collection.find_one_and_delete(
+        if_match_query({"_id": exam_obj_id}, if_match),
+        projection={"_id": 1}
+    )
+    
     if not exam:
+        if if_match and precondition_failed(exams_collection, exam_obj_id):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Exam record was modified by another request"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Exam record not found"
         )
-    
-    # Delete exam
-    result = exams_collection.delete_one({"_id": ObjectId(exam_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete exam record"
-        )
+    bump_collection_version(EXAMS_COLLECTION)
     
     return None
 
+# Exam summaries of the given students that exist, as (student_id, summary) pairs,
+# with one directory lookup and one exams query per batch of students
+def _exam_summaries(student_ids):
+    for batch in batched(student_ids):
+        students = get_student_entries(batch)
+        if not students:
+            continue
+        
+        # Newest first across the batch, so each student's list stays in that order
+        exams_by_student = {}
+        cursor = exams_collection.find(
+            {"student_id": {"$in": list(students)}}
+        ).sort("created_at", -1).batch_size(STREAM_BATCH_SIZE)
+        for exam in cursor:
+            exams_by_student.setdefault(exam["student_id"], []).append(
+                shape_document(ExamResponse, convert_objectid(exam))
+            )
+        
+        for student_id in batch:
+            # Skip if student not found
+            student = students.get(student_id)
+            if student is None:
+                continue
+            yield student_id, {
+                "student_id": student_id,
+                "student_name": student.name,
+                "admission_number": student.admission_number,
+                "group": student.group,
+                "exams": exams_by_student.get(student_id, [])
+            }
+
 # Get exams for multiple students at once (batch)
 @router.post("/batch", response_model=Dict[str, StudentExamsSummary])
 async def get_batch_student_exams(
     student_ids: List[str],
-    current_user = Depends(get_current_active_staff)
+    format: Optional[StreamFormat] = Query(None, description="json (default) or ndjson"),
+    current_user = Depends(get_current_active_staff),
+    accept: Optional[str] = Header(None)
 ):
-    """Get exams for multiple students in a single request - Accessible by staff and principal"""
+    """Get exams for multiple students in a single request - Accessible by staff and principal
+
+    Summaries are streamed a batch of students at a time, as one JSON object
+    keyed by student ID or as NDJSON lines of summaries.
+    """
     if not student_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No student IDs provided"
         )
     
-    # Convert string IDs to ObjectId
-    object_ids = [ObjectId(student_id) for student_id in student_ids]
+    # Each student appears once, in the order first requested
+    summaries = _exam_summaries(list(dict.fromkeys(student_ids)))
     
-    # Get all students in a single query
-    students = {str(student["_id"]): student for student in students_collection.find({"_id": {"$in": object_ids}})}
-    
-    if not students:
+    # Read up to the first student found before anything is sent
+    first = next(summaries, None)
+    if first is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No students found with the provided IDs"
         )
+    summaries = chain([first], summaries)
     
-    # Get all exams for these students in a single query
-    all_exams = list(exams_collection.find({"student_id": {"$in": student_ids}}).sort("created_at", -1))
-    
-    # Organize exams by student ID
-    result = {}
-    for student_id in student_ids:
-        # Skip if student not found
-        if student_id not in students:
-            continue
-            
-        student = students[student_id]
-        
-        # Filter exams for this student
-        student_exams = [convert_objectid(exam) for exam in all_exams if exam["student_id"] == student_id]
-        
-        # Add to result
-        result[student_id] = {
-            "student_id": student_id,
-            "student_name": student["name"],
-            "admission_number": student["admission_number"],
-            "group": student["group"],
-            "exams": student_exams
-        }
-    
-    return result 
\ No newline at end of file
+    if wants_ndjson(format, accept):
+        return streaming_json_response(ndjson_body(summary for _, summary in summaries), ndjson=True)
+    return streaming_json_response(json_mapping_body(summaries))
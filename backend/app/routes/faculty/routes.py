@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Header
+from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.schemas.faculty import FacultyCreate, FacultyUpdate, FacultyResponse
 from app.services.auth import get_current_active_principal
 from app.db.mongodb import faculty_collection
+from app.utils.http_cache import cached_json_response, invalidate_public_cache
 
 router = APIRouter()
 
-@router.get("", response_model=List[FacultyResponse])
-async def get_all_faculty():
+def load_faculty():
     faculty_members = []
     for faculty in faculty_collection.find().sort("name", 1):
         faculty_members.append({
@@ -24,6 +25,11 @@ async def get_all_faculty():
         })
     return faculty_members
 
+# Public endpoint, served from the in-process response cache
+@router.get("", response_model=List[FacultyResponse])
+async def get_all_faculty(if_none_match: Optional[str] = Header(None)):
+    return cached_json_response(("faculty", "all"), load_faculty, if_none_match)
+
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=FacultyResponse)
 async def create_faculty(faculty: FacultyCreate, current_user = Depends(get_current_active_principal)):
     faculty_data = {
@@ -36,6 +42,7 @@ async def create_faculty(faculty: FacultyCreate, current_user = Depends(get_curr
     }
     
     result = faculty_collection.insert_one(faculty_data)
+    invalidate_public_cache("faculty")
     
     created_faculty = faculty_collection.find_one({"_id": result.inserted_id})
     
@@ -60,13 +67,6 @@ async def update_faculty(faculty_id: str, faculty: FacultyUpdate, current_user =
             detail="Invalid faculty ID format"
         )
     
-    existing_faculty = faculty_collection.find_one({"_id": faculty_obj_id})
-    if not existing_faculty:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Faculty member not found"
-        )
-    
     update_data = {
         "updated_at": datetime.utcnow()
     }
@@ -83,12 +83,17 @@ async def update_faculty(faculty_id: str, faculty: FacultyUpdate, current_user =
     if faculty.experience is not None:
         update_data["experience"] = faculty.experience
     
-    faculty_collection.update_one(
+    updated_faculty = faculty_collection.find_one_and_update(
         {"_id": faculty_obj_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
-    
-    updated_faculty = faculty_collection.find_one({"_id": faculty_obj_id})
+    if not updated_faculty:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Faculty member not found"
+        )
+    invalidate_public_cache("faculty")
     
     return {
         "id": str(updated_faculty["_id"]),
@@ -111,12 +116,11 @@ async def delete_faculty(faculty_id: str, current_user = Depends(get_current_act
             detail="Invalid faculty ID format"
         )
     
-    existing_faculty = faculty_collection.find_one({"_id": faculty_obj_id})
-    if not existing_faculty:
+    deleted_faculty = faculty_collection.find_one_and_delete({"_id": faculty_obj_id}, projection={"_id": 1})
+    if not deleted_faculty:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Faculty member not found"
         )
-    
-    faculty_collection.delete_one({"_id": faculty_obj_id})
+    invalidate_public_cache("faculty")
     return None 
\ No newline at end of file
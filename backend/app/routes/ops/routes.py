@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+from app.services.auth import get_current_active_principal, password_pool, bulk_password_pool
+from app.services.roster import roster_replica
+from app.services.profiling import profile_store
+from app.utils.memory import memory_diagnostics
+from app.utils.cache import cache_stats
+from config.settings import MEMORY_DIAGNOSTICS_ENABLED
+
+router = APIRouter()
+
+# Hit/miss statistics of every in-process cache (Principal only)
+@router.get("/caches")
+async def get_cache_stats(current_user = Depends(get_current_active_principal)):
+    return {"caches": cache_stats()}
+
+# Queueing statistics of the bcrypt worker pools (Principal only)
+@router.get("/password-pool")
+async def get_password_pool_stats(current_user = Depends(get_current_active_principal)):
+    return {**password_pool.stats(), "bulk": bulk_password_pool.stats()}
+
+# Freshness and hit counts of the in-process student roster (Principal only)
+@router.get("/roster")
+async def get_roster_replica_stats(current_user = Depends(get_current_active_principal)):
+    return roster_replica.stats()
+
+# Recent request profiles, newest first (Principal only)
+@router.get("/profiles")
+async def list_profiles(current_user = Depends(get_current_active_principal)):
+    return {"profiles": profile_store.recent()}
+
+def find_profile(profile_id):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return profile
+
+# Text report of one profile, sorted by cumulative time (Principal only)
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, current_user = Depends(get_current_active_principal)):
+    return find_profile(profile_id)["report"]
+
+# Raw pstats data of one profile, loadable with pstats.Stats or snakeviz (Principal only)
+@router.get("/profiles/{profile_id}/pstats")
+async def download_profile(profile_id: str, current_user = Depends(get_current_active_principal)):
+    return Response(
+        content=find_profile(profile_id)["stats"],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+    )
+
+# Peak allocation and top allocation sites per route (Principal only)
+@router.get("/memory")
+async def get_memory_report(current_user = Depends(get_current_active_principal)):
+    return memory_diagnostics.report()
+
+# Start tracing allocations; every request is slower until it is stopped (Principal only)
+@router.post("/memory/start")
+async def start_memory_diagnostics(
+    frames: int = Query(1, ge=1, le=25),
+    current_user = Depends(get_current_active_principal)
+):
+    # Without the middleware nothing would be recorded, only slowed down
+    if not MEMORY_DIAGNOSTICS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Memory diagnostics are disabled"
+        )
+    memory_diagnostics.reset()
+    memory_diagnostics.start(frames)
+    return {"tracing": True}
+
+@router.post("/memory/stop")
+async def stop_memory_diagnostics(current_user = Depends(get_current_active_principal)):
+    report = memory_diagnostics.report()
+    memory_diagnostics.stop()
+    return {**report, "tracing": False}
@@ -1,11 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from bson import ObjectId
-from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.schemas.student import (
+    StudentCreate, StudentUpdate, StudentResponse, RolloverRequest, RolloverSummary,
+    BulkStudentCreate, BulkStudentResponse
+)
 from app.services.auth import get_current_active_staff, get_current_active_principal
-from app.db.mongodb import students_collection
+from app.services.dashboard import invalidate_dashboard_statistics
+from app.services.permissions import require_permission
+from app.services.student_directory import invalidate_student_directory
+from app.services.roster import roster_replica, find_roster
+from app.db.mongodb import students_collection, attendance_collection, alumni_collection, counters_collection
 from app.models.student import Group, Medium
+from app.models.attendance import Month
+from app.utils.fast_json import fast_json_response
+from app.utils.etag import (
+    bump_collection_version, versions_etag, get_collection_versions, document_etag, if_match_query,
+    precondition_failed, etag_matches, not_modified, set_etag
+)
+from config.settings import ALUMNI_COLLECTION, STUDENTS_COLLECTION, ATTENDANCE_COLLECTION, BULK_STUDENT_MAX_ROWS
+
+# Final year of the course; students in this year graduate at rollover
+FINAL_YEAR = 2
+
+# A rollover claim still marked as started after this long belongs to a run
+# whose worker died, and can be taken over
+ROLLOVER_CLAIM_LEASE = timedelta(minutes=30)
+
+# Number of upserts sent to MongoDB per bulk_write call when seeding attendance
+SEED_BATCH_SIZE = 1000
 
 # Helper function to convert date objects to strings
 def convert_dates_to_strings(data):
@@ -36,40 +62,41 @@ router = APIRouter()
 # Get all students with optional filtering
 @router.get("/", response_model=List[StudentResponse])
 async def get_all_students(
+    response: Response,
     current_user = Depends(get_current_active_staff),
     year: Optional[int] = None,
     group: Optional[Group] = None,
     medium: Optional[Medium] = None,
     limit: int = 100,
-    skip: int = 0
+    skip: int = 0,
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get all students with optional filtering - Accessible by staff and principal"""
-    query = {}
-    
-    # Apply filters if provided
-    if year is not None:
-        query["year"] = year
-    if group is not None:
-        query["group"] = group
-    if medium is not None:
-        query["medium"] = medium
-    
+    # The roster is served at the counter the ETag is built from
+    versions = get_collection_versions(STUDENTS_COLLECTION)
+    etag = versions_etag(
+        (STUDENTS_COLLECTION,), versions, year=year, group=group, medium=medium, limit=limit, skip=skip
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     students = []
-    cursor = students_collection.find(query).skip(skip).limit(limit)
-    
-    for student in cursor:
+    for student in find_roster(year, group, medium, skip, limit, version=versions[0]):
         student["id"] = str(student.pop("_id"))
         # Convert date strings back to date objects for response
         convert_strings_to_dates(student)
         students.append(student)
     
-    return students
+    return fast_json_response(List[StudentResponse], students, response, trusted=True)
 
 # Get a specific student by ID
 @router.get("/{student_id}", response_model=StudentResponse)
 async def get_student(
     student_id: str,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(get_current_active_staff),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get a specific student by ID - Accessible by staff and principal"""
     student = students_collection.find_one({"_id": ObjectId(student_id)})
@@ -80,6 +107,11 @@ async def get_student(
             detail="Student not found"
         )
     
+    etag = document_etag(student)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     student["id"] = str(student.pop("_id"))
     # Convert date strings back to date objects for response
     convert_strings_to_dates(student)
@@ -89,7 +121,8 @@ async def get_student(
 @router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
 async def create_student(
     student: StudentCreate,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(require_permission("can_add_student"))
 ):
     """Create a new student - Accessible by staff and principal"""
     # Check if admission number already exists
@@ -110,17 +143,22 @@ async def create_student(
             )
     
     # Prepare student data
-    student_data = student.dict()
+    student_data = student.model_dump()
     student_data["created_at"] = datetime.now().date()
+    student_data["version"] = 1
     
     # Convert all date objects to strings for MongoDB compatibility
     student_data = convert_dates_to_strings(student_data)
     
     # Insert into database
     result = students_collection.insert_one(student_data)
+    bump_collection_version(STUDENTS_COLLECTION)
+    roster_replica.mark_stale()
+    invalidate_dashboard_statistics()
     
     # Get and return the created student
     created_student = students_collection.find_one({"_id": result.inserted_id})
+    set_etag(response, document_etag(created_student))
     created_student["id"] = str(created_student.pop("_id"))
     
     # Convert date strings back to date objects for response
@@ -128,64 +166,157 @@ async def create_student(
     
     return created_student
 
+# Create many students in one request (API populators, admissions imports)
+@router.post("/bulk", response_model=BulkStudentResponse)
+async def create_students_bulk(
+    bulk: BulkStudentCreate,
+    current_user = Depends(require_permission("can_add_student"))
+):
+    """Create many students in one request, reporting the outcome of every row"""
+    if len(bulk.students) > BULK_STUDENT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_STUDENT_MAX_ROWS} students can be created per request"
+        )
+    
+    results = [
+        {"row": row, "admission_number": student.admission_number, "status": "created"}
+        for row, student in enumerate(bulk.students)
+    ]
+    
+    # One query for every admission and Aadhar number already in use
+    admission_numbers = [student.admission_number for student in bulk.students]
+    aadhar_numbers = [student.aadhar_number for student in bulk.students if student.aadhar_number]
+    taken_admission_numbers = set()
+    taken_aadhar_numbers = set()
+    for existing in students_collection.find(
+        {"$or": [{"admission_number": {"$in": admission_numbers}}, {"aadhar_number": {"$in": aadhar_numbers}}]},
+        {"admission_number": 1, "aadhar_number": 1}
+    ):
+        taken_admission_numbers.add(existing.get("admission_number"))
+        taken_aadhar_numbers.add(existing.get("aadhar_number"))
+    
+    # Reject duplicates up front, including repeats inside the batch
+    created_at = datetime.now().date()
+    pending = []
+    documents = []
+    for row, student in enumerate(bulk.students):
+        if student.admission_number in taken_admission_numbers:
+            results[row].update(status="duplicate", detail="Student with this admission number already exists")
+        elif student.aadhar_number and student.aadhar_number in taken_aadhar_numbers:
+            results[row].update(status="duplicate", detail="Student with this Aadhar number already exists")
+        else:
+            taken_admission_numbers.add(student.admission_number)
+            taken_aadhar_numbers.add(student.aadhar_number)
+            student_data = student.model_dump()
+            student_data["created_at"] = created_at
+            student_data["version"] = 1
+            documents.append(convert_dates_to_strings(student_data))
+            pending.append(row)
+    
+    # Unordered, so one failing row does not stop the rest
+    failed_rows = {}
+    if documents:
+        try:
+            students_collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed_rows[pending[error["index"]]] = error
+    
+    for row, document in zip(pending, documents):
+        error = failed_rows.get(row)
+        if error is None:
+            results[row]["id"] = str(document["_id"])
+        elif error.get("code") == 11000:
+            results[row].update(status="duplicate", detail="Student already exists")
+        else:
+            results[row].update(status="error", detail=error.get("errmsg", "Insert failed"))
+    
+    created = sum(1 for result in results if result["status"] == "created")
+    if created:
+        bump_collection_version(STUDENTS_COLLECTION)
+        roster_replica.mark_stale()
+        invalidate_dashboard_statistics()
+    
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }
+
 # Update a student
 @router.put("/{student_id}", response_model=StudentResponse)
 async def update_student(
     student_id: str,
     student_update: StudentUpdate,
-    current_user = Depends(get_current_active_staff)
+    response: Response,
+    current_user = Depends(require_permission("can_edit_student")),
+    if_match: Optional[str] = Header(None)
 ):
     """Update a student - Accessible by staff and principal"""
-    # Check if student exists
-    student = students_collection.find_one({"_id": ObjectId(student_id)})
-    if not student:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Student not found"
-        )
+    student_obj_id = ObjectId(student_id)
     
     # Prepare update data (only include non-None values)
-    update_data = {k: v for k, v in student_update.dict().items() if v is not None}
+    update_data = {k: v for k, v in student_update.model_dump().items() if v is not None}
+    
+    # Check for duplicate admission number (if being updated)
+    if "admission_number" in update_data:
+        existing_admission = students_collection.find_one({
+            "admission_number": update_data["admission_number"],
+            "_id": {"$ne": student_obj_id}
+        }, {"_id": 1})
+        if existing_admission:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Student with this admission number already exists"
+            )
+    
+    # Check for duplicate Aadhar number (if being updated)
+    if "aadhar_number" in update_data:
+        existing_aadhar = students_collection.find_one({
+            "aadhar_number": update_data["aadhar_number"],
+            "_id": {"$ne": student_obj_id}
+        }, {"_id": 1})
+        if existing_aadhar:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Student with this Aadhar number already exists"
+            )
     
-    # If there's data to update
+    # Only write if the client's copy is current (when If-Match is sent)
+    query = if_match_query({"_id": student_obj_id}, if_match)
     if update_data:
-        # Check for duplicate admission number (if being updated)
-        if "admission_number" in update_data and update_data["admission_number"] != student["admission_number"]:
-            existing_admission = students_collection.find_one({
-                "admission_number": update_data["admission_number"],
-                "_id": {"$ne": ObjectId(student_id)}
-            })
-            if existing_admission:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Student with this admission number already exists"
-                )
-        
-        # Check for duplicate Aadhar number (if being updated)
-        if "aadhar_number" in update_data and update_data["aadhar_number"] != student.get("aadhar_number"):
-            existing_aadhar = students_collection.find_one({
-                "aadhar_number": update_data["aadhar_number"],
-                "_id": {"$ne": ObjectId(student_id)}
-            })
-            if existing_aadhar:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Student with this Aadhar number already exists"
-                )
-        
         update_data["updated_at"] = datetime.now().date()
         
         # Convert all date objects to strings for MongoDB compatibility
         update_data = convert_dates_to_strings(update_data)
         
-        # Update student
-        students_collection.update_one(
-            {"_id": ObjectId(student_id)},
-            {"$set": update_data}
+        updated_student = students_collection.find_one_and_update(
+            query,
+            {"$set": update_data, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
         )
+    else:
+        updated_student = students_collection.find_one(query)
     
-    # Get and return the updated student
-    updated_student = students_collection.find_one({"_id": ObjectId(student_id)})
+    if not updated_student:
+        if if_match and precondition_failed(students_collection, student_obj_id):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Student was modified by another request"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    if update_data:
+        bump_collection_version(STUDENTS_COLLECTION)
+        invalidate_student_directory(student_id)
+        roster_replica.mark_stale()
+        # Year, group or medium changes move the student between classes
+        invalidate_dashboard_statistics()
+    
+    set_etag(response, document_etag(updated_student))
     updated_student["id"] = str(updated_student.pop("_id"))
     
     # Convert date strings back to date objects for response
@@ -197,24 +328,254 @@ async def update_student(
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_student(
     student_id: str,
-    current_user = Depends(get_current_active_staff)
+    current_user = Depends(require_permission("can_delete_student")),
+    if_match: Optional[str] = Header(None)
 ):
     """Delete a student - Accessible by staff and principal"""
-    # Check if student exists
-    student = students_collection.find_one({"_id": ObjectId(student_id)})
+    student_obj_id = ObjectId(student_id)
+    
+    # Delete student, only at the client's version when If-Match is sent
+    student = students_collection.find_one_and_delete(
+        if_match_query({"_id": student_obj_id}, if_match),
+        projection={"_id": 1}
+    )
+    
     if not student:
+        if if_match and precondition_failed(students_collection, student_obj_id):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Student was modified by another request"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
         )
+    bump_collection_version(STUDENTS_COLLECTION)
+    invalidate_student_directory(student_id)
+    roster_replica.mark_stale()
+    invalidate_dashboard_statistics()
     
-    # Delete student
-    result = students_collection.delete_one({"_id": ObjectId(student_id)})
-    
-    if result.deleted_count != 1:
+    return None
+
+# Seed empty working days and attendance records for a new academic year
+def seed_academic_year(academic_year, updated_by, seed_attendance=True):
+    """Bulk upsert zeroed attendance structures, leaving existing records untouched"""
+    date_now = datetime.now().date().isoformat()
+
+    working_days_ops = [
+        UpdateOne(
+            {"academic_year": academic_year, "month": month.value, "student_id": {"$exists": False}},
+            {"$setOnInsert": {
+                "academic_year": academic_year,
+                "month": month.value,
+                "working_days": 0,
+                "last_updated": date_now,
+                "updated_by": updated_by
+            }},
+            upsert=True
+        )
+        for month in Month
+    ]
+    result = attendance_collection.bulk_write(working_days_ops, ordered=False)
+    working_days_seeded = result.upserted_count
+
+    attendance_seeded = 0
+    if seed_attendance:
+        operations = []
+        for student in students_collection.find({}, {"_id": 1}).batch_size(SEED_BATCH_SIZE):
+            student_id = str(student["_id"])
+            for month in Month:
+                operations.append(UpdateOne(
+                    {"student_id": student_id, "academic_year": academic_year, "month": month.value},
+                    {"$setOnInsert": {
+                        "student_id": student_id,
+                        "academic_year": academic_year,
+                        "month": month.value,
+                        "working_days": 0,
+                        "days_present": 0,
+                        "attendance_percentage": 0.0,
+                        "last_updated": date_now,
+                        "updated_by": updated_by,
+                        "version": 1
+                    }},
+                    upsert=True
+                ))
+            if len(operations) >= SEED_BATCH_SIZE:
+                attendance_seeded += attendance_collection.bulk_write(operations, ordered=False).upserted_count
+                operations = []
+        if operations:
+            attendance_seeded += attendance_collection.bulk_write(operations, ordered=False).upserted_count
+
+    return working_days_seeded, attendance_seeded
+
+# Promote, graduate and seed the next academic year in bulk (Principal only)
+@router.post("/rollover", response_model=RolloverSummary)
+async def rollover_academic_year(
+    rollover: RolloverRequest,
+    current_user = Depends(get_current_active_principal)
+):
+    """Move every cohort to the next academic year - Principal only
+
+    Final-year students are archived into the alumni collection, first-year
+    students are promoted and detained students keep their current year.
+    Runs as a dry run unless ``dry_run`` is explicitly set to false; each
+    academic year can only be rolled over once, and repeating the request
+    resumes a run that failed part way.
+    """
+    if rollover.from_academic_year == rollover.to_academic_year:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete student"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Target academic year must differ from the current academic year"
         )
-    
-    return None 
\ No newline at end of file
+
+    try:
+        detained_ids = [ObjectId(student_id) for student_id in rollover.detained_student_ids]
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid student ID format in detained_student_ids"
+        )
+
+    graduating_query = {"year": FINAL_YEAR, "_id": {"$nin": detained_ids}}
+    promoting_query = {"year": {"$lt": FINAL_YEAR}, "_id": {"$nin": detained_ids}}
+
+    if rollover.dry_run:
+        graduating = students_collection.count_documents(graduating_query)
+        promoting = students_collection.count_documents(promoting_query)
+        detained = students_collection.count_documents({"_id": {"$in": detained_ids}})
+
+        # Students still enrolled after the rollover get a record per month
+        existing_working_days = attendance_collection.count_documents({
+            "academic_year": rollover.to_academic_year,
+            "student_id": {"$exists": False}
+        })
+        attendance_records = 0
+        if rollover.seed_attendance:
+            remaining = students_collection.count_documents({}) - graduating
+            existing_attendance = attendance_collection.count_documents({
+                "academic_year": rollover.to_academic_year,
+                "student_id": {"$exists": True}
+            })
+            attendance_records = max(remaining * len(Month) - existing_attendance, 0)
+
+        return {
+            "from_academic_year": rollover.from_academic_year,
+            "to_academic_year": rollover.to_academic_year,
+            "dry_run": True,
+            "promoted": promoting,
+            "graduated": graduating,
+            "detained": detained,
+            "working_days_seeded": max(len(Month) - existing_working_days, 0),
+            "attendance_records_seeded": attendance_records
+        }
+
+    date_now = datetime.now().date().isoformat()
+    claim_id = f"rollover:{rollover.from_academic_year}"
+    now = datetime.utcnow()
+
+    # Claim the rollover before writing anything: a retried request or a
+    # second click must not graduate the cohort that was just promoted. A run
+    # that failed, or whose worker died holding the claim, is resumed with
+    # the cohorts it recorded
+    claim = counters_collection.find_one_and_update(
+        {
+            "_id": claim_id,
+            "to_academic_year": rollover.to_academic_year,
+            "$or": [
+                {"status": "failed"},
+                {"status": "started", "started_at": {"$lt": now - ROLLOVER_CLAIM_LEASE}}
+            ]
+        },
+        {"$set": {"status": "started", "started_by": current_user["username"], "started_at": now}},
+        return_document=ReturnDocument.AFTER
+    )
+    if claim is None:
+        claim = {
+            "_id": claim_id,
+            "status": "started",
+            "to_academic_year": rollover.to_academic_year,
+            "graduating_ids": [student["_id"] for student in students_collection.find(graduating_query, {"_id": 1})],
+            "detained_ids": detained_ids,
+            "started_by": current_user["username"],
+            "started_at": now
+        }
+        try:
+            counters_collection.insert_one(claim)
+        except DuplicateKeyError:
+            existing = counters_collection.find_one({"_id": claim_id}) or {}
+            if existing.get("status") == "completed":
+                detail = f"Academic year {rollover.from_academic_year} has already been rolled over"
+            elif existing.get("to_academic_year") != rollover.to_academic_year:
+                detail = (
+                    f"Academic year {rollover.from_academic_year} is being rolled over "
+                    f"to {existing.get('to_academic_year')}"
+                )
+            else:
+                detail = f"Academic year {rollover.from_academic_year} is already being rolled over"
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+    archived_ids = claim["graduating_ids"]
+    detained_ids = claim["detained_ids"]
+    try:
+        # Archive the recorded graduating cohort server-side, then remove it
+        # from the roster; both steps are safe to repeat on a resume
+        students_collection.aggregate([
+            {"$match": {"_id": {"$in": archived_ids}}},
+            {"$addFields": {
+                "graduated_academic_year": rollover.from_academic_year,
+                "graduated_at": date_now
+            }},
+            {"$merge": {"into": ALUMNI_COLLECTION, "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+        students_collection.delete_many({"_id": {"$in": archived_ids}, "year": FINAL_YEAR})
+        graduated = alumni_collection.count_documents({
+            "_id": {"$in": archived_ids},
+            "graduated_academic_year": rollover.from_academic_year
+        })
+
+        # Promote everyone else in a single update, once: promoted students
+        # reach FINAL_YEAR, so a rerun after a partial update skips them
+        promoted = claim.get("promoted")
+        if promoted is None:
+            promoted = students_collection.update_many(
+                {"year": {"$lt": FINAL_YEAR}, "_id": {"$nin": detained_ids}},
+                {"$inc": {"year": 1, "version": 1}, "$set": {"updated_at": date_now}}
+            ).modified_count
+            counters_collection.update_one({"_id": claim_id}, {"$set": {"promoted": promoted}})
+        bump_collection_version(STUDENTS_COLLECTION)
+        invalidate_student_directory()
+        roster_replica.mark_stale()
+        invalidate_dashboard_statistics()
+
+        detained = students_collection.count_documents({"_id": {"$in": detained_ids}})
+
+        working_days_seeded, attendance_seeded = seed_academic_year(
+            rollover.to_academic_year,
+            current_user["username"],
+            seed_attendance=rollover.seed_attendance
+        )
+        if working_days_seeded or attendance_seeded:
+            bump_collection_version(ATTENDANCE_COLLECTION)
+    except Exception:
+        # Release the claim so the same request can resume the rollover
+        counters_collection.update_one(
+            {"_id": claim_id},
+            {"$set": {"status": "failed", "failed_at": datetime.utcnow()}}
+        )
+        raise
+
+    counters_collection.update_one(
+        {"_id": claim_id},
+        {"$set": {"status": "completed", "completed_at": datetime.utcnow()}}
+    )
+
+    return {
+        "from_academic_year": rollover.from_academic_year,
+        "to_academic_year": rollover.to_academic_year,
+        "dry_run": False,
+        "promoted": promoted,
+        "graduated": graduated,
+        "detained": detained,
+        "working_days_seeded": working_days_seeded,
+        "attendance_records_seeded": attendance_seeded
+    }
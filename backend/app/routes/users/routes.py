@@ -2,9 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from datetime import datetime
 from bson import ObjectId
-from app.schemas.user import UserCreate, UserResponse, UpdateUserRole, UpdateUserPassword, UserPermissions
-from app.services.auth import get_current_active_principal, get_password_hash, get_current_active_staff
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from app.schemas.user import (
+    UserCreate, UserResponse, UpdateUserRole, UpdateUserPassword, UserPermissions, BulkUserCreate, BulkUserResponse
+)
+from app.services.auth import (
+    get_current_active_principal, get_password_hash_async, get_password_hashes_bulk, get_current_active_staff,
+    revoke_user_tokens
+)
+from app.services.sessions import end_user_sessions
+from app.services.permissions import get_permissions, invalidate_permissions
+from app.services.dashboard import invalidate_dashboard_statistics
 from app.db.mongodb import users_collection, permissions_collection
+from config.settings import BULK_USER_MAX_ROWS
 
 router = APIRouter()
 
@@ -41,12 +52,13 @@ async def create_user(user: UserCreate, current_user = Depends(get_current_activ
     user_data = {
         "username": user.username,
         "email": user.email,
-        "hashed_password": get_password_hash(user.password),
+        "hashed_password": await get_password_hash_async(user.password),
         "role": user.role,
         "created_at": datetime.utcnow()
     }
     
     result = users_collection.insert_one(user_data)
+    invalidate_dashboard_statistics()
     
     created_user = users_collection.find_one({"_id": result.inserted_id})
     
@@ -58,6 +70,83 @@ async def create_user(user: UserCreate, current_user = Depends(get_current_activ
         "created_at": created_user["created_at"]
     }
 
+@router.post("/bulk", response_model=BulkUserResponse)
+async def create_users_bulk(bulk: BulkUserCreate, current_user = Depends(get_current_active_principal)):
+    """Provision many accounts in one request, reporting the outcome of every row"""
+    if len(bulk.users) > BULK_USER_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_USER_MAX_ROWS} users can be created per request"
+        )
+    
+    results = [{"row": row, "username": user.username, "status": "created"} for row, user in enumerate(bulk.users)]
+    
+    # One query for every username and email that is already taken
+    usernames = [user.username for user in bulk.users]
+    emails = [user.email for user in bulk.users]
+    taken_usernames = set()
+    taken_emails = set()
+    for existing in users_collection.find(
+        {"$or": [{"username": {"$in": usernames}}, {"email": {"$in": emails}}]},
+        {"username": 1, "email": 1}
+    ):
+        taken_usernames.add(existing["username"])
+        taken_emails.add(existing["email"])
+    
+    # Reject duplicates up front, including repeats inside the batch, so only new accounts are hashed
+    pending = []
+    for row, user in enumerate(bulk.users):
+        if user.username in taken_usernames:
+            results[row].update(status="duplicate", detail="Username already exists")
+        elif user.email in taken_emails:
+            results[row].update(status="duplicate", detail="Email already in use")
+        else:
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            pending.append(row)
+    
+    hashed_passwords = await get_password_hashes_bulk([bulk.users[row].password for row in pending])
+    created_at = datetime.utcnow()
+    documents = [
+        {
+            "username": bulk.users[row].username,
+            "email": bulk.users[row].email,
+            "hashed_password": hashed_password,
+            "role": bulk.users[row].role,
+            "created_at": created_at
+        }
+        for row, hashed_password in zip(pending, hashed_passwords)
+    ]
+    
+    # Unordered, so one failing row does not stop the rest; the unique
+    # indexes catch accounts created concurrently since the check above
+    failed_rows = {}
+    if documents:
+        try:
+            users_collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed_rows[pending[error["index"]]] = error
+    
+    for row, document in zip(pending, documents):
+        error = failed_rows.get(row)
+        if error is None:
+            results[row]["id"] = str(document["_id"])
+        elif error.get("code") == 11000:
+            results[row].update(status="duplicate", detail="Username or email already exists")
+        else:
+            results[row].update(status="error", detail=error.get("errmsg", "Insert failed"))
+    
+    created = sum(1 for result in results if result["status"] == "created")
+    if created:
+        invalidate_dashboard_statistics()
+    
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }
+
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user_role(user_id: str, update_data: UpdateUserRole, current_user = Depends(get_current_active_principal)):
     try:
@@ -68,19 +157,19 @@ async def update_user_role(user_id: str, update_data: UpdateUserRole, current_us
             detail="Invalid user ID format"
         )
     
-    user = users_collection.find_one({"_id": user_obj_id})
-    if not user:
+    updated_user = users_collection.find_one_and_update(
+        {"_id": user_obj_id},
+        {"$set": {"role": update_data.role}},
+        projection={"hashed_password": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
-    users_collection.update_one(
-        {"_id": user_obj_id},
-        {"$set": {"role": update_data.role}}
-    )
-    
-    updated_user = users_collection.find_one({"_id": user_obj_id})
+    revoke_user_tokens(updated_user["username"])
+    invalidate_dashboard_statistics()
     
     return {
         "id": str(updated_user["_id"]),
@@ -100,14 +189,15 @@ async def delete_user(user_id: str, current_user = Depends(get_current_active_pr
             detail="Invalid user ID format"
         )
     
-    user = users_collection.find_one({"_id": user_obj_id})
+    user = users_collection.find_one_and_delete({"_id": user_obj_id}, projection={"username": 1})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
-    users_collection.delete_one({"_id": user_obj_id})
+    revoke_user_tokens(user["username"])
+    end_user_sessions(user["username"])
+    invalidate_dashboard_statistics()
     return None
 
 @router.put("/{user_id}/password", response_model=UserResponse)
@@ -120,21 +210,21 @@ async def update_user_password(user_id: str, update_data: UpdateUserPassword, cu
             detail="Invalid user ID format"
         )
     
-    user = users_collection.find_one({"_id": user_obj_id})
-    if not user:
+    hashed_password = await get_password_hash_async(update_data.password)
+    
+    updated_user = users_collection.find_one_and_update(
+        {"_id": user_obj_id},
+        {"$set": {"hashed_password": hashed_password}},
+        projection={"hashed_password": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
-    hashed_password = get_password_hash(update_data.password)
-    
-    users_collection.update_one(
-        {"_id": user_obj_id},
-        {"$set": {"hashed_password": hashed_password}}
-    )
-    
-    updated_user = users_collection.find_one({"_id": user_obj_id})
+    revoke_user_tokens(updated_user["username"])
+    end_user_sessions(updated_user["username"])
     
     return {
         "id": str(updated_user["_id"]),
@@ -164,17 +254,8 @@ async def get_user_permissions(user_id: str, current_user = Depends(get_current_
             detail="User not found"
         )
     
-    # Get permissions or return default empty permissions
-    permissions = permissions_collection.find_one({"user_id": str(user_obj_id)})
-    
-    if not permissions:
-        return UserPermissions()
-    
-    return UserPermissions(
-        can_add_student=permissions.get("can_add_student", False),
-        can_edit_student=permissions.get("can_edit_student", False),
-        can_delete_student=permissions.get("can_delete_student", False)
-    )
+    # Get permissions (missing ones default to denied)
+    return UserPermissions(**get_permissions(str(user_obj_id)))
 
 @router.put("/{user_id}/permissions", response_model=UserPermissions)
 async def update_user_permissions(
@@ -221,5 +302,8 @@ async def update_user_permissions(
         {"$set": permissions_data},
         upsert=True
     )
+    invalidate_permissions(str(user_obj_id))
+    # Access tokens embedding the old permissions are renewed through the refresh flow
+    revoke_user_tokens(user["username"])
     
     return permissions 
\ No newline at end of file
@@ -0,0 +1,36 @@
+from typing import List
+from pydantic import TypeAdapter
+from app.schemas.announcement import AnnouncementResponse
+from app.schemas.attendance import ClassAttendanceSummary, MonthlyAttendanceSummary
+from app.schemas.exam import ExamResponse
+from app.schemas.student import StudentResponse
+
+# One TypeAdapter per type, shared by every caller; building one compiles its
+# validator and serializer, which is far too slow to repeat per request
+_adapters = {}
+
+def get_adapter(schema_type):
+    adapter = _adapters.get(schema_type)
+    if adapter is None:
+        adapter = _adapters[schema_type] = TypeAdapter(schema_type)
+    return adapter
+
+# Hot list types; their adapters are compiled by warm_adapters when the
+# server starts rather than on import or on their first request
+HOT_TYPES = {
+    "StudentListAdapter": List[StudentResponse],
+    "ExamListAdapter": List[ExamResponse],
+    "AnnouncementListAdapter": List[AnnouncementResponse],
+    "AttendanceSummaryListAdapter": List[MonthlyAttendanceSummary],
+    "ClassAttendanceAdapter": ClassAttendanceSummary
+}
+
+def warm_adapters():
+    for schema_type in HOT_TYPES.values():
+        get_adapter(schema_type)
+
+def __getattr__(name):
+    # StudentListAdapter and friends stay importable, built on first access
+    if name in HOT_TYPES:
+        return get_adapter(HOT_TYPES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,31 +1,48 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
-from bson import ObjectId
+from app.schemas.common import ObjectIdStr
 
 class AnnouncementCreate(BaseModel):
     title: str
     content: str
     link: Optional[str] = None
     link_text: Optional[str] = None
+    pinned: bool = False
+    publish_at: Optional[datetime] = None  # Hidden from the public site until this time
+    expires_at: Optional[datetime] = None  # Hidden from the public site from this time on
     
 class AnnouncementUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
     link: Optional[str] = None
     link_text: Optional[str] = None
+    pinned: Optional[bool] = None
+    publish_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
     
 class AnnouncementResponse(BaseModel):
-    id: str
+    id: ObjectIdStr
     title: str
     content: str
     link: Optional[str] = None
     link_text: Optional[str] = None
+    pinned: bool = False
+    publish_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
-    class Config:
-        arbitrary_types_allowed = True
-        json_encoders = {
-            ObjectId: str
-        } 
\ No newline at end of file
+
+# Compact form used by the landing page
+class AnnouncementSummary(BaseModel):
+    id: ObjectIdStr
+    title: str
+    content: str
+    link: Optional[str] = None
+    link_text: Optional[str] = None
+    pinned: bool = False
+    created_at: datetime
+
+class AnnouncementFeed(BaseModel):
+    items: List[AnnouncementResponse]
+    next_cursor: Optional[str] = None
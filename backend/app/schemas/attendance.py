@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict, StrictInt
+from typing import Optional, List, Literal
 from datetime import date
 from app.models.attendance import Month
+from app.schemas.common import ObjectIdStr
 
 class AttendanceBase(BaseModel):
     student_id: str
@@ -11,24 +12,41 @@ class AttendanceBase(BaseModel):
 class WorkingDaysUpdate(BaseModel):
     month: Month
     academic_year: str
-    working_days: int
+    working_days: StrictInt
 
 class AttendanceUpdate(BaseModel):
-    days_present: int
+    days_present: StrictInt
+
+class BulkAttendanceRow(BaseModel):
+    student_id: str
+    days_present: StrictInt
+
+class BulkAttendanceUpdate(BaseModel):
+    records: List[BulkAttendanceRow] = Field(..., min_length=1)
+
+class BulkAttendanceResult(BaseModel):
+    row: int
+    student_id: str
+    status: Literal["updated", "not_found", "invalid", "error"]
+    detail: Optional[str] = None
+
+class BulkAttendanceResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkAttendanceResult]
 
 class AttendanceCreate(AttendanceBase):
     working_days: int = 0
     days_present: int = 0
 
 class AttendanceResponse(AttendanceBase):
-    id: str
+    id: ObjectIdStr
     working_days: int
     days_present: int
     last_updated: date
     updated_by: str
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class MonthlyAttendanceSummary(BaseModel):
     student_id: str
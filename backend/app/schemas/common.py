@@ -0,0 +1,13 @@
+from typing import Annotated
+from bson import ObjectId
+from pydantic import BeforeValidator, StringConstraints
+
+def _object_id_to_str(value):
+    return str(value) if isinstance(value, ObjectId) else value
+
+# MongoDB ids are exposed as strings; raw ObjectIds are accepted and converted
+ObjectIdStr = Annotated[str, BeforeValidator(_object_id_to_str)]
+
+# Academic years are written as "2024-2025"
+ACADEMIC_YEAR_PATTERN = r"^\d{4}-\d{4}$"
+AcademicYear = Annotated[str, StringConstraints(pattern=ACADEMIC_YEAR_PATTERN)]
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict, StrictInt
 from typing import Dict, Optional, List
 from datetime import datetime
 from app.models.exam import ExamType
+from app.schemas.common import ObjectIdStr
 
 class ExamBase(BaseModel):
     student_id: str
@@ -10,23 +11,22 @@ class ExamBase(BaseModel):
     year: int
     group: str
     exam_type: ExamType
-    subjects: Dict[str, int]  # Subject name to marks
+    subjects: Dict[str, StrictInt]  # Subject name to marks
 
 class ExamCreate(ExamBase):
     pass
 
 class ExamUpdate(BaseModel):
-    subjects: Optional[Dict[str, int]] = None
+    subjects: Optional[Dict[str, StrictInt]] = None
     
 class ExamResponse(ExamBase):
-    id: str
+    id: ObjectIdStr
     total_marks: int
     percentage: float
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class StudentExamsSummary(BaseModel):
     student_id: str
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
-from bson import ObjectId
+from app.schemas.common import ObjectIdStr
 
 class FacultyCreate(BaseModel):
     name: str
@@ -18,17 +18,11 @@ class FacultyUpdate(BaseModel):
     experience: Optional[str] = None
     
 class FacultyResponse(BaseModel):
-    id: str
+    id: ObjectIdStr
     name: str
     position: str
     department: str
     education: str
     experience: str
     created_at: datetime
-    updated_at: Optional[datetime] = None
-    
-    class Config:
-        arbitrary_types_allowed = True
-        json_encoders = {
-            ObjectId: str
-        } 
\ No newline at end of file
+    updated_at: Optional[datetime] = None
\ No newline at end of file
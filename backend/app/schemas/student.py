@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List, Literal
 from datetime import date
 from app.models.student import Gender, Medium, Group
+from app.schemas.common import ObjectIdStr, AcademicYear
 
 class StudentBase(BaseModel):
     admission_number: str
@@ -20,6 +21,21 @@ class StudentBase(BaseModel):
 class StudentCreate(StudentBase):
     pass
 
+class BulkStudentCreate(BaseModel):
+    students: List[StudentCreate] = Field(..., min_length=1)
+
+class BulkStudentResult(BaseModel):
+    row: int
+    admission_number: str
+    status: Literal["created", "duplicate", "error"]
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+class BulkStudentResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkStudentResult]
+
 class StudentUpdate(BaseModel):
     admission_number: Optional[str] = None
     year: Optional[int] = None
@@ -35,9 +51,25 @@ class StudentUpdate(BaseModel):
     parent_phone: Optional[str] = None
 
 class StudentResponse(StudentBase):
-    id: str
+    id: ObjectIdStr
     created_at: date
     updated_at: Optional[date] = None
 
-    class Config:
-        orm_mode = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class RolloverRequest(BaseModel):
+    from_academic_year: AcademicYear  # e.g., "2023-2024"
+    to_academic_year: AcademicYear  # e.g., "2024-2025"
+    detained_student_ids: List[str] = []  # Students who repeat their current year
+    seed_attendance: bool = True
+    dry_run: bool = True
+
+class RolloverSummary(BaseModel):
+    from_academic_year: str
+    to_academic_year: str
+    dry_run: bool
+    promoted: int
+    graduated: int
+    detained: int
+    working_days_seeded: int
+    attendance_records_seeded: int
@@ -1,7 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional, Literal
 from datetime import datetime
-from bson import ObjectId
+from app.schemas.common import ObjectIdStr
 from app.models.user import UserRole
 
 class UserCreate(BaseModel):
@@ -10,6 +10,25 @@ class UserCreate(BaseModel):
     password: str
     role: UserRole = UserRole.STUDENT  # Default role is student
 
+# Bulk provisioning is meant for staff lists, so rows default to the staff role
+class BulkUserRow(UserCreate):
+    role: UserRole = UserRole.STAFF
+
+class BulkUserCreate(BaseModel):
+    users: List[BulkUserRow] = Field(..., min_length=1)
+
+class BulkUserResult(BaseModel):
+    row: int
+    username: str
+    status: Literal["created", "duplicate", "error"]
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+class BulkUserResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkUserResult]
+
 class UserLogin(BaseModel):
     username: str
     password: str
@@ -18,23 +37,24 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     role: UserRole
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # Access token lifetime in seconds
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     username: Optional[str] = None
     role: Optional[UserRole] = None
 
 class UserResponse(BaseModel):
-    id: Optional[str] = None
+    id: Optional[ObjectIdStr] = None
     username: str
     email: str
     role: UserRole
     created_at: datetime
 
-    class Config:
-        arbitrary_types_allowed = True
-        json_encoders = {
-            ObjectId: str
-        }
+    model_config = ConfigDict(from_attributes=True)
 
 class UpdateUserRole(BaseModel):
     role: UserRole
@@ -46,10 +66,4 @@ class UpdateUserPassword(BaseModel):
 class UserPermissions(BaseModel):
     can_add_student: bool = False
     can_edit_student: bool = False
-    can_delete_student: bool = False
-    
-    class Config:
-        arbitrary_types_allowed = True
-        json_encoders = {
-            ObjectId: str
-        } 
\ No newline at end of file
+    can_delete_student: bool = False 
\ No newline at end of file
@@ -4,14 +4,31 @@ from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from typing import Optional
-from config.settings import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_DELTA
+from uuid import uuid4
+from bson import ObjectId
+import time
+from config.settings import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_DELTA, USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_SIZE,
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_PROCESSES, REVOCATION_REFRESH_SECONDS
+)
 from app.schemas.user import TokenData
 from app.db.mongodb import users_collection
 from app.models.user import UserRole
+from app.utils.cache import TTLCache
+from app.services.password_pool import PasswordWorkerPool, PasswordProcessPool
+from app.services.revocation import RevocationList
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+password_pool = PasswordWorkerPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+bulk_password_pool = PasswordProcessPool(PASSWORD_HASH_PROCESSES)
+
+# Authenticated principals keyed by (username, token id)
+user_cache = TTLCache("auth_users", maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+# Tokens rejected before their expiry (role changes, password resets, deletions)
+revocation_list = RevocationList(REVOCATION_REFRESH_SECONDS, ACCESS_TOKEN_EXPIRE_DELTA)
 
 # Password verification
 def verify_password(plain_password, hashed_password):
@@ -21,17 +38,47 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# Async variants for request handlers; bcrypt runs on the password pool
+async def verify_password_async(plain_password, hashed_password):
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await password_pool.run(get_password_hash, password)
+
+# Hash a batch of passwords across the process pool, in input order
+async def get_password_hashes_bulk(passwords):
+    return await bulk_password_pool.hash_many(passwords)
+
 # User retrieval
 def get_user(username: str):
     user = users_collection.find_one({"username": username})
     return user
 
+# Cached user retrieval for authenticated requests; never holds password hashes
+def get_cached_user(username: str, token_id: Optional[str] = None):
+    key = (username, token_id)
+    user = user_cache.get(key, None)
+    if user is None:
+        user = users_collection.find_one({"username": username}, {"hashed_password": 0})
+        if user is not None:
+            user_cache.set(key, user)
+    return user
+
+# Drop every cached entry of a user after its role, password or existence changes
+def invalidate_cached_user(username: str):
+    user_cache.invalidate_where(lambda key: key[0] == username)
+
+# End every session of a user whose token claims no longer hold
+def revoke_user_tokens(username: str):
+    revocation_list.revoke_user(username)
+    invalidate_cached_user(username)
+
 # User authentication
-def authenticate_user(username: str, password: str):
+async def authenticate_user(username: str, password: str):
     user = get_user(username)
     if not user:
         return False
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password_async(password, user["hashed_password"]):
         return False
     return user
 
@@ -43,11 +90,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + ACCESS_TOKEN_EXPIRE_DELTA
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid4().hex)
+    to_encode.setdefault("type", "access")
+    # Sub-second issue time so revocations never catch tokens issued right after them
+    to_encode.setdefault("iat", time.time())
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# Get current user from token
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+# Claims carried by access tokens, so authorization needs no database lookup
+def user_token_claims(user, permissions=None):
+    claims = {
+        "sub": user["username"],
+        "role": user["role"],
+        "uid": str(user["_id"])
+    }
+    if permissions is not None:
+        claims["perms"] = permissions
+    return claims
+
+# Decode and validate an access token, including the revocation list
+def decode_access_token(token: str):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -58,17 +120,48 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        # Refresh tokens are only accepted by /token/refresh
+        if payload.get("type", "access") != "access":
+            raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = get_user(username=token_data.username)
-    if user is None:
+    if revocation_list.is_revoked(username, payload.get("jti"), payload.get("iat")):
         raise credentials_exception
+    return payload
+
+# Get current user from token
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    payload = decode_access_token(token)
+    token_data = TokenData(username=payload["sub"])
+    
+    user = get_cached_user(token_data.username, payload.get("jti"))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
+# Get the authenticated principal from the token claims alone
+async def get_current_principal(token: str = Depends(oauth2_scheme)):
+    payload = decode_access_token(token)
+    if "role" not in payload:
+        # Tokens issued before role claims existed still need the user document
+        return await get_current_user(token)
+    token_data = TokenData(username=payload["sub"], role=payload["role"])
+    principal = {
+        "_id": ObjectId(payload["uid"]) if payload.get("uid") else None,
+        "username": token_data.username,
+        "role": token_data.role
+    }
+    if "perms" in payload:
+        principal["permissions"] = payload["perms"]
+    return principal
+
 # Principal role check
-async def get_current_active_principal(current_user = Depends(get_current_user)):
+async def get_current_active_principal(current_user = Depends(get_current_principal)):
     if current_user["role"] != UserRole.PRINCIPAL:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -77,10 +170,10 @@ async def get_current_active_principal(current_user = Depends(get_current_user))
     return current_user
 
 # Staff role check (Staff or Principal roles allowed)
-async def get_current_active_staff(current_user = Depends(get_current_user)):
+async def get_current_active_staff(current_user = Depends(get_current_principal)):
     if current_user["role"] not in [UserRole.STAFF, UserRole.PRINCIPAL]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Staff or Principal role required"
         )
-    return current_user 
\ No newline at end of file
+    return current_user
@@ -0,0 +1,196 @@
+from datetime import date, datetime
+from app.db.mongodb import users_collection, students_collection, attendance_collection, exams_collection
+from app.models.user import UserRole
+from app.models.attendance import Month
+from app.utils.cache import TTLCache
+from config.settings import DASHBOARD_CACHE_TTL_SECONDS, DASHBOARD_CACHE_STALE_SECONDS
+
+dashboard_cache = TTLCache(
+    "dashboard",
+    maxsize=64,
+    ttl=DASHBOARD_CACHE_TTL_SECONDS,
+    stale_ttl=DASHBOARD_CACHE_STALE_SECONDS
+)
+
+# Overviews are keyed by a client-chosen threshold, so they get their own
+# cache and cannot push the dashboard totals out
+overview_cache = TTLCache(
+    "dashboard_overview",
+    maxsize=32,
+    ttl=DASHBOARD_CACHE_TTL_SECONDS,
+    stale_ttl=DASHBOARD_CACHE_STALE_SECONDS
+)
+
+# Academic years start in June, e.g. "2024-2025" runs from June 2024 to May 2025
+ACADEMIC_YEAR_START_MONTH = 6
+
+def current_academic_year(today=None):
+    today = today or date.today()
+    start = today.year if today.month >= ACADEMIC_YEAR_START_MONTH else today.year - 1
+    return f"{start}-{start + 1}"
+
+def current_month(today=None):
+    today = today or date.today()
+    return list(Month)[today.month - 1]
+
+def academic_year_bounds(academic_year):
+    """Datetime range covered by an academic year string such as "2024-2025" """
+    start_year = int(academic_year.split("-")[0])
+    return (
+        datetime(start_year, ACADEMIC_YEAR_START_MONTH, 1),
+        datetime(start_year + 1, ACADEMIC_YEAR_START_MONTH, 1)
+    )
+
+def _load_statistics():
+    return {
+        "total_students": students_collection.count_documents({}),
+        "total_staff": users_collection.count_documents({"role": UserRole.STAFF})
+    }
+
+# Cached dashboard totals
+def get_dashboard_statistics():
+    return dashboard_cache.get_or_load("statistics", _load_statistics)
+
+def _load_enrollment():
+    result = next(students_collection.aggregate([
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "by_class": [
+                {"$group": {
+                    "_id": {"year": "$year", "group": "$group", "medium": "$medium"},
+                    "count": {"$sum": 1}
+                }},
+                {"$sort": {"_id.year": 1, "_id.group": 1, "_id.medium": 1}}
+            ]
+        }}
+    ]), {"total": [], "by_class": []})
+
+    return {
+        "total_students": result["total"][0]["count"] if result["total"] else 0,
+        "by_class": [
+            {
+                "year": row["_id"].get("year"),
+                "group": row["_id"].get("group"),
+                "medium": row["_id"].get("medium"),
+                "count": row["count"]
+            }
+            for row in result["by_class"]
+        ]
+    }
+
+def _load_attendance(academic_year, month, threshold, total_students):
+    result = next(attendance_collection.aggregate([
+        {"$match": {"academic_year": academic_year, "month": month}},
+        {"$facet": {
+            "working_days": [
+                {"$match": {"student_id": {"$exists": False}}},
+                {"$project": {"_id": 0, "working_days": 1}}
+            ],
+            "summary": [
+                {"$match": {"student_id": {"$exists": True}}},
+                {"$group": {
+                    "_id": None,
+                    "records": {"$sum": 1},
+                    "average": {"$avg": "$attendance_percentage"},
+                    "below_threshold": {"$sum": {"$cond": [{"$lt": ["$attendance_percentage", threshold]}, 1, 0]}}
+                }}
+            ]
+        }}
+    ]), {"working_days": [], "summary": []})
+
+    working_days = result["working_days"][0].get("working_days", 0) if result["working_days"] else 0
+    summary = result["summary"][0] if result["summary"] else {"records": 0, "average": None, "below_threshold": 0}
+
+    # Match /attendance/low-attendance: nothing is low until working days are set,
+    # and students without a record count as 0% attendance
+    low_attendance = 0
+    if working_days > 0:
+        low_attendance = summary["below_threshold"] + max(total_students - summary["records"], 0)
+
+    return {
+        "working_days": working_days,
+        "records": summary["records"],
+        "average_percentage": round(summary["average"], 2) if summary["average"] is not None else 0.0,
+        "low_attendance_threshold": threshold,
+        "low_attendance_count": low_attendance
+    }
+
+def _load_exams(academic_year):
+    start, end = academic_year_bounds(academic_year)
+    result = next(exams_collection.aggregate([
+        {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+        {"$facet": {
+            "by_exam_type": [
+                {"$group": {
+                    "_id": "$exam_type",
+                    "average_percentage": {"$avg": "$percentage"},
+                    "students": {"$sum": 1},
+                    "latest_at": {"$max": "$created_at"}
+                }},
+                {"$sort": {"latest_at": -1}}
+            ],
+            "latest_by_group": [
+                {"$sort": {"created_at": -1}},
+                {"$group": {
+                    "_id": {"group": "$group", "exam_type": "$exam_type"},
+                    "average_percentage": {"$avg": "$percentage"},
+                    "students": {"$sum": 1},
+                    "latest_at": {"$first": "$created_at"}
+                }},
+                {"$sort": {"latest_at": -1}},
+                {"$group": {
+                    "_id": "$_id.group",
+                    "exam_type": {"$first": "$_id.exam_type"},
+                    "average_percentage": {"$first": "$average_percentage"},
+                    "students": {"$first": "$students"}
+                }},
+                {"$sort": {"_id": 1}}
+            ]
+        }}
+    ]), {"by_exam_type": [], "latest_by_group": []})
+
+    by_exam_type = [
+        {
+            "exam_type": row["_id"],
+            "average_percentage": round(row["average_percentage"] or 0, 2),
+            "students": row["students"]
+        }
+        for row in result["by_exam_type"]
+    ]
+    return {
+        "latest": by_exam_type[0] if by_exam_type else None,
+        "by_exam_type": by_exam_type,
+        "latest_by_group": [
+            {
+                "group": row["_id"],
+                "exam_type": row["exam_type"],
+                "average_percentage": round(row["average_percentage"] or 0, 2),
+                "students": row["students"]
+            }
+            for row in result["latest_by_group"]
+        ]
+    }
+
+def _load_overview(academic_year, month, threshold):
+    enrollment = _load_enrollment()
+    return {
+        "academic_year": academic_year,
+        "month": month,
+        "total_staff": users_collection.count_documents({"role": UserRole.STAFF}),
+        "enrollment": enrollment,
+        "attendance": _load_attendance(academic_year, month, threshold, enrollment["total_students"]),
+        "exams": _load_exams(academic_year),
+        "generated_at": datetime.utcnow()
+    }
+
+# Cached principal overview, keyed by academic year, month and threshold
+def get_principal_overview(academic_year, month, threshold):
+    return overview_cache.get_or_load(
+        (academic_year, month, threshold),
+        lambda: _load_overview(academic_year, month, threshold)
+    )
+
+# Called by student and user writes that change the totals
+def invalidate_dashboard_statistics():
+    dashboard_cache.invalidate()
+    overview_cache.invalidate()
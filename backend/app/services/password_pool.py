@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+# Same scheme as app.services.auth; kept here so worker processes only import this module
+_process_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _hash_password(password):
+    return _process_pwd_context.hash(password)
+
+class PasswordWorkerPool:
+    """Bounded pool of worker threads for bcrypt hashing and verification
+
+    bcrypt releases the GIL while it works, so running it on these threads
+    keeps the event loop free to serve other requests. Callers beyond
+    ``max_queue`` waiting jobs are rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password operations, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self.queued += 1
+        submitted_at = time.perf_counter()
+        # Set under the lock by whichever comes first: the job starting, or the
+        # waiter giving up on a job that never started, so queued drops once
+        state = {"claimed": False}
+
+        def job():
+            started_at = time.perf_counter()
+            wait = started_at - submitted_at
+            with self._lock:
+                if state["claimed"]:
+                    return None
+                state["claimed"] = True
+                self.queued -= 1
+                self.running += 1
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.total_run_seconds += time.perf_counter() - started_at
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            # A cancelled waiter (client disconnect, timeout) may leave its job queued
+            with self._lock:
+                if not state["claimed"]:
+                    state["claimed"] = True
+                    self.queued -= 1
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "average_wait_ms": round(self.total_wait_seconds / completed * 1000, 2),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+                "average_run_ms": round(self.total_run_seconds / completed * 1000, 2)
+            }
+
+
+class PasswordProcessPool:
+    """Process pool for hashing many passwords at once, such as bulk provisioning
+
+    Started on first use so single-account requests never pay for the
+    worker processes.
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self._executor = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.hashed = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Imported here: multiprocessing is only needed once a bulk job runs
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            return self._executor
+
+    async def hash_many(self, passwords):
+        if not passwords:
+            return []
+        executor = self._get_executor()
+        chunksize = max(1, len(passwords) // (self.processes * 4))
+        hashes = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: list(executor.map(_hash_password, passwords, chunksize=chunksize))
+        )
+        with self._lock:
+            self.batches += 1
+            self.hashed += len(hashes)
+        return hashes
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "started": self._executor is not None,
+                "batches": self.batches,
+                "hashed": self.hashed
+            }
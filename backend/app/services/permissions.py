@@ -0,0 +1,47 @@
+from fastapi import Depends, HTTPException, status
+from app.db.mongodb import permissions_collection
+from app.models.user import UserRole
+from app.services.auth import get_current_active_staff
+from app.utils.cache import TTLCache
+from config.settings import PERMISSIONS_CACHE_TTL_SECONDS
+
+# Fine-grained capabilities a principal can grant to staff
+STAFF_PERMISSIONS = ("can_add_student", "can_edit_student", "can_delete_student")
+
+permissions_cache = TTLCache("permissions", maxsize=1024, ttl=PERMISSIONS_CACHE_TTL_SECONDS)
+
+def load_permissions(user_id: str):
+    """Read a user's permissions from MongoDB; missing permissions are denied"""
+    permissions = permissions_collection.find_one({"user_id": user_id}) or {}
+    return {name: permissions.get(name, False) for name in STAFF_PERMISSIONS}
+
+def get_permissions(user_id: str):
+    return permissions_cache.get_or_load(user_id, lambda: load_permissions(user_id))
+
+def invalidate_permissions(user_id: str):
+    permissions_cache.invalidate(user_id)
+
+def granted_permissions(permissions):
+    """Names of the granted permissions, as embedded in access tokens"""
+    return [name for name in STAFF_PERMISSIONS if permissions.get(name)]
+
+# Dependency factory enforcing a staff permission; principals hold every permission
+def require_permission(permission: str):
+    async def check_permission(current_user = Depends(get_current_active_staff)):
+        if current_user["role"] == UserRole.PRINCIPAL:
+            return current_user
+        
+        granted = current_user.get("permissions")
+        if granted is None:
+            # Token without embedded permissions: use the cache
+            allowed = get_permissions(str(current_user["_id"])).get(permission, False)
+        else:
+            allowed = permission in granted
+        
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission '{permission}' required"
+            )
+        return current_user
+    return check_permission
@@ -0,0 +1,127 @@
+import cProfile
+import io
+import marshal
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import parse_qs
+from uuid import uuid4
+from fastapi import HTTPException
+from app.models.user import UserRole
+from app.services.auth import decode_access_token
+from config.settings import PROFILE_HISTORY_SIZE
+
+# Lines of the text report kept per profile
+PROFILE_REPORT_LINES = 60
+
+class ProfileStore:
+    """The most recent request profiles, keyed by profile id"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > self.maxsize:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def recent(self):
+        """Summaries of the stored profiles, newest first"""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [
+            {key: value for key, value in profile.items() if key not in ("report", "stats")}
+            for profile in reversed(profiles)
+        ]
+
+profile_store = ProfileStore(PROFILE_HISTORY_SIZE)
+
+def _profiling_requested(scope):
+    """Cheap check for the X-Profile header or a profile=1 query flag"""
+    for name, value in scope["headers"]:
+        if name == b"x-profile" and value not in (b"", b"0", b"false"):
+            return True
+    query_string = scope.get("query_string", b"")
+    return b"profile=" in query_string and parse_qs(query_string.decode()).get("profile", ["0"])[0] not in ("", "0", "false")
+
+def _requested_by_principal(scope):
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode().partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            try:
+                payload = decode_access_token(token)
+            except HTTPException:
+                return False
+            return payload.get("role") == UserRole.PRINCIPAL
+    return False
+
+def _report(profiler):
+    # Only needed once a profiled request finishes, so kept out of app import
+    import pstats
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_REPORT_LINES)
+    return stream.getvalue(), marshal.dumps(stats.stats)
+
+class ProfilingMiddleware:
+    """Runs cProfile around requests that ask for it, for principals only
+
+    Requests without the X-Profile header or profile query flag pass straight
+    through. The profile id is returned in the X-Profile-Id header and the
+    report is kept in ``profile_store``. cProfile sees the whole event loop
+    thread, so requests served concurrently show up in the same profile; only
+    one profile runs at a time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._running = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profiling_requested(scope) or not _requested_by_principal(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._running.acquire(blocking=False):
+            # Another request is being profiled; serve this one normally
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid4().hex
+        state = {"status": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            self._running.release()
+            report, stats = _report(profiler)
+            profile_store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": state["status"],
+                "duration_ms": round(elapsed * 1000, 2),
+                "created_at": datetime.utcnow(),
+                "report": report,
+                "stats": stats
+            })
@@ -0,0 +1,81 @@
+import threading
+import time
+from datetime import datetime
+from app.db.mongodb import revocations_collection
+
+class RevocationList:
+    """Denylist of access tokens, mirrored in process
+
+    A user revocation rejects every token of that user issued before it, which
+    covers role changes, password resets and deletions. A token revocation
+    rejects a single token id. The local copy is re-read from MongoDB every
+    ``refresh_interval`` seconds so revocations made by other workers apply
+    within that interval; revocations made by this worker apply immediately.
+    """
+
+    def __init__(self, refresh_interval, token_lifetime):
+        self.refresh_interval = refresh_interval
+        self.token_lifetime = token_lifetime
+        self._users = {}  # username -> epoch seconds before which tokens are rejected
+        self._tokens = {}  # token id -> when its revocation can be forgotten
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _refresh_if_due(self):
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self.refresh_interval:
+            return
+        users = {}
+        tokens = {}
+        for revocation in revocations_collection.find({"expires_at": {"$gt": datetime.utcnow()}}):
+            if "username" in revocation:
+                users[revocation["username"]] = revocation["not_before"]
+            elif "jti" in revocation:
+                tokens[revocation["jti"]] = revocation["expires_at"]
+        # Merge rather than replace: a revocation made here while the snapshot
+        # was read may be missing from it. Local entries are kept until the
+        # tokens they cover have expired
+        oldest_live_token = time.time() - self.token_lifetime.total_seconds()
+        utcnow = datetime.utcnow()
+        with self._lock:
+            for username, not_before in self._users.items():
+                if not_before > oldest_live_token:
+                    users[username] = max(users.get(username, not_before), not_before)
+            for token_id, expires_at in self._tokens.items():
+                if expires_at > utcnow:
+                    tokens.setdefault(token_id, expires_at)
+            self._users = users
+            self._tokens = tokens
+            self._loaded_at = now
+
+    def is_revoked(self, username, token_id, issued_at):
+        self._refresh_if_due()
+        if token_id is not None and token_id in self._tokens:
+            return True
+        not_before = self._users.get(username)
+        return not_before is not None and (issued_at is None or issued_at < not_before)
+
+    def revoke_user(self, username):
+        """Reject every token issued to ``username`` up to now"""
+        not_before = time.time()
+        revocations_collection.update_one(
+            {"_id": f"user:{username}"},
+            {"$set": {
+                "username": username,
+                "not_before": not_before,
+                "expires_at": datetime.utcnow() + self.token_lifetime
+            }},
+            upsert=True
+        )
+        with self._lock:
+            self._users[username] = not_before
+
+    def revoke_token(self, token_id, expires_at):
+        """Reject a single token id until it expires"""
+        revocations_collection.update_one(
+            {"_id": f"jti:{token_id}"},
+            {"$set": {"jti": token_id, "expires_at": expires_at}},
+            upsert=True
+        )
+        with self._lock:
+            self._tokens[token_id] = expires_at
@@ -0,0 +1,216 @@
+import threading
+import time
+from app.db.mongodb import students_collection, counters_collection
+from config.settings import (
+    STUDENTS_COLLECTION, ROSTER_REPLICA_ENABLED, ROSTER_REPLICA_POLL_SECONDS, ROSTER_REPLICA_MAX_LAG_SECONDS,
+    STREAM_BATCH_SIZE
+)
+
+# Stored student fields, in the order they are kept on each record
+ROSTER_FIELDS = (
+    "_id", "admission_number", "year", "group", "medium", "name", "father_name", "date_of_birth",
+    "caste", "gender", "aadhar_number", "student_phone", "parent_phone", "created_at", "updated_at", "version"
+)
+
+class RosterRecord:
+    """One student, held in slots instead of a per-document dict"""
+    __slots__ = ROSTER_FIELDS
+
+    def __init__(self, document):
+        for field in ROSTER_FIELDS:
+            setattr(self, field, document.get(field))
+
+    def as_document(self):
+        """A fresh dict shaped like the MongoDB document, safe for callers to mutate"""
+        document = {field: getattr(self, field) for field in ROSTER_FIELDS}
+        if document["version"] is None:
+            del document["version"]
+        return document
+
+def _key_part(value):
+    # Enum query parameters hash by member name, stored values are plain strings
+    return getattr(value, "value", value)
+
+class RosterReplica:
+    """In-process copy of the students collection for roster queries
+
+    Records are indexed by (year, group, medium) and by admission number.
+    A daemon thread polls the students change counter, which every student
+    write bumps, and reloads the whole roster when it moves. ``find``
+    returns None whenever the copy may be behind, so callers fall back to
+    MongoDB; writes in this process mark it stale until the next reload.
+    """
+
+    def __init__(self, poll_interval, max_lag):
+        self.poll_interval = poll_interval
+        self.max_lag = max_lag
+        self._by_class = {}  # (year, group, medium) -> records in _id order
+        self._by_admission_number = {}
+        self._version = None
+        self._checked_at = None
+        self._stale = True
+        self._stale_generation = 0  # bumped by mark_stale, so a reload can tell it raced a write
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = 0
+        self.served = 0
+        self.fallbacks = 0
+
+    def _counter_version(self):
+        counter = counters_collection.find_one({"_id": STUDENTS_COLLECTION})
+        return counter.get("version", 0) if counter else 0
+
+    def _reload(self, version):
+        with self._lock:
+            generation = self._stale_generation
+        by_class = {}
+        by_admission_number = {}
+        for document in students_collection.find().sort("_id", 1):
+            record = RosterRecord(document)
+            by_class.setdefault((record.year, record.group, record.medium), []).append(record)
+            by_admission_number[record.admission_number] = record
+        with self._lock:
+            self._by_class = by_class
+            self._by_admission_number = by_admission_number
+            self._version = version
+            # A write marked during the scan may be missing from it
+            self._stale = self._stale_generation != generation
+            self.reloads += 1
+
+    def poll(self):
+        """Reload if the students counter moved since the last load"""
+        # Read the counter first: a write during the reload moves it again
+        version = self._counter_version()
+        if version != self._version or self._stale:
+            self._reload(version)
+        with self._lock:
+            self._checked_at = time.monotonic()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                # Keep serving from MongoDB until polling recovers
+                print(f"Roster replica poll failed: {str(e)}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="roster-replica", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop polling and wait for a poll in progress, so none runs after the client closes"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def mark_stale(self):
+        with self._lock:
+            self._stale = True
+            self._stale_generation += 1
+
+    def is_current(self):
+        return (
+            not self._stale
+            and self._checked_at is not None
+            and time.monotonic() - self._checked_at < self.max_lag
+        )
+
+    def _records(self, year, group, medium):
+        # Caller holds the lock; the per-class lists are replaced on reload, never mutated
+        wanted = (year, _key_part(group), _key_part(medium))
+        if None not in wanted:
+            return self._by_class.get(wanted, ())
+        records = []
+        for key, members in self._by_class.items():
+            if all(part is None or part == key_part for part, key_part in zip(wanted, key)):
+                records.extend(members)
+        records.sort(key=lambda record: record._id)
+        return records
+
+    def records(self, year=None, group=None, medium=None, version=None):
+        """Matching records in _id order, not copied to documents, or None when the copy is not current
+
+        With ``version``, only a copy loaded at that students counter is
+        current, so a body matches the ETag built from the same counter.
+        """
+        with self._lock:
+            if not self.is_current() or (version is not None and version != self._version):
+                self.fallbacks += 1
+                return None
+            self.served += 1
+            return self._records(year, group, medium)
+
+    def find(self, year=None, group=None, medium=None, skip=0, limit=0, version=None):
+        """Student documents matching the filters in _id order, or None when the copy is not current"""
+        records = self.records(year, group, medium, version)
+        if records is None:
+            return None
+        # Like MongoDB, a limit of 0 means no limit
+        records = records[skip:skip + limit] if limit else records[skip:]
+        return [record.as_document() for record in records]
+
+    def find_by_admission_number(self, admission_number):
+        """Student document with this admission number; None if absent or not current"""
+        with self._lock:
+            if not self.is_current():
+                return None
+            record = self._by_admission_number.get(admission_number)
+        return record.as_document() if record else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self._thread is not None,
+                "current": self.is_current(),
+                "students": sum(len(members) for members in self._by_class.values()),
+                "classes": len(self._by_class),
+                "version": self._version,
+                "reloads": self.reloads,
+                "served": self.served,
+                "fallbacks": self.fallbacks
+            }
+
+roster_replica = RosterReplica(ROSTER_REPLICA_POLL_SECONDS, ROSTER_REPLICA_MAX_LAG_SECONDS)
+
+def _roster_query(year, group, medium):
+    query = {}
+    if year is not None:
+        query["year"] = year
+    if group is not None:
+        query["group"] = group
+    if medium is not None:
+        query["medium"] = medium
+    return query
+
+def find_roster(year=None, group=None, medium=None, skip=0, limit=0, version=None):
+    """Students matching the filters, from the replica when enabled and current, else from MongoDB
+
+    ``version`` is the students counter a response's ETag was built from;
+    the replica is only used when it was loaded at that counter.
+    """
+    if ROSTER_REPLICA_ENABLED:
+        students = roster_replica.find(year, group, medium, skip, limit, version)
+        if students is not None:
+            return students
+    # Same _id order as the replica, so paging stays consistent when it falls back
+    return list(students_collection.find(_roster_query(year, group, medium)).sort("_id", 1).skip(skip).limit(limit))
+
+def iter_roster(year=None, group=None, medium=None, projection=None, version=None):
+    """Like find_roster, but yields the students one at a time
+
+    Replica records become documents only as they are consumed; MongoDB is
+    read through a cursor fetching STREAM_BATCH_SIZE documents per round
+    trip. ``projection`` only applies to the MongoDB path; ``version`` is
+    as for find_roster.
+    """
+    if ROSTER_REPLICA_ENABLED:
+        records = roster_replica.records(year, group, medium, version)
+        if records is not None:
+            return (record.as_document() for record in records)
+    return students_collection.find(_roster_query(year, group, medium), projection).batch_size(STREAM_BATCH_SIZE)
@@ -0,0 +1,137 @@
+from datetime import datetime
+from uuid import uuid4
+from fastapi import HTTPException, status
+from jose import jwt, JWTError
+from app.db.mongodb import refresh_tokens_collection, users_collection
+from app.models.user import UserRole
+from app.services.auth import create_access_token, user_token_claims
+from app.services.permissions import load_permissions, granted_permissions
+from config.settings import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_DELTA, REFRESH_TOKEN_IDLE_DELTA, SESSION_MAX_AGE_DELTA,
+    REFRESH_TOKEN_REUSE_GRACE_DELTA, EMBED_PERMISSIONS_IN_TOKEN
+)
+
+def _invalid_refresh_token():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _sign_refresh_token(stored):
+    return jwt.encode(
+        {
+            "sub": stored["username"], "jti": stored["_id"], "fam": stored["family"], "type": "refresh",
+            "exp": stored["expires_at"]
+        },
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+
+def _issue_refresh_token(username, family, session_expires_at, token_id=None):
+    """Store and sign a new refresh token; every rotation slides the idle window"""
+    now = datetime.utcnow()
+    stored = {
+        "_id": token_id or uuid4().hex,
+        "family": family,
+        "username": username,
+        "used": False,
+        "created_at": now,
+        "expires_at": min(now + REFRESH_TOKEN_IDLE_DELTA, session_expires_at),
+        "session_expires_at": session_expires_at
+    }
+    refresh_tokens_collection.insert_one(stored)
+    return _sign_refresh_token(stored)
+
+def _token_response(user, refresh_token):
+    permissions = None
+    if EMBED_PERMISSIONS_IN_TOKEN and user["role"] == UserRole.STAFF:
+        # Read fresh rather than cached: this runs once per login or renewal
+        permissions = granted_permissions(load_permissions(str(user["_id"])))
+    
+    return {
+        "access_token": create_access_token(
+            data=user_token_claims(user, permissions),
+            expires_delta=ACCESS_TOKEN_EXPIRE_DELTA
+        ),
+        "token_type": "bearer",
+        "role": user["role"],
+        "refresh_token": refresh_token,
+        "expires_in": int(ACCESS_TOKEN_EXPIRE_DELTA.total_seconds())
+    }
+
+# Start a session after a successful password login
+def start_session(user):
+    session_expires_at = datetime.utcnow() + SESSION_MAX_AGE_DELTA
+    refresh_token = _issue_refresh_token(user["username"], uuid4().hex, session_expires_at)
+    return _token_response(user, refresh_token)
+
+def _decode_refresh_token(refresh_token):
+    try:
+        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise _invalid_refresh_token()
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fam"):
+        raise _invalid_refresh_token()
+    return payload
+
+def _replayed_session(payload, now):
+    """Token pair for a rotated refresh token presented again within the grace window, else None"""
+    stored = refresh_tokens_collection.find_one({"_id": payload["jti"], "used": True})
+    if stored is None:
+        return None
+    if not stored.get("used_at") or now - stored["used_at"] > REFRESH_TOKEN_REUSE_GRACE_DELTA:
+        # A rotated token was presented again, so it has leaked: end the whole session
+        end_session_family(payload["fam"])
+        return None
+    # The successor is only handed out again while nobody has used it
+    successor = refresh_tokens_collection.find_one(
+        {"_id": stored.get("successor"), "used": False, "expires_at": {"$gt": now}}
+    )
+    if successor is None:
+        return None
+    user = users_collection.find_one({"username": successor["username"]}, {"hashed_password": 0})
+    if user is None:
+        return None
+    return _token_response(user, _sign_refresh_token(successor))
+
+# Exchange a refresh token for a new token pair without verifying the password
+def rotate_session(refresh_token):
+    payload = _decode_refresh_token(refresh_token)
+    now = datetime.utcnow()
+
+    # Atomically consume the token so it can be used exactly once, recording
+    # its successor so a replay within the grace window can be answered
+    successor_id = uuid4().hex
+    stored = refresh_tokens_collection.find_one_and_update(
+        {"_id": payload["jti"], "used": False, "expires_at": {"$gt": now}},
+        {"$set": {"used": True, "used_at": now, "successor": successor_id}}
+    )
+    if stored is None:
+        replayed = _replayed_session(payload, now)
+        if replayed is None:
+            raise _invalid_refresh_token()
+        return replayed
+
+    # Re-read the user so role changes and deletions apply at renewal
+    user = users_collection.find_one({"username": stored["username"]}, {"hashed_password": 0})
+    if user is None:
+        end_session_family(stored["family"])
+        raise _invalid_refresh_token()
+
+    new_refresh_token = _issue_refresh_token(
+        user["username"], stored["family"], stored["session_expires_at"], token_id=successor_id
+    )
+    return _token_response(user, new_refresh_token)
+
+def end_session_family(family):
+    refresh_tokens_collection.update_many({"family": family, "used": False}, {"$set": {"used": True}})
+
+# End every session of a user, e.g. after a password reset
+def end_user_sessions(username):
+    refresh_tokens_collection.update_many({"username": username, "used": False}, {"$set": {"used": True}})
+
+# Log out: the refresh token and its rotations stop working
+def end_session(refresh_token):
+    payload = _decode_refresh_token(refresh_token)
+    end_session_family(payload["fam"])
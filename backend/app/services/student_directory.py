@@ -0,0 +1,67 @@
+from typing import NamedTuple
+from bson import ObjectId
+from app.db.mongodb import students_collection
+from app.utils.cache import TTLCache
+from config.settings import STUDENT_DIRECTORY_TTL_SECONDS, STUDENT_DIRECTORY_MAX_SIZE
+
+class StudentEntry(NamedTuple):
+    """The few student fields the attendance and exam paths need"""
+    name: str
+    admission_number: str
+    group: str
+    year: int
+
+DIRECTORY_PROJECTION = {"name": 1, "admission_number": 1, "group": 1, "year": 1}
+
+# Keyed by the student id string; unknown ids are not cached, so new students
+# are visible immediately
+student_directory = TTLCache(
+    "student_directory",
+    maxsize=STUDENT_DIRECTORY_MAX_SIZE,
+    ttl=STUDENT_DIRECTORY_TTL_SECONDS
+)
+
+def _entry(student):
+    # Legacy documents may lack fields; one of them must not fail a whole batch
+    return StudentEntry(
+        student.get("name", ""),
+        student.get("admission_number", ""),
+        student.get("group", ""),
+        student.get("year")
+    )
+
+def get_student_entry(student_id: str):
+    """Directory entry of a student, or None when the student does not exist"""
+    entry = student_directory.get(student_id, None)
+    if entry is None:
+        student = students_collection.find_one({"_id": ObjectId(student_id)}, DIRECTORY_PROJECTION)
+        if student is None:
+            return None
+        entry = _entry(student)
+        student_directory.set(student_id, entry)
+    return entry
+
+def get_student_entries(student_ids):
+    """Directory entries of the given students that exist, keyed by id, with one query for the misses"""
+    entries = {}
+    missing = []
+    for student_id in student_ids:
+        entry = student_directory.get(student_id, None)
+        if entry is None:
+            missing.append(ObjectId(student_id))
+        else:
+            entries[student_id] = entry
+    
+    if missing:
+        for student in students_collection.find({"_id": {"$in": missing}}, DIRECTORY_PROJECTION):
+            student_id = str(student["_id"])
+            entries[student_id] = _entry(student)
+            student_directory.set(student_id, entries[student_id])
+    return entries
+
+# Drop one student after a write, or everyone after a bulk change such as a rollover
+def invalidate_student_directory(student_id: str = None):
+    if student_id is None:
+        student_directory.invalidate()
+    else:
+        student_directory.invalidate(student_id)
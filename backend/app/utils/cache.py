@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel returned by TTLCache.get when a key is absent or expired
+MISSING = object()
+
+# Every cache registers itself here so its statistics can be reported
+_caches = {}
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after a TTL
+
+    Entries older than ``ttl`` but younger than ``ttl + stale_ttl`` are served
+    stale by ``get_or_load`` while a background thread reloads them.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=60, stale_ttl=0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches[name] = self
+
+    def _lookup(self, key, now):
+        """Return (value, is_stale) or (MISSING, False); caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING, False
+        value, expires_at = entry
+        if now < expires_at:
+            self._entries.move_to_end(key)
+            return value, False
+        if now < expires_at + self.stale_ttl:
+            return value, True
+        del self._entries[key]
+        return MISSING, False
+
+    def get(self, key, default=MISSING):
+        """Return a fresh cached value, or ``default``"""
+        with self._lock:
+            value, is_stale = self._lookup(key, time.monotonic())
+            if value is MISSING or is_stale:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._put(key, value, ttl)
+
+    def _put(self, key, value, ttl=None):
+        """Insert an entry and evict the least recently used; caller holds the lock"""
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss"""
+        with self._lock:
+            value, is_stale = self._lookup(key, time.monotonic())
+            if value is not MISSING and not is_stale:
+                self.hits += 1
+                return value
+            if is_stale:
+                self.stale_hits += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(
+                        target=self._refresh, args=(key, loader, self._generation), daemon=True
+                    ).start()
+                return value
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        self._store_if_current(key, value, generation)
+        return value
+
+    def _refresh(self, key, loader, generation):
+        try:
+            self._store_if_current(key, loader(), generation)
+        except Exception:
+            # Keep serving the stale value; the next miss reloads synchronously
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store_if_current(self, key, value, generation):
+        # A load that raced with an invalidation must not repopulate old data
+        with self._lock:
+            if generation == self._generation:
+                self._put(key, value)
+
+    def invalidate(self, key=MISSING):
+        """Drop one key, or every entry when no key is given"""
+        with self._lock:
+            self._generation += 1
+            if key is MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Drop every entry whose key satisfies ``predicate(key)``"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+def cache_stats():
+    """Statistics for every cache created in this process"""
+    return [cache.stats() for cache in _caches.values()]
@@ -0,0 +1,87 @@
+import hashlib
+from typing import Optional
+from bson import ObjectId
+from fastapi import Response, status
+from app.db.mongodb import counters_collection
+
+# Collection-level change counters
+def bump_collection_version(*collection_names):
+    """Increment the change counter of each collection after a write"""
+    for name in collection_names:
+        counters_collection.update_one(
+            {"_id": name},
+            {"$inc": {"version": 1}},
+            upsert=True
+        )
+
+def get_collection_versions(*collection_names):
+    """Return the change counters of the given collections, in the order given"""
+    versions = {
+        counter["_id"]: counter.get("version", 0)
+        for counter in counters_collection.find({"_id": {"$in": list(collection_names)}})
+    }
+    return tuple(versions.get(name, 0) for name in collection_names)
+
+# ETag construction
+def make_etag(*parts):
+    """Build a strong ETag from the given parts"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def document_etag(document):
+    """ETag of a single document: its id and version counter, read back by if_match_query"""
+    return f'"{document["_id"]}.{document.get("version", 0)}"'
+
+def versions_etag(collection_names, versions, **params):
+    """ETag of a listing from counters the caller already read, e.g. to serve the body at the same versions"""
+    return make_etag(*collection_names, *versions, *sorted(params.items()))
+
+def collection_etag(*collection_names, **params):
+    """ETag of a listing, derived from collection counters and the query parameters"""
+    return versions_etag(collection_names, get_collection_versions(*collection_names), **params)
+
+
+# Conditional request handling
+def _parse_etags(header_value):
+    return [tag.strip() for tag in header_value.split(",") if tag.strip()]
+
+def etag_matches(if_none_match: Optional[str], etag):
+    """Weak comparison used for If-None-Match"""
+    if not if_none_match:
+        return False
+    tags = _parse_etags(if_none_match)
+    if "*" in tags:
+        return True
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+def not_modified(etag):
+    """304 response returned before any response body is built"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+def set_etag(response: Response, etag):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def if_match_query(query, if_match: Optional[str]):
+    """Narrow a write filter to the document versions listed in If-Match
+
+    Document ETags carry the id and version, so the precondition is checked by
+    the write itself and needs no read before it. A write that matches nothing
+    under If-Match failed its precondition, unless the document is gone.
+    """
+    if not if_match:
+        return query
+    tags = _parse_etags(if_match)
+    if "*" in tags:
+        return query
+    held = []
+    for tag in tags:
+        object_id, _, version = tag.strip('"').rpartition(".")
+        if ObjectId.is_valid(object_id) and version.isdigit():
+            # Documents written before versioning have no version field, which matches None
+            held.append({"_id": ObjectId(object_id), "version": int(version) or None})
+    return {"$and": [query, {"$or": held or [{"_id": {"$in": []}}]}]}
+
+def precondition_failed(collection, object_id):
+    """Whether a conditional write missed because the document changed, rather than disappeared"""
+    return collection.count_documents({"_id": object_id}, limit=1) > 0
@@ -0,0 +1,81 @@
+import json
+from datetime import date, datetime
+from typing import Any, List, get_args, get_origin
+from fastapi import Response
+from pydantic import BaseModel
+from app.schemas.adapters import get_adapter
+from config.settings import FAST_JSON_RESPONSES
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; without it trusted payloads go through the TypeAdapter path
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+def _orjson_default(value):
+    # ObjectId and anything else orjson has no native encoding for
+    return str(value)
+
+def _json_default(value):
+    # The standard library fallback of ``dumps``: dates as ISO strings like pydantic
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def dumps(content: Any) -> bytes:
+    """Encode already-shaped content (dicts, lists, enums, dates, ObjectIds) as JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_json_default, separators=(",", ":")).encode()
+
+def shape_document(model, document):
+    """Keep only the model's fields, filling defaults, as response_model would"""
+    return {
+        name: document.get(name, None if field.is_required() else field.default)
+        for name, field in model.model_fields.items()
+    }
+
+def _trusted_model(response_type):
+    """Model whose fields shape a trusted payload: ``Model`` or ``List[Model]``, else None"""
+    if get_origin(response_type) in (list, List):
+        (response_type,) = get_args(response_type)
+    if isinstance(response_type, type) and issubclass(response_type, BaseModel):
+        return response_type
+    return None
+
+def render_json(response_type, content: Any, trusted: bool = False) -> bytes:
+    """Serialize ``content`` as ``response_type``
+
+    Trusted content (documents this API wrote and handlers shaped) is only
+    trimmed to the model fields and encoded by orjson, skipping validation.
+    Anything else is validated in one TypeAdapter call and dumped by
+    pydantic-core.
+    """
+    model = _trusted_model(response_type) if trusted and orjson is not None else None
+    if model is not None:
+        if isinstance(content, list):
+            content = [shape_document(model, item) for item in content]
+        else:
+            content = shape_document(model, content)
+        return dumps(content)
+    adapter = get_adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(content))
+
+def fast_json_response(response_type, content: Any, response: Response = None, trusted: bool = False):
+    """Return ``content`` through the fast path, or unchanged when it is disabled
+
+    Handlers keep their ``response_model`` for the OpenAPI schema; FastAPI
+    skips it for Response objects. Headers set on the injected ``response``
+    (ETag, Cache-Control) are carried over.
+    """
+    if not FAST_JSON_RESPONSES:
+        return content
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(
+        content=render_json(response_type, content, trusted),
+        media_type="application/json",
+        headers=headers
+    )
@@ -0,0 +1,44 @@
+import hashlib
+import json
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from app.utils.cache import TTLCache
+from app.utils.etag import etag_matches, not_modified
+from config.settings import PUBLIC_CACHE_TTL_SECONDS, PUBLIC_CACHE_MAX_AGE_SECONDS
+
+public_response_cache = TTLCache("public_responses", maxsize=256, ttl=PUBLIC_CACHE_TTL_SECONDS)
+
+class CachedBody:
+    """A JSON response body serialized once, with its ETag"""
+    __slots__ = ("body", "etag")
+
+    def __init__(self, content):
+        # Same encoding FastAPI's JSONResponse applies to a returned value
+        self.body = json.dumps(
+            jsonable_encoder(content),
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:32] + '"'
+
+def cached_json_response(key, loader, if_none_match=None):
+    """Serve ``loader()`` from the public response cache
+
+    ``key`` is a tuple whose first item names the router, so writes can
+    invalidate everything that router cached.
+    """
+    cached = public_response_cache.get_or_load(key, lambda: CachedBody(loader()))
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": f"public, max-age={PUBLIC_CACHE_MAX_AGE_SECONDS}"
+    }
+    if etag_matches(if_none_match, cached.etag):
+        response = not_modified(cached.etag)
+        response.headers.update(headers)
+        return response
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+def invalidate_public_cache(namespace):
+    public_response_cache.invalidate_where(lambda key: key[0] == namespace)
@@ -0,0 +1,127 @@
+import threading
+import tracemalloc
+from app.utils.metrics import route_template
+
+# Allocation sites reported per route
+TOP_ALLOCATION_SITES = 10
+
+# Frames of tracemalloc itself and of this module are not interesting sites
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+class MemoryDiagnostics:
+    """Peak Python allocation per route template, recorded while tracemalloc runs
+
+    Tracing slows every request down, so it only runs between ``start`` and
+    ``stop``. The peak of a request is measured from its start; requests
+    served concurrently share the interpreter-wide peak, so run diagnostics
+    on a quiet worker for exact numbers. When a request sets a new peak for
+    its route, the allocation sites that grew between its start and its
+    response are kept as that route's top sites.
+    """
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+    def record(self, route, peak_bytes, top_sites):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "requests": 0, "total_peak_bytes": 0, "max_peak_bytes": 0, "top_allocations": []
+                }
+            entry["requests"] += 1
+            entry["total_peak_bytes"] += peak_bytes
+            if peak_bytes >= entry["max_peak_bytes"]:
+                entry["max_peak_bytes"] = peak_bytes
+                if top_sites is not None:
+                    entry["top_allocations"] = top_sites
+
+    def max_peak(self, route):
+        with self._lock:
+            entry = self._routes.get(route)
+            return entry["max_peak_bytes"] if entry else 0
+
+    def report(self):
+        """Routes by largest peak first"""
+        with self._lock:
+            routes = [
+                {
+                    "route": route,
+                    "requests": entry["requests"],
+                    "max_peak_bytes": entry["max_peak_bytes"],
+                    "average_peak_bytes": entry["total_peak_bytes"] // entry["requests"],
+                    "top_allocations": entry["top_allocations"]
+                }
+                for route, entry in self._routes.items()
+            ]
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traced_bytes": current,
+            "routes": sorted(routes, key=lambda route: route["max_peak_bytes"], reverse=True)
+        }
+
+memory_diagnostics = MemoryDiagnostics()
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+def _top_sites(before, after):
+    return [
+        {"site": str(stat.traceback), "size_bytes": stat.size_diff, "count": stat.count_diff}
+        for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATION_SITES]
+        if stat.size_diff > 0
+    ]
+
+class MemoryDiagnosticsMiddleware:
+    """Measures each request's peak allocation while memory diagnostics run"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracemalloc.is_tracing():
+            await self.app(scope, receive, send)
+            return
+
+        before = _snapshot()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        state = {"after": None}
+
+        async def send_wrapper(message):
+            # The response payload is still referenced when the response starts
+            if message["type"] == "http.response.start" and tracemalloc.is_tracing():
+                state["after"] = _snapshot()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if tracemalloc.is_tracing():
+                peak_bytes = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+                route = route_template(scope)
+                top_sites = None
+                if state["after"] is not None and peak_bytes >= memory_diagnostics.max_peak(route):
+                    top_sites = _top_sites(before, state["after"])
+                memory_diagnostics.record(route, peak_bytes, top_sites)
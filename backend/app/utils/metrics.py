@@ -0,0 +1,195 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pymongo import monitoring
+
+# Latency buckets in seconds and size buckets in bytes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Every metric registers itself here, in creation order, for rendering
+_metrics = []
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Gauge(Counter):
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    bucket_labels = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                label_text = _format_labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{label_text} {total}")
+                lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+def render_metrics():
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# HTTP metrics, labeled by route template so /students/{student_id} is one series
+http_requests = Counter("http_requests_total", "Requests handled", ("method", "route", "status"))
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency", ("method", "route")
+)
+http_request_db_duration = Histogram(
+    "http_request_db_seconds", "Time spent in MongoDB commands per request", ("method", "route")
+)
+http_response_size = Histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), buckets=SIZE_BUCKETS
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "Requests being handled")
+
+# MongoDB command metrics, fed by the command listener
+mongodb_commands = Counter("mongodb_commands_total", "MongoDB commands run", ("command", "outcome"))
+mongodb_command_duration = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ("command",)
+)
+
+# MongoDB time of the request being handled; a one-item list so threads
+# started with a copy of the context add to the same total
+_request_db_time = ContextVar("request_db_time", default=None)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records command latency and adds it to the current request's DB time"""
+
+    def started(self, event):
+        pass
+
+    def _record(self, event, outcome):
+        seconds = event.duration_micros / 1_000_000
+        mongodb_commands.inc(event.command_name, outcome)
+        mongodb_command_duration.observe(seconds, event.command_name)
+        db_time = _request_db_time.get()
+        if db_time is not None:
+            db_time[0] += seconds
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+# Routes of the application by endpoint, built on the first request
+_routes_by_endpoint = None
+
+def route_template(scope):
+    """Path template of the route that handled a request, e.g. /students/{student_id}"""
+    global _routes_by_endpoint
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        # Unrouted paths (404s, scanners) share one series
+        return "unmatched"
+    if _routes_by_endpoint is None:
+        routes = {}
+        for route in scope["app"].routes:
+            if hasattr(route, "endpoint"):
+                routes.setdefault(route.endpoint, []).append(route)
+        _routes_by_endpoint = routes
+    routes = _routes_by_endpoint.get(endpoint, ())
+    if len(routes) == 1:
+        return routes[0].path
+    # Routers mounted under several prefixes share their endpoints
+    for route in routes:
+        if route.path_regex.match(scope["path"]):
+            return route.path
+    return "unmatched"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count, latency, size and DB time"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"status": 500, "size": 0}
+        db_time = [0.0]
+        token = _request_db_time.set(db_time)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            _request_db_time.reset(token)
+            method = scope["method"]
+            route = route_template(scope)
+            http_requests.inc(method, route, str(state["status"]))
+            http_request_duration.observe(elapsed, method, route)
+            http_request_db_duration.observe(db_time[0], method, route)
+            http_response_size.observe(state["size"], method, route)
@@ -0,0 +1,79 @@
+from enum import Enum
+from typing import Iterable, Optional
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from app.utils.fast_json import dumps
+from config.settings import STREAM_BATCH_SIZE
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+class StreamFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+
+def batched(items: Iterable, size: int = STREAM_BATCH_SIZE):
+    """Lists of up to ``size`` consecutive items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def wants_ndjson(format: Optional[StreamFormat], accept: Optional[str]) -> bool:
+    """NDJSON when asked for with ?format=ndjson or an Accept header naming it"""
+    if format is not None:
+        return format == StreamFormat.NDJSON
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+def _joined(encoded_batches, separator: bytes):
+    # One chunk per batch; the separator goes between items across chunks too
+    first = True
+    for batch in encoded_batches:
+        chunk = separator.join(batch)
+        yield chunk if first else separator + chunk
+        first = False
+
+def json_array_body(items: Iterable):
+    """``[item, ...]`` written one batch of items per chunk"""
+    yield b"["
+    yield from _joined(([dumps(item) for item in batch] for batch in batched(items)), b",")
+    yield b"]"
+
+def json_object_body(head: dict, key: str, items: Iterable):
+    """``{**head, key: [item, ...]}`` with the array streamed"""
+    opening = dumps(head)[:-1]
+    yield opening + (b"," if head else b"") + dumps(key) + b":"
+    yield from json_array_body(items)
+    yield b"}"
+
+def json_mapping_body(pairs: Iterable):
+    """``{key: value, ...}`` from (key, value) pairs, written one batch per chunk"""
+    yield b"{"
+    yield from _joined(
+        ([dumps(key) + b":" + dumps(value) for key, value in batch] for batch in batched(pairs)), b","
+    )
+    yield b"}"
+
+def ndjson_body(items: Iterable):
+    """One JSON document per line"""
+    for batch in batched(items):
+        yield b"".join(dumps(item) + b"\n" for item in batch)
+
+def streaming_json_response(body, response: Response = None, ndjson: bool = False):
+    """Stream ``body`` chunks, carrying over headers set on the injected ``response``
+
+    Starlette pulls the chunks in its thread pool, so the MongoDB reads of a
+    pipeline run off the event loop. Errors after the first chunk can only
+    abort the connection, so handlers check what can fail up front.
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return StreamingResponse(
+        body,
+        media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+        headers=headers
+    )
@@ -0,0 +1,269 @@
+"""End-to-end API load benchmark
+
+Seeds a deterministic college (see benchmarks.college) into an in-memory
+MongoDB stand-in, or into a local MongoDB with --mongo-url, then drives the
+real ASGI app in process with concurrent httpx clients. The request mix
+covers login, the students listing, class attendance, the exams batch and
+the dashboards, and is drawn from the seed up front, so two runs with the
+same parameters send the same requests. Throughput and p50/p95/p99 latency
+per endpoint are written to a JSON results file tagged with the commit;
+--compare prints the change against an earlier results file.
+
+Needs httpx, plus mongomock for the in-memory stand-in (neither is an API
+dependency): pip install httpx mongomock
+
+Run from the backend directory:
+    python -m benchmarks.api_load --students 2000 --requests 3000 --concurrency 16
+    python -m benchmarks.api_load --mongo-url mongodb://localhost:27017 \\
+        --compare benchmarks/results/api_load-<commit>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from benchmarks.college import ACADEMIC_YEAR, GROUP_WEIGHTS, seed_college, student_id
+from benchmarks.login_storm import percentile
+
+BENCHMARK_DATABASE = "gjc_benchmark"
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "results")
+PRINCIPAL_USERNAME = "benchmark_principal"
+PRINCIPAL_PASSWORD = "benchmark-password"
+
+# Relative frequency of each endpoint in the request mix
+ENDPOINT_WEIGHTS = {
+    "login": 1,
+    "students": 4,
+    "class_attendance": 4,
+    "exams_batch": 3,
+    "dashboard": 2,
+    "overview": 2
+}
+EXAMS_BATCH_SIZE = 50
+MONTHS = ("june", "july", "august", "september", "october", "november", "december")
+
+def use_database(mongo_url, database):
+    """Point the app at the benchmark database; must run before the app connects"""
+    import config.settings as settings
+    if mongo_url is None:
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("The in-memory stand-in needs mongomock (pip install mongomock), or pass --mongo-url")
+        import pymongo
+
+        class StandInClient(mongomock.MongoClient):
+            # mongomock takes neither the Atlas URL nor command listeners
+            def __init__(self, *args, **kwargs):
+                super().__init__()
+
+        pymongo.MongoClient = StandInClient
+    else:
+        if database == settings.DATABASE_NAME:
+            sys.exit(f"Refusing to seed the application database {database!r}; pick another --database")
+        settings.MONGODB_URL = mongo_url
+    settings.DATABASE_NAME = database
+
+def prepare_database(students, seed):
+    """Drop the benchmark database's collections, seed the college and a principal"""
+    from app.db import mongodb
+    from app.services.auth import get_password_hash
+    for name in mongodb.db.list_collection_names():
+        mongodb.db.drop_collection(name)
+    counts = seed_college(mongodb.db, students, seed)
+    mongodb.users_collection.insert_one({
+        "username": PRINCIPAL_USERNAME,
+        "email": f"{PRINCIPAL_USERNAME}@example.com",
+        "hashed_password": get_password_hash(PRINCIPAL_PASSWORD),
+        "role": "principal",
+        "created_at": datetime.utcnow()
+    })
+    return counts
+
+def build_plan(requests, students, seed):
+    """The (endpoint, method, url, request kwargs) list every run with this seed sends"""
+    rng = random.Random(seed)
+    names = list(ENDPOINT_WEIGHTS)
+    weights = list(ENDPOINT_WEIGHTS.values())
+    groups = list(GROUP_WEIGHTS)
+    plan = []
+    for _ in range(requests):
+        name = rng.choices(names, weights=weights)[0]
+        year, group, month = rng.choice((1, 2)), rng.choice(groups), rng.choice(MONTHS)
+        if name == "login":
+            request = ("POST", "/token", {"data": {"username": PRINCIPAL_USERNAME, "password": PRINCIPAL_PASSWORD}})
+        elif name == "students":
+            request = ("GET", f"/students/?year={year}&group={group}&limit=100", {})
+        elif name == "class_attendance":
+            request = ("GET", f"/attendance/class/{year}/{group}/{ACADEMIC_YEAR}/{month}", {})
+        elif name == "exams_batch":
+            ids = [str(student_id(seed, rng.randrange(students))) for _ in range(EXAMS_BATCH_SIZE)]
+            request = ("POST", "/exams/batch", {"json": ids})
+        elif name == "dashboard":
+            request = ("GET", "/dashboard/principal", {})
+        else:
+            request = ("GET", f"/dashboard/overview?academic_year={ACADEMIC_YEAR}&month={month}", {})
+        plan.append((name,) + request)
+    return plan
+
+async def drive(app, plan, concurrency):
+    """Send the plan through ``concurrency`` clients; returns per-endpoint latencies, errors and wall time"""
+    import httpx
+    latencies = {name: [] for name in ENDPOINT_WEIGHTS}
+    errors = {name: 0 for name in ENDPOINT_WEIGHTS}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            login = await client.post("/token", data={"username": PRINCIPAL_USERNAME, "password": PRINCIPAL_PASSWORD})
+            login.raise_for_status()
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            async def send(name, method, url, kwargs):
+                # Logging in with a valid token is refused, so logins go without one
+                return await client.request(method, url, headers=None if name == "login" else headers, **kwargs)
+
+            # Warm up each endpoint once (adapters, caches, lazy pools); not recorded
+            warmed = set()
+            for name, method, url, kwargs in plan:
+                if name not in warmed:
+                    warmed.add(name)
+                    await send(name, method, url, kwargs)
+
+            pending = iter(plan)
+
+            async def client_loop():
+                for name, method, url, kwargs in pending:
+                    started = time.perf_counter()
+                    response = await send(name, method, url, kwargs)
+                    latencies[name].append(time.perf_counter() - started)
+                    if response.status_code >= 400:
+                        errors[name] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+            wall_time = time.perf_counter() - started
+    return latencies, errors, wall_time
+
+def summarize(latencies, errors, wall_time):
+    endpoints = {}
+    for name, values in latencies.items():
+        if not values:
+            continue
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "throughput_rps": round(len(values) / wall_time, 2),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+            "max_ms": round(max(values) * 1000, 3),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3)
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "total": {
+            "requests": total,
+            "errors": sum(errors.values()),
+            "seconds": round(wall_time, 3),
+            "throughput_rps": round(total / wall_time, 2)
+        },
+        "endpoints": endpoints
+    }
+
+def git_commit():
+    """HEAD commit and whether the tree has local changes, or None outside a git checkout"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {"commit": commit, "dirty": dirty}
+
+def print_results(results, baseline=None):
+    print(f"{'endpoint':>16} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in results["endpoints"].items():
+        line = (
+            f"{name:>16} {stats['requests']:8d} {stats['errors']:6d} {stats['throughput_rps']:8.1f} "
+            f"{stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f}"
+        )
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous:
+            changes = [
+                f"{key[:3]} {(stats[key] - previous[key]) / previous[key] * 100:+6.1f}%"
+                for key in ("p50_ms", "p95_ms", "p99_ms") if previous[key]
+            ]
+            line += "   vs baseline: " + ", ".join(changes)
+        print(line)
+    total = results["total"]
+    print(f"{'total':>16} {total['requests']:8d} {total['errors']:6d} {total['throughput_rps']:8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against a seeded college")
+    parser.add_argument("--students", type=int, default=2000, help="Students in the seeded college")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests in the measured run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the college and the request mix")
+    parser.add_argument("--mongo-url", help="Local MongoDB to use instead of the in-memory stand-in")
+    parser.add_argument("--database", default=BENCHMARK_DATABASE, help="Database to seed (dropped first)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/api_load-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    use_database(args.mongo_url, args.database)
+
+    seed_started = time.perf_counter()
+    seeded = prepare_database(args.students, args.seed)
+    seed_seconds = time.perf_counter() - seed_started
+    print(f"Seeded {seeded} in {seed_seconds:.1f}s")
+
+    from app.main import app
+    plan = build_plan(args.requests, args.students, args.seed)
+    latencies, errors, wall_time = asyncio.run(drive(app, plan, args.concurrency))
+
+    version = git_commit()
+    results = {
+        "benchmark": "api_load",
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "git": version,
+        "python": platform.python_version(),
+        "database": "mongodb" if args.mongo_url else "mongomock",
+        "parameters": {
+            "students": args.students,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed
+        },
+        "seeded": seeded,
+        "seed_seconds": round(seed_seconds, 2),
+        **summarize(latencies, errors, wall_time)
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        tag = version["commit"][:12] + ("-dirty" if version["dirty"] else "") if version else "unversioned"
+        output = os.path.join(RESULTS_DIRECTORY, f"api_load-{tag}.json")
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("parameters") != results["parameters"] or baseline.get("database") != results["database"]:
+            print("Warning: the baseline was recorded with different parameters or database")
+    print_results(results, baseline)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Deterministic college data for benchmarks and scripts/seed_database.py
+
+The same seed and size always produce the same students (ids included),
+working days, a year of attendance and every exam type, shaped exactly as
+the API stores them. Only models and settings are imported, so this module
+can be loaded before the database client is configured.
+"""
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from bson import ObjectId
+from app.models.attendance import Month
+from app.models.exam import ExamType, SubjectsByGroup
+from config.settings import (
+    STUDENTS_COLLECTION, ATTENDANCE_COLLECTION, EXAMS_COLLECTION, COUNTERS_COLLECTION
+)
+
+ACADEMIC_YEAR = "2024-2025"
+UPDATED_BY = "seed"
+
+# Working days per month, as populate_database.sh sets them
+WORKING_DAYS = {
+    Month.JANUARY: 25, Month.FEBRUARY: 22, Month.MARCH: 26, Month.APRIL: 24,
+    Month.MAY: 25, Month.JUNE: 24, Month.JULY: 26, Month.AUGUST: 27,
+    Month.SEPTEMBER: 24, Month.OCTOBER: 26, Month.NOVEMBER: 24, Month.DECEMBER: 22
+}
+
+# Same mix as scripts/generate_students.py
+GROUP_WEIGHTS = {"mpc": 30, "bipc": 30, "cec": 15, "hec": 10, "thm": 5, "oas": 5, "mphw": 5}
+MEDIUM_WEIGHTS = {"english": 70, "telugu": 30}
+# Attendance profiles as (weight, lowest percentage, highest percentage)
+ATTENDANCE_PROFILES = ((60, 80, 100), (25, 65, 80), (10, 45, 65), (5, 10, 45))
+
+FIRST_NAMES = (
+    "Aarav", "Aditi", "Akshay", "Ananya", "Arjun", "Bhavya", "Chetan", "Deepa", "Divya", "Gaurav",
+    "Ishaan", "Kavya", "Kiran", "Lakshmi", "Madhav", "Nandini", "Naveen", "Pooja", "Rahul", "Sneha"
+)
+LAST_NAMES = (
+    "Bhat", "Gupta", "Iyer", "Joshi", "Kumar", "Menon", "Naidu", "Nair", "Patel", "Prasad",
+    "Rao", "Reddy", "Sharma", "Singh", "Varma", "Yadav"
+)
+CASTES = ("OC", "SC", "ST", "BC-A", "BC-B", "BC-C", "BC-D", "BC-E", "EWS", "Minority")
+
+def student_id(seed: int, index: int) -> ObjectId:
+    """Stable ObjectId of the index-th student of a seeded college"""
+    return ObjectId(f"{seed % 2 ** 32:08x}{index:016x}")
+
+def _weighted(rng, weights):
+    return rng.choices(tuple(weights), weights=tuple(weights.values()))[0]
+
+def generate_students(count: int, seed: int = 1):
+    """Student documents; years alternate so both cohorts are the same size"""
+    rng = random.Random(seed)
+    for index in range(count):
+        last_name = rng.choice(LAST_NAMES)
+        yield {
+            "_id": student_id(seed, index),
+            "admission_number": str(100001 + index),
+            "year": 1 + index % 2,
+            "group": _weighted(rng, GROUP_WEIGHTS),
+            "medium": _weighted(rng, MEDIUM_WEIGHTS),
+            "name": f"{rng.choice(FIRST_NAMES)} {last_name}",
+            "father_name": f"{rng.choice(FIRST_NAMES)} {last_name}",
+            "date_of_birth": (date(2006, 6, 1) + timedelta(days=rng.randrange(3 * 365))).isoformat(),
+            "caste": rng.choice(CASTES),
+            "gender": rng.choice(("male", "female")),
+            "aadhar_number": str(200000000000 + index),
+            "student_phone": f"9{rng.randrange(10 ** 9):09d}",
+            "parent_phone": f"8{rng.randrange(10 ** 9):09d}",
+            "created_at": "2024-06-01",
+            "version": 1
+        }
+
+def generate_working_days(academic_year: str = ACADEMIC_YEAR):
+    """The global working days record of every month"""
+    for month, working_days in WORKING_DAYS.items():
+        yield {
+            "academic_year": academic_year,
+            "month": month.value,
+            "working_days": working_days,
+            "last_updated": "2024-06-01",
+            "updated_by": UPDATED_BY
+        }
+
+def generate_attendance(students, seed: int = 1, academic_year: str = ACADEMIC_YEAR):
+    """A year of monthly attendance per student, each student keeping one attendance profile"""
+    rng = random.Random(seed + 1)
+    weights = [profile[0] for profile in ATTENDANCE_PROFILES]
+    for student in students:
+        _, low, high = rng.choices(ATTENDANCE_PROFILES, weights=weights)[0]
+        for month, working_days in WORKING_DAYS.items():
+            days_present = min(round(rng.uniform(low, high) / 100 * working_days), working_days)
+            yield {
+                "student_id": str(student["_id"]),
+                "academic_year": academic_year,
+                "month": month.value,
+                "working_days": working_days,
+                "days_present": days_present,
+                "attendance_percentage": round(days_present / working_days * 100, 2),
+                "last_updated": "2024-06-01",
+                "updated_by": UPDATED_BY,
+                "version": 1
+            }
+
+def generate_exams(students, seed: int = 1):
+    """Every exam type per student, marks drawn around a per-student ability"""
+    rng = random.Random(seed + 2)
+    for student in students:
+        subjects = SubjectsByGroup.get_subjects_for_group(student["group"])
+        ability = rng.randint(35, 90)
+        for number, exam_type in enumerate(ExamType):
+            marks = {subject: max(0, min(100, ability + rng.randint(-15, 15))) for subject in subjects}
+            total_marks = sum(marks.values())
+            yield {
+                "student_id": str(student["_id"]),
+                "student_name": student["name"],
+                "admission_number": student["admission_number"],
+                "year": student["year"],
+                "group": student["group"],
+                "exam_type": exam_type.value,
+                "subjects": marks,
+                "total_marks": total_marks,
+                "percentage": total_marks / (len(marks) * 100) * 100,
+                "created_at": datetime(2024, 7, 15) + timedelta(days=45 * number),
+                "version": 1
+            }
+
+def _chunks(documents, chunk_size):
+    chunk = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _insert(collection, chunk):
+    return len(collection.insert_many(chunk, ordered=False).inserted_ids)
+
+def insert_chunked(collection, documents, chunk_size: int = 1000, workers: int = 1):
+    """insert_many in chunks of ``chunk_size`` on up to ``workers`` threads; returns the number inserted
+
+    With several workers the next chunks are generated while earlier ones
+    are written, since pymongo releases the GIL while it waits on the server.
+    """
+    if workers <= 1:
+        return sum(_insert(collection, chunk) for chunk in _chunks(documents, chunk_size))
+    inserted = 0
+    with ThreadPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in _chunks(documents, chunk_size):
+            # Bound the chunks held in memory while the writers catch up
+            if len(pending) >= workers * 2:
+                inserted += pending.popleft().result()
+            pending.append(pool.submit(_insert, collection, chunk))
+        for future in pending:
+            inserted += future.result()
+    return inserted
+
+def seed_college(
+    db, students: int, seed: int = 1, academic_year: str = ACADEMIC_YEAR, chunk_size: int = 1000,
+    workers: int = 1, attendance: bool = True, exams: bool = True, report=None
+):
+    """Insert a college of ``students`` into ``db`` and bump the change counters; returns the counts
+
+    ``report(name, count, seconds)`` is called after each kind of document is written.
+    """
+    # Students are regenerated for each kind of document instead of held in memory
+    steps = [
+        ("students", STUDENTS_COLLECTION, lambda: generate_students(students, seed)),
+        ("working_days", ATTENDANCE_COLLECTION, lambda: generate_working_days(academic_year))
+    ]
+    if attendance:
+        steps.append(("attendance", ATTENDANCE_COLLECTION, lambda: generate_attendance(
+            generate_students(students, seed), seed, academic_year
+        )))
+    if exams:
+        steps.append(("exams", EXAMS_COLLECTION, lambda: generate_exams(generate_students(students, seed), seed)))
+
+    counts = {}
+    for name, collection_name, documents in steps:
+        started = time.perf_counter()
+        counts[name] = insert_chunked(db[collection_name], documents(), chunk_size, workers)
+        if report is not None:
+            report(name, counts[name], time.perf_counter() - started)
+    for collection_name in {collection_name for _, collection_name, _ in steps}:
+        db[COUNTERS_COLLECTION].update_one({"_id": collection_name}, {"$inc": {"version": 1}}, upsert=True)
+    return counts
@@ -0,0 +1,80 @@
+"""Login storm benchmark for the bcrypt worker pool
+
+Simulates a burst of concurrent logins while a probe coroutine stands in for
+every other endpoint, measuring how late the event loop lets it run. Compares
+verifying passwords inline on the event loop against the password pool.
+
+Run from the backend directory:
+    python -m benchmarks.login_storm --logins 40 --workers 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from passlib.context import CryptContext
+from app.services.password_pool import PasswordWorkerPool
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+async def probe(stop, interval, lateness):
+    """Wake up every ``interval`` seconds and record how late each wake-up was"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lateness.append(max(time.perf_counter() - expected, 0.0))
+
+async def storm(mode, logins, workers, hashed):
+    pool = PasswordWorkerPool(workers, max_queue=logins)
+
+    async def login():
+        if mode == "inline":
+            # What authenticate_user did before: bcrypt on the event loop
+            return pwd_context.verify("password", hashed)
+        return await pool.run(pwd_context.verify, "password", hashed)
+
+    stop = asyncio.Event()
+    lateness = []
+    probe_task = asyncio.create_task(probe(stop, 0.005, lateness))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    assert all(results)
+
+    return {
+        "mode": mode,
+        "logins_per_second": logins / elapsed,
+        "probe_p50_ms": percentile(lateness, 0.50) * 1000,
+        "probe_p99_ms": percentile(lateness, 0.99) * 1000,
+        "probe_max_ms": max(lateness) * 1000,
+        "probe_mean_ms": statistics.mean(lateness) * 1000,
+        "pool": pool.stats() if mode == "pool" else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure event loop latency during a login storm")
+    parser.add_argument("--logins", type=int, default=40, help="Number of concurrent logins")
+    parser.add_argument("--workers", type=int, default=4, help="Password pool worker threads")
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash("password")
+    for mode in ("inline", "pool"):
+        result = asyncio.run(storm(mode, args.logins, args.workers, hashed))
+        print(
+            f"{result['mode']:>6}: {result['logins_per_second']:7.1f} logins/s | "
+            f"other requests delayed p50 {result['probe_p50_ms']:7.1f} ms, "
+            f"p99 {result['probe_p99_ms']:7.1f} ms, max {result['probe_max_ms']:7.1f} ms"
+        )
+        if result["pool"]:
+            print(f"        pool: {result['pool']}")
+
+if __name__ == "__main__":
+    main()
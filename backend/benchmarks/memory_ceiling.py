@@ -0,0 +1,146 @@
+"""Memory ceiling regression benchmark for the large listing endpoints
+
+Rebuilds the students and exams listings the way the handlers do (documents
+materialized from the cursor, converted, then rendered through the fast JSON
+path) for a class-sized and a college-sized payload, and measures the peak
+Python allocation with tracemalloc. The streamed attendance report is built
+the same way from a document generator and its chunks consumed; its ceiling
+is the same from a college to a university, since only one batch is held.
+Exits non-zero when a scenario goes over its ceiling, so a change that makes
+these paths hold extra copies fails.
+
+Run from the backend directory:
+    python -m benchmarks.memory_ceiling
+"""
+import argparse
+import sys
+import tracemalloc
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from app.schemas.exam import ExamResponse
+from app.schemas.student import StudentResponse
+from app.utils.fast_json import render_json
+from app.utils.streaming import json_object_body
+
+MB = 1024 * 1024
+EXAM_TYPES = ("ut1", "ut2", "ut3", "ut4", "half-yearly", "final")
+
+# (name, students, {listing: ceiling}); about 1.5x the peaks measured when
+# the ceilings were set. The materialized listings are not run at university size.
+SCENARIOS = (
+    ("class", 60, {"students": 0.25 * MB, "exams": 1.25 * MB, "report": 0.25 * MB}),
+    ("college", 1200, {"students": 3 * MB, "exams": 22 * MB, "report": 2.25 * MB}),
+    ("university", 20000, {"report": 2.25 * MB}),
+)
+
+def student_documents(count):
+    """Students as the cursor returns them: dates as ISO strings, ObjectId ids"""
+    for i in range(count):
+        yield {
+            "_id": ObjectId(),
+            "admission_number": str(1000 + i),
+            "year": 1 + i % 2,
+            "group": "mpc",
+            "medium": "english",
+            "name": f"Student {i}",
+            "father_name": f"Father {i}",
+            "date_of_birth": "2007-01-01",
+            "caste": "OC",
+            "gender": "male",
+            "aadhar_number": str(10 ** 11 + i),
+            "student_phone": None,
+            "parent_phone": "9000000000",
+            "created_at": "2024-06-01",
+            "version": 1
+        }
+
+def exam_documents(count):
+    subjects = {"english": 81, "telugu_hindi": 78, "math_a": 92, "math_b": 88, "physics": 74, "chemistry": 69}
+    for i in range(count):
+        for exam_type in EXAM_TYPES:
+            yield {
+                "_id": ObjectId(),
+                "student_id": str(ObjectId()),
+                "student_name": f"Student {i}",
+                "admission_number": str(1000 + i),
+                "year": 1,
+                "group": "mpc",
+                "exam_type": exam_type,
+                "subjects": dict(subjects),
+                "total_marks": 482,
+                "percentage": 80.33,
+                "created_at": datetime(2024, 9, 20, 10, 30),
+                "version": 1
+            }
+
+def students_listing(count):
+    students = []
+    for student in student_documents(count):
+        student["id"] = str(student.pop("_id"))
+        students.append(student)
+    return len(render_json(List[StudentResponse], students, trusted=True))
+
+def exams_listing(count):
+    exams = []
+    for exam in exam_documents(count):
+        exam["id"] = str(exam.pop("_id"))
+        exams.append(exam)
+    return len(render_json(List[ExamResponse], exams, trusted=True))
+
+def attendance_report(count):
+    """The low attendance report streamed from a cursor-like generator, chunks consumed as sent"""
+    rows = (
+        {
+            "student_id": str(student["_id"]),
+            "student_name": student["name"],
+            "admission_number": student["admission_number"],
+            "year": student["year"],
+            "group": student["group"],
+            "month": "june",
+            "academic_year": "2024-2025",
+            "working_days": 24,
+            "days_present": 11,
+            "attendance_percentage": 45.83
+        }
+        for student in student_documents(count)
+    )
+    head = {"academic_year": "2024-2025", "month": "june", "percentage_threshold": 75.0}
+    return sum(len(chunk) for chunk in json_object_body(head, "students", rows))
+
+LISTINGS = {"students": students_listing, "exams": exams_listing, "report": attendance_report}
+
+def peak_allocation(build, count):
+    """Peak bytes allocated while building one response body, excluding what existed before"""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        body_size = build(count)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return peak, body_size
+
+def main():
+    parser = argparse.ArgumentParser(description="Check peak allocation of the listing paths against ceilings")
+    parser.parse_args()
+
+    # Warm up compiled adapters and caches so they are not counted
+    for build in LISTINGS.values():
+        build(5)
+
+    failures = 0
+    for name, students, ceilings in SCENARIOS:
+        for listing, ceiling in ceilings.items():
+            peak, body_size = peak_allocation(LISTINGS[listing], students)
+            ok = peak <= ceiling
+            failures += not ok
+            print(
+                f"{'ok  ' if ok else 'FAIL'} {name:>10} {listing:>8}: peak {peak / MB:6.2f} MB "
+                f"(ceiling {ceiling / MB:5.2f} MB, body {body_size / MB:5.2f} MB)"
+            )
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Schema validation benchmark: v1-style configuration against v2-native schemas
+
+Validates 1,000-item student and exam lists four ways:
+
+    v1 per item    - copies of the schemas as they were (class Config with
+                     orm_mode/json_encoders), one model_validate per item
+    v1 list        - the same schemas, one TypeAdapter call for the list
+    v2 per item    - the current schemas, one model_validate per item
+    v2 shared list - the current schemas through the shared adapters in
+                     app.schemas.adapters
+
+It also reports what building a list TypeAdapter costs, which the shared
+adapters pay once at import instead of per use.
+
+Run from the backend directory:
+    python -m benchmarks.schemas --items 1000 --repeat 20
+"""
+import argparse
+import time
+import warnings
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from bson import ObjectId
+from pydantic import BaseModel, TypeAdapter
+from app.models.exam import ExamType
+from app.models.student import Gender, Group, Medium
+from app.schemas.adapters import StudentListAdapter, ExamListAdapter
+from app.schemas.exam import ExamResponse
+from app.schemas.student import StudentResponse
+from benchmarks.serialization import student_rows, exam_rows
+
+# The schemas before the v2 migration, kept here for comparison only
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+
+    class LegacyStudentResponse(BaseModel):
+        admission_number: str
+        year: int
+        group: Group
+        medium: Medium
+        name: str
+        father_name: str
+        date_of_birth: date
+        caste: str
+        gender: Gender
+        aadhar_number: str
+        student_phone: Optional[str] = None
+        parent_phone: str
+        id: str
+        created_at: date
+        updated_at: Optional[date] = None
+
+        class Config:
+            orm_mode = True
+
+    class LegacyExamResponse(BaseModel):
+        student_id: str
+        student_name: str
+        admission_number: str
+        year: int
+        group: str
+        exam_type: ExamType
+        subjects: Dict[str, int]
+        id: str
+        total_marks: int
+        percentage: float
+        created_at: datetime
+        updated_at: Optional[datetime] = None
+
+        class Config:
+            orm_mode = True
+            json_encoders = {ObjectId: str}
+
+def time_call(func, repeat):
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare schema validation on large lists")
+    parser.add_argument("--items", type=int, default=1000, help="Items per list")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed validations per variant")
+    args = parser.parse_args()
+
+    cases = [
+        ("students", student_rows(args.items), LegacyStudentResponse, StudentResponse, StudentListAdapter),
+        ("exams", exam_rows(args.items), LegacyExamResponse, ExamResponse, ExamListAdapter)
+    ]
+    for name, rows, legacy, model, shared_adapter in cases:
+        legacy_adapter = TypeAdapter(List[legacy])
+        timings = {
+            "v1 per item": time_call(lambda: [legacy.model_validate(row) for row in rows], args.repeat),
+            "v1 list": time_call(lambda: legacy_adapter.validate_python(rows), args.repeat),
+            "v2 per item": time_call(lambda: [model.model_validate(row) for row in rows], args.repeat),
+            "v2 shared list": time_call(lambda: shared_adapter.validate_python(rows), args.repeat)
+        }
+        baseline = timings["v1 per item"]
+        build_ms = time_call(lambda: TypeAdapter(List[model]), args.repeat)
+        print(f"{name} ({args.items} items, building a list adapter takes {build_ms:.2f} ms)")
+        for variant, ms in timings.items():
+            print(f"    {variant:>15}: {ms:7.2f} ms ({baseline / ms:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
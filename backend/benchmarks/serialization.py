@@ -0,0 +1,146 @@
+"""Response serialization benchmark for the fast JSON path
+
+Builds student, exam and class-attendance payloads shaped like the handlers'
+output and times three ways of turning them into a response body:
+
+    fastapi  - what FastAPI does for a response_model: validate, serialize
+               to JSON-compatible Python, then json.dumps
+    adapter  - one TypeAdapter validation of the whole list, dumped by
+               pydantic-core (the fast path for untrusted content)
+    trusted  - field trimming plus orjson, no validation (the fast path for
+               documents the API wrote itself)
+
+Run from the backend directory:
+    python -m benchmarks.serialization --rows 200 --repeat 50
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime
+from typing import List
+from bson import ObjectId
+from fastapi.utils import create_response_field
+from app.schemas.student import StudentResponse
+from app.schemas.exam import ExamResponse
+from app.schemas.attendance import ClassAttendanceSummary
+from app.utils import fast_json
+
+def student_rows(count):
+    return [
+        {
+            "id": str(ObjectId()),
+            "admission_number": str(1000 + i),
+            "year": 1 + i % 2,
+            "group": "mpc",
+            "medium": "english",
+            "name": f"Student {i}",
+            "father_name": f"Father {i}",
+            "date_of_birth": date(2007, 1 + i % 12, 1 + i % 28),
+            "caste": "OC",
+            "gender": "male" if i % 2 else "female",
+            "aadhar_number": str(10 ** 11 + i),
+            "student_phone": None,
+            "parent_phone": "9000000000",
+            "created_at": date(2024, 6, 1),
+            "updated_at": None,
+            "version": 3
+        }
+        for i in range(count)
+    ]
+
+def exam_rows(count):
+    subjects = {"english": 81, "telugu_hindi": 78, "math_a": 92, "math_b": 88, "physics": 74, "chemistry": 69}
+    return [
+        {
+            "id": str(ObjectId()),
+            "student_id": str(ObjectId()),
+            "student_name": f"Student {i}",
+            "admission_number": str(1000 + i),
+            "year": 1,
+            "group": "mpc",
+            "exam_type": "half-yearly",
+            "subjects": subjects,
+            "total_marks": 482,
+            "percentage": 80.33,
+            "created_at": datetime(2024, 9, 20, 10, 30),
+            "updated_at": None,
+            "version": 1
+        }
+        for i in range(count)
+    ]
+
+def class_attendance(count):
+    return {
+        "year": 1,
+        "group": "mpc",
+        "month": "september",
+        "academic_year": "2024-2025",
+        "working_days": 24,
+        "students": [
+            {
+                "student_id": str(ObjectId()),
+                "student_name": f"Student {i}",
+                "admission_number": str(1000 + i),
+                "month": "september",
+                "academic_year": "2024-2025",
+                "working_days": 24,
+                "days_present": 24 - i % 7,
+                "attendance_percentage": round((24 - i % 7) / 24 * 100, 2)
+            }
+            for i in range(count)
+        ]
+    }
+
+def fastapi_path(response_type):
+    field = create_response_field(name="Response", type_=response_type, mode="serialization")
+
+    def render(content):
+        value, errors = field.validate(content, {}, loc=("response",))
+        assert not errors
+        return json.dumps(
+            field.serialize(value, mode="json"),
+            ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+    return render
+
+def time_path(render, content, repeat):
+    render(content)  # warm up caches and compiled validators
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render(content)
+    return (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare response serialization paths")
+    parser.add_argument("--rows", type=int, default=200, help="Items per payload")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed renders per path")
+    args = parser.parse_args()
+
+    payloads = [
+        ("students", List[StudentResponse], student_rows(args.rows)),
+        ("exams", List[ExamResponse], exam_rows(args.rows)),
+        ("class attendance", ClassAttendanceSummary, class_attendance(args.rows))
+    ]
+    if fast_json.orjson is None:
+        print("orjson is not installed: the trusted path falls back to the adapter path")
+
+    for name, response_type, content in payloads:
+        paths = {
+            "fastapi": fastapi_path(response_type),
+            "adapter": lambda content, response_type=response_type: fast_json.render_json(response_type, content),
+            "trusted": lambda content, response_type=response_type: fast_json.render_json(response_type, content, trusted=True)
+        }
+        # Every path has to produce the same document
+        expected = json.loads(paths["fastapi"](content))
+        assert all(json.loads(render(content)) == expected for render in paths.values()), name
+
+        timings = {path: time_path(render, content, args.repeat) for path, render in paths.items()}
+        print(
+            f"{name:>16} ({args.rows} rows): "
+            + " | ".join(
+                f"{path} {ms:6.2f} ms ({timings['fastapi'] / ms:4.1f}x)" for path, ms in timings.items()
+            )
+        )
+
+if __name__ == "__main__":
+    main()
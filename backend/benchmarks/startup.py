@@ -0,0 +1,140 @@
+"""Cold start benchmark
+
+Each run starts a fresh interpreter that times ``import app.main``, then
+points the app at the benchmark database (the in-memory stand-in, or a
+local MongoDB with --mongo-url) and times the lifespan startup plus the
+first ``GET /`` through httpx. The parent also records each interpreter's
+total wall time. Medians and p95s are written to a JSON results file
+tagged with the commit; --compare prints the change against an earlier one.
+
+Needs httpx, plus mongomock for the in-memory stand-in: pip install httpx mongomock
+
+Run from the backend directory:
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --compare benchmarks/results/startup-<commit>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Timings a child reports, in the order they happen
+PHASES = ("import_ms", "startup_ms", "first_response_ms")
+
+def child(mongo_url, database):
+    """Time one cold start in this interpreter and print the timings as JSON"""
+    import asyncio
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    # Only imported once the app has been, so they cannot hide its import cost
+    import httpx
+    from benchmarks.api_load import use_database
+    use_database(mongo_url, database)
+
+    async def first_response():
+        async with app.router.lifespan_context(app):
+            up = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                response = await client.get("/")
+            response.raise_for_status()
+            return up, time.perf_counter()
+
+    starting = time.perf_counter()
+    up, responded = asyncio.run(first_response())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (up - starting) * 1000,
+        "first_response_ms": (responded - up) * 1000
+    }))
+
+def run_child(mongo_url, database):
+    """One cold start in a subprocess; returns its timings plus the process wall time"""
+    command = [sys.executable, "-m", "benchmarks.startup", "--child", "--database", database]
+    if mongo_url:
+        command += ["--mongo-url", mongo_url]
+    started = time.perf_counter()
+    finished = subprocess.run(command, cwd=BACKEND_DIRECTORY, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if finished.returncode != 0:
+        sys.exit(f"Cold start failed:\n{finished.stderr}")
+    # The app prints while starting; the timings are the last line
+    timings = json.loads(finished.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = wall_ms
+    return timings
+
+def summarize(runs):
+    from benchmarks.login_storm import percentile
+    phases = {}
+    for phase in PHASES + ("process_ms",):
+        values = [run[phase] for run in runs]
+        phases[phase] = {
+            "median": round(statistics.median(values), 2),
+            "p95": round(percentile(values, 0.95), 2),
+            "min": round(min(values), 2)
+        }
+    return phases
+
+def print_results(results, baseline=None):
+    print(f"{'phase':>18} {'median ms':>10} {'p95 ms':>10} {'min ms':>10}")
+    for phase, stats in results["phases"].items():
+        line = f"{phase:>18} {stats['median']:10.1f} {stats['p95']:10.1f} {stats['min']:10.1f}"
+        previous = (baseline or {}).get("phases", {}).get(phase)
+        if previous and previous["median"]:
+            line += f"   vs baseline: median {(stats['median'] - previous['median']) / previous['median'] * 100:+6.1f}%"
+        print(line)
+
+def main():
+    from benchmarks.api_load import BENCHMARK_DATABASE, RESULTS_DIRECTORY, git_commit
+    parser = argparse.ArgumentParser(description="Time importing the app and serving its first response")
+    parser.add_argument("--runs", type=int, default=10, help="Cold starts, each in a fresh interpreter")
+    parser.add_argument("--mongo-url", help="Local MongoDB to use instead of the in-memory stand-in")
+    parser.add_argument("--database", default=BENCHMARK_DATABASE, help="Database the app starts against")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/startup-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.mongo_url, args.database)
+        return
+
+    runs = [run_child(args.mongo_url, args.database) for _ in range(args.runs)]
+    version = git_commit()
+    results = {
+        "benchmark": "startup",
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "git": version,
+        "python": platform.python_version(),
+        "database": "mongodb" if args.mongo_url else "mongomock",
+        "parameters": {"runs": args.runs},
+        "phases": summarize(runs)
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        tag = version["commit"][:12] + ("-dirty" if version["dirty"] else "") if version else "unversioned"
+        output = os.path.join(RESULTS_DIRECTORY, f"startup-{tag}.json")
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("database") != results["database"]:
+            print("Warning: the baseline was recorded against a different database")
+    print_results(results, baseline)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,95 @@ STUDENTS_COLLECTION = "students"
 ATTENDANCE_COLLECTION = "attendance"
 EXAMS_COLLECTION = "exams"
 PERMISSIONS_COLLECTION = "permissions"
+ALUMNI_COLLECTION = "alumni"
+COUNTERS_COLLECTION = "counters"
+REVOCATIONS_COLLECTION = "revocations"
+REFRESH_TOKENS_COLLECTION = "refresh_tokens"
 
 # Security Configuration
 SECRET_KEY = "YOUR_SECRET_KEY_HERE"  # In production, use a secure secret key stored in environment variable
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 120  # Increased to 2 hours
+ACCESS_TOKEN_EXPIRE_MINUTES = 15  # Short-lived; clients renew with the refresh token
 ACCESS_TOKEN_EXPIRE_DELTA = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
+# Refresh tokens rotate on every use. Each rotation extends the session by the
+# idle window, up to the maximum session age, after which a password login
+# (and its bcrypt verification) is required again.
+REFRESH_TOKEN_IDLE_HOURS = 12
+REFRESH_TOKEN_IDLE_DELTA = timedelta(hours=REFRESH_TOKEN_IDLE_HOURS)
+SESSION_MAX_AGE_HOURS = 24
+SESSION_MAX_AGE_DELTA = timedelta(hours=SESSION_MAX_AGE_HOURS)
+# A rotated refresh token presented again this soon after its rotation (another
+# tab, or a client retrying a lost response) gets the token it was rotated to
+# instead of ending the session
+REFRESH_TOKEN_REUSE_GRACE_SECONDS = 10
+REFRESH_TOKEN_REUSE_GRACE_DELTA = timedelta(seconds=REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+
+# Revoked sessions are mirrored in process and re-read from MongoDB at this interval
+REVOCATION_REFRESH_SECONDS = 30
+
+# Staff permissions are cached in process; when embedded, access tokens carry
+# them as a claim and permission checks need no lookup at all
+PERMISSIONS_CACHE_TTL_SECONDS = 60
+EMBED_PERMISSIONS_IN_TOKEN = True
+
+# bcrypt work runs on a bounded thread pool off the event loop
+PASSWORD_HASH_WORKERS = 4
+PASSWORD_HASH_MAX_QUEUE = 256
+# Bulk account provisioning hashes across processes instead
+PASSWORD_HASH_PROCESSES = max(1, (os.cpu_count() or 1))
+BULK_USER_MAX_ROWS = 500
+# Rows accepted per request by the student and attendance bulk endpoints
+BULK_STUDENT_MAX_ROWS = 1000
+BULK_ATTENDANCE_MAX_ROWS = 2000
+
+# Authenticated users are cached per (username, token id) to skip the users lookup
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_MAX_SIZE = 1024
+
+# Dashboard statistics cache: served fresh for the TTL, then served stale
+# while a background refresh runs, for up to the stale window
+DASHBOARD_CACHE_TTL_SECONDS = 30
+DASHBOARD_CACHE_STALE_SECONDS = 300
+
+# Public (unauthenticated) endpoints: pre-serialized responses are kept in
+# process for the TTL and browsers/proxies may reuse them for max-age seconds
+PUBLIC_CACHE_TTL_SECONDS = 60
+PUBLIC_CACHE_MAX_AGE_SECONDS = 30
+
+# Student directory (id -> name, admission number, group, year) used to check
+# students exist on attendance and exam paths. Writes in this process
+# invalidate it; other workers see changes after the TTL.
+STUDENT_DIRECTORY_TTL_SECONDS = 300
+STUDENT_DIRECTORY_MAX_SIZE = 5000
+
+# Optional in-process copy of the students collection for roster queries. A
+# background thread polls the students change counter and reloads on change;
+# reads fall back to MongoDB when the copy is older than the allowed lag.
+ROSTER_REPLICA_ENABLED = False
+ROSTER_REPLICA_POLL_SECONDS = 2
+ROSTER_REPLICA_MAX_LAG_SECONDS = 10
+
+# Large listings opt into a fast JSON path: orjson for trusted documents
+# (when installed), bulk TypeAdapter validation otherwise
+FAST_JSON_RESPONSES = True
+
+# Report endpoints stream their rows: MongoDB cursors fetch this many
+# documents per round trip and the body is written one batch at a time
+STREAM_BATCH_SIZE = 500
+
+# Prometheus metrics at /metrics, scraped with "Authorization: Bearer <token>".
+# Metrics are collected while enabled, but /metrics answers 404 until a token is set
+METRICS_ENABLED = True
+METRICS_TOKEN = None
+
+# Principals can profile a request with an X-Profile header or ?profile=1;
+# the most recent profiles are kept in process
+PROFILING_ENABLED = True
+PROFILE_HISTORY_SIZE = 20
+
+# Principals can trace per-route peak allocations through /ops/memory
+MEMORY_DIAGNOSTICS_ENABLED = True
+
 # CORS Settings
 CORS_ORIGINS = ["http://localhost:3000", "http://localhost:18081", "http://20.55.51.47:18081"]  # Frontend URL 
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Shared fixtures; the API runs against the in-memory MongoDB stand-in the benchmarks use
+
+Run from the backend directory:
+    pip install -r requirements-dev.txt
+    python -m pytest
+"""
+from datetime import datetime
+import pytest
+from benchmarks.api_load import use_database
+
+# Before the app connects, so every test talks to mongomock
+use_database(None, "gjc_test")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.db import mongodb  # noqa: E402
+from app.services.auth import get_password_hash, revocation_list  # noqa: E402
+from app.utils.cache import _caches  # noqa: E402
+
+PRINCIPAL_USERNAME = "test_principal"
+PRINCIPAL_PASSWORD = "test-password"
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Empty database and caches for every test"""
+    for name in mongodb.db.list_collection_names():
+        mongodb.db.drop_collection(name)
+    for cache in _caches.values():
+        cache.invalidate()
+    revocation_list._users = {}
+    revocation_list._tokens = {}
+    revocation_list._loaded_at = None
+    yield
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def principal(client):
+    """Login response of a freshly created principal"""
+    mongodb.users_collection.insert_one({
+        "username": PRINCIPAL_USERNAME,
+        "email": f"{PRINCIPAL_USERNAME}@example.com",
+        "hashed_password": get_password_hash(PRINCIPAL_PASSWORD),
+        "role": "principal",
+        "created_at": datetime.utcnow()
+    })
+    response = client.post("/token", data={"username": PRINCIPAL_USERNAME, "password": PRINCIPAL_PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+@pytest.fixture
+def auth_headers(principal):
+    return {"Authorization": f"Bearer {principal['access_token']}"}
+
+def student_payload(index, year=1, group="mpc", medium="english"):
+    return {
+        "admission_number": str(1000 + index),
+        "year": year,
+        "group": group,
+        "medium": medium,
+        "name": f"Student {index}",
+        "father_name": "Father",
+        "date_of_birth": "2007-01-01",
+        "caste": "OC",
+        "gender": "male",
+        "aadhar_number": str(10 ** 11 + index),
+        "parent_phone": "9000000000"
+    }
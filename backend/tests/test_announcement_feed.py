@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from app.db import mongodb
+from app.routes.announcements.routes import encode_cursor, decode_cursor, after_cursor_query
+from app.utils.http_cache import public_response_cache
+
+def test_cursor_round_trip():
+    announcement = {"_id": ObjectId(), "pinned": True, "created_at": datetime(2024, 6, 1, 9, 30)}
+    assert decode_cursor(encode_cursor(announcement)) == (True, datetime(2024, 6, 1, 9, 30), announcement["_id"])
+
+@pytest.mark.parametrize("cursor", ["garbage", "e30=", encode_cursor({"_id": "x", "created_at": datetime(2024, 1, 1)})])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+def test_after_cursor_query_moves_past_pinned_items():
+    created_at = datetime(2024, 6, 1)
+    query = after_cursor_query(True, created_at, ObjectId())
+    # Unpinned items all sort after the last pinned one
+    assert {"pinned": {"$ne": True}} in query["$or"]
+    assert {"pinned": {"$ne": True}} not in after_cursor_query(False, created_at, ObjectId())["$or"]
+
+def insert_announcements(count, pinned=()):
+    started = datetime(2024, 6, 1)
+    for index in range(count):
+        mongodb.announcements_collection.insert_one({
+            "title": f"Announcement {index}",
+            "content": "Content",
+            "pinned": index in pinned,
+            # Pairs share a timestamp so the _id tie-break is exercised
+            "created_at": started + timedelta(hours=index // 2)
+        })
+
+def test_feed_pages_cover_every_item_once_pinned_first(client):
+    insert_announcements(9, pinned={1, 6})
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/announcements/feed", params=params).json()
+        seen.extend(item["title"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(f"Announcement {index}" for index in range(9))
+    assert len(seen) == len(set(seen))
+    assert seen[:2] == ["Announcement 6", "Announcement 1"]
+
+def test_only_the_first_feed_page_is_cached(client):
+    insert_announcements(5)
+    first = client.get("/announcements/feed", params={"limit": 2})
+    assert "etag" in first.headers
+    client.get("/announcements/feed", params={"limit": 2, "cursor": first.json()["next_cursor"]})
+    feed_keys = [key for key in public_response_cache._entries if key[:2] == ("announcements", "feed")]
+    assert feed_keys == [("announcements", "feed", 2)]
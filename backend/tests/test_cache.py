@@ -0,0 +1,92 @@
+import threading
+import pytest
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache, MISSING
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+def test_get_returns_value_until_ttl(clock):
+    cache = TTLCache("test_ttl", ttl=10)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    clock.now += 10
+    assert cache.get("key") is MISSING
+    assert cache.get("key", None) is None
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache("test_lru", maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_get_or_load_loads_once_while_fresh(clock):
+    cache = TTLCache("test_load", ttl=10)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load("key", loader) == 1
+    assert cache.get_or_load("key", loader) == 1
+    clock.now += 11
+    assert cache.get_or_load("key", loader) == 2
+
+def test_stale_value_is_served_while_reloading(clock):
+    cache = TTLCache("test_stale", ttl=10, stale_ttl=60)
+    cache.set("key", "old")
+    clock.now += 30
+    reloaded = threading.Event()
+
+    def loader():
+        reloaded.set()
+        return "new"
+
+    assert cache.get_or_load("key", loader) == "old"
+    assert reloaded.wait(5)
+    for _ in range(100):
+        if cache.get("key") == "new":
+            break
+        threading.Event().wait(0.01)
+    assert cache.get("key") == "new"
+    assert cache.stats()["stale_hits"] == 1
+
+def test_value_past_stale_window_is_reloaded_synchronously(clock):
+    cache = TTLCache("test_expired", ttl=10, stale_ttl=5)
+    cache.set("key", "old")
+    clock.now += 16
+    assert cache.get_or_load("key", lambda: "new") == "new"
+
+def test_load_racing_an_invalidation_is_not_stored(clock):
+    cache = TTLCache("test_generation", ttl=10)
+
+    def loader():
+        # A write invalidates the cache while this load reads the old data
+        cache.invalidate()
+        return "old data"
+
+    assert cache.get_or_load("key", loader) == "old data"
+    assert cache.get("key") is MISSING
+
+def test_invalidate_where_drops_matching_keys(clock):
+    cache = TTLCache("test_invalidate_where", ttl=10)
+    cache.set(("announcements", "all"), 1)
+    cache.set(("faculty", "all"), 2)
+    cache.invalidate_where(lambda key: key[0] == "announcements")
+    assert cache.get(("announcements", "all")) is MISSING
+    assert cache.get(("faculty", "all")) == 2
@@ -0,0 +1,43 @@
+from tests.conftest import student_payload
+
+def test_students_listing_answers_304_until_a_write(client, auth_headers):
+    client.post("/students/", json=student_payload(1), headers=auth_headers)
+    first = client.get("/students/", headers=auth_headers)
+    etag = first.headers["etag"]
+
+    cached = client.get("/students/", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    client.post("/students/", json=student_payload(2), headers=auth_headers)
+    changed = client.get("/students/", headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()) == 2
+
+def test_student_update_with_stale_if_match_is_412(client, auth_headers):
+    created = client.post("/students/", json=student_payload(1), headers=auth_headers).json()
+    url = f"/students/{created['id']}"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+
+    updated = client.put(url, json={"name": "First"}, headers={**auth_headers, "If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["etag"] != etag
+
+    stale = client.put(url, json={"name": "Second"}, headers={**auth_headers, "If-Match": etag})
+    assert stale.status_code == 412
+    assert client.get(url, headers=auth_headers).json()["name"] == "First"
+
+def test_if_match_on_missing_student_is_404(client, auth_headers):
+    created = client.post("/students/", json=student_payload(1), headers=auth_headers).json()
+    url = f"/students/{created['id']}"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+    client.delete(url, headers=auth_headers)
+    response = client.put(url, json={"name": "Gone"}, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 404
+
+def test_public_announcements_answer_304(client, auth_headers):
+    client.post("/announcements", json={"title": "Exams", "content": "Timetable"}, headers=auth_headers)
+    first = client.get("/announcements")
+    assert first.headers["cache-control"].startswith("public")
+    cached = client.get("/announcements", headers={"If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
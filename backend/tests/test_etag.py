@@ -0,0 +1,53 @@
+from bson import ObjectId
+from app.db import mongodb
+from app.utils.etag import (
+    etag_matches, if_match_query, document_etag, precondition_failed, versions_etag, collection_etag,
+    bump_collection_version
+)
+
+def test_etag_matches_weak_lists_and_wildcard():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+def test_document_etag_carries_id_and_version():
+    object_id = ObjectId()
+    assert document_etag({"_id": object_id, "version": 3}) == f'"{object_id}.3"'
+    assert document_etag({"_id": object_id}) == f'"{object_id}.0"'
+
+def test_if_match_query_without_header_or_wildcard_is_unchanged():
+    query = {"_id": ObjectId()}
+    assert if_match_query(query, None) is query
+    assert if_match_query(query, "*") is query
+
+def test_if_match_query_narrows_to_held_versions():
+    object_id = ObjectId()
+    query = {"_id": object_id}
+    narrowed = if_match_query(query, f'"{object_id}.2"')
+    assert narrowed == {"$and": [query, {"$or": [{"_id": object_id, "version": 2}]}]}
+    # Documents written before versioning have no version field
+    unversioned = if_match_query(query, f'"{object_id}.0"')
+    assert unversioned["$and"][1] == {"$or": [{"_id": object_id, "version": None}]}
+
+def test_if_match_query_with_unusable_tags_matches_nothing():
+    collection = mongodb.students_collection
+    object_id = collection.insert_one({"version": 1}).inserted_id
+    narrowed = if_match_query({"_id": object_id}, '"not-an-etag"')
+    assert collection.count_documents(narrowed) == 0
+    assert collection.count_documents(if_match_query({"_id": object_id}, f'"{object_id}.1"')) == 1
+
+def test_precondition_failed_only_when_document_exists():
+    collection = mongodb.students_collection
+    object_id = collection.insert_one({"version": 2}).inserted_id
+    assert precondition_failed(collection, object_id)
+    assert not precondition_failed(collection, ObjectId())
+
+def test_collection_etag_changes_with_counter_and_parameters():
+    before = collection_etag("students", year=1)
+    assert before == versions_etag(("students",), (0,), year=1)
+    assert collection_etag("students", year=2) != before
+    bump_collection_version("students")
+    assert collection_etag("students", year=1) == versions_etag(("students",), (1,), year=1)
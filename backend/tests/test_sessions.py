@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from app.db import mongodb
+
+def refresh(client, refresh_token):
+    return client.post("/token/refresh", json={"refresh_token": refresh_token})
+
+def test_refresh_rotates_the_token(client, principal):
+    rotated = refresh(client, principal["refresh_token"])
+    assert rotated.status_code == 200
+    assert rotated.json()["refresh_token"] != principal["refresh_token"]
+    assert refresh(client, rotated.json()["refresh_token"]).status_code == 200
+
+def test_replay_within_grace_window_returns_the_successor(client, principal):
+    rotated = refresh(client, principal["refresh_token"]).json()
+    replayed = refresh(client, principal["refresh_token"])
+    assert replayed.status_code == 200
+    assert replayed.json()["refresh_token"] == rotated["refresh_token"]
+    # The successor still works: a second tab did not end the session
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+def test_replay_after_grace_window_ends_the_session(client, principal):
+    rotated = refresh(client, principal["refresh_token"]).json()
+    mongodb.refresh_tokens_collection.update_many(
+        {"used": True}, {"$set": {"used_at": datetime.utcnow() - timedelta(minutes=5)}}
+    )
+    assert refresh(client, principal["refresh_token"]).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+
+def test_replay_after_successor_was_used_is_refused(client, principal):
+    rotated = refresh(client, principal["refresh_token"]).json()
+    refresh(client, rotated["refresh_token"])
+    assert refresh(client, principal["refresh_token"]).status_code == 401
+
+def test_logout_ends_the_session(client, principal):
+    client.post("/logout", json={"refresh_token": principal["refresh_token"]})
+    assert refresh(client, principal["refresh_token"]).status_code == 401
@@ -37,7 +37,7 @@ const AnnouncementManagement = () => {
   const fetchAnnouncements = async () => {
     try {
       setLoading(true);
-      const allAnnouncements = await announcementService.getAllAnnouncements();
+      const allAnnouncements = await announcementService.getManagedAnnouncements();
       setAnnouncements(allAnnouncements);
     } catch (err) {
       setError('Failed to fetch announcements');
@@ -16,7 +16,7 @@ const Home = () => {
     const fetchAnnouncements = async () => {
       try {
         setLoading(true);
-        const data = await announcementService.getAllAnnouncements();
+        const data = await announcementService.getLatestAnnouncements();
         setAnnouncements(data);
       } catch (err) {
         console.error('Error fetching announcements:', err);
@@ -44,6 +44,7 @@ const Login = () => {
       
       const data = await authService.login(username, password);
       localStorage.setItem('token', data.access_token);
+      localStorage.setItem('refreshToken', data.refresh_token);
       localStorage.setItem('userRole', data.role);
       
       // Redirect based on role
@@ -3,30 +3,59 @@ import axios from 'axios';
 const API_URL = 'http://20.55.51.47:1821';
 
 // Token expiration handling
-const checkTokenExpiration = () => {
-  const token = localStorage.getItem('token');
-  if (!token) return false;
-  
+const isTokenExpired = (token) => {
   try {
     // JWT tokens consist of three parts: header.payload.signature
     const payload = token.split('.')[1];
     // The payload is base64 encoded, decode it
     const decodedPayload = JSON.parse(atob(payload));
-    // Check if the token has expired
     const currentTime = Math.floor(Date.now() / 1000); // Convert to seconds
-    
-    if (decodedPayload.exp && decodedPayload.exp < currentTime) {
-      // Token has expired, log the user out
-      console.log('Token expired, logging out');
-      authService.logout();
-      window.location.href = '/login'; // Redirect to login page
-      return false;
-    }
-    return true;
+    return Boolean(decodedPayload.exp && decodedPayload.exp < currentTime);
   } catch (error) {
     console.error('Error checking token expiration:', error);
-    return false;
+    return true;
+  }
+};
+
+const redirectToLogin = () => {
+  authService.logout();
+  window.location.href = '/login';
+};
+
+// Exchange the refresh token, unless another tab already rotated it while
+// this one waited; tabs share the tokens through localStorage
+const requestRefresh = async (staleRefreshToken) => {
+  const refreshToken = localStorage.getItem('refreshToken');
+  if (!refreshToken) {
+    throw new Error('No refresh token');
+  }
+  const token = localStorage.getItem('token');
+  if (refreshToken !== staleRefreshToken && token && !isTokenExpired(token)) {
+    return token;
+  }
+  const response = await axios.post(`${API_URL}/token/refresh`, { refresh_token: refreshToken });
+  localStorage.setItem('token', response.data.access_token);
+  localStorage.setItem('refreshToken', response.data.refresh_token);
+  localStorage.setItem('userRole', response.data.role);
+  return response.data.access_token;
+};
+
+// Renew the access token with the refresh token; concurrent callers share one
+// request, and a Web Lock keeps tabs from presenting the same token at once
+let refreshPromise = null;
+const refreshAccessToken = () => {
+  const refreshToken = localStorage.getItem('refreshToken');
+  if (!refreshToken) {
+    return Promise.reject(new Error('No refresh token'));
+  }
+  if (!refreshPromise) {
+    const refresh = () => requestRefresh(refreshToken);
+    refreshPromise = (navigator.locks ? navigator.locks.request('gjc-token-refresh', refresh) : refresh())
+      .finally(() => {
+        refreshPromise = null;
+      });
   }
+  return refreshPromise;
 };
 
 // Create axios instance
@@ -39,13 +68,18 @@ const api = axios.create({
 
 // Add request interceptor to add token to authenticated requests
 api.interceptors.request.use(
-  (config) => {
-    const token = localStorage.getItem('token');
+  async (config) => {
+    let token = localStorage.getItem('token');
     if (token) {
-      // Check if token is expired before making the request
-      if (!checkTokenExpiration()) {
-        // If token is expired, this will redirect to login
-        return Promise.reject(new Error('Token expired'));
+      // Renew an expired access token before making the request
+      if (isTokenExpired(token)) {
+        try {
+          token = await refreshAccessToken();
+        } catch (error) {
+          console.log('Session expired, logging out');
+          redirectToLogin();
+          return Promise.reject(new Error('Token expired'));
+        }
       }
       config.headers['Authorization'] = `Bearer ${token}`;
     }
@@ -61,12 +95,23 @@ api.interceptors.response.use(
   (response) => {
     return response;
   },
-  (error) => {
+  async (error) => {
+    const originalRequest = error.config;
     if (error.response && error.response.status === 401) {
+      // The access token may have been revoked (e.g. role change); renew it once and retry
+      if (originalRequest && !originalRequest._retried && localStorage.getItem('refreshToken')) {
+        originalRequest._retried = true;
+        try {
+          const token = await refreshAccessToken();
+          originalRequest.headers['Authorization'] = `Bearer ${token}`;
+          return api(originalRequest);
+        } catch (refreshError) {
+          // Fall through to logging out
+        }
+      }
       // If the server returns a 401, log the user out
       console.log('Unauthorized response, logging out');
-      authService.logout();
-      window.location.href = '/login';
+      redirectToLogin();
     }
     return Promise.reject(error);
   }
@@ -150,7 +195,20 @@ export const authService = {
 
   // Logout user
   logout: () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    const token = localStorage.getItem('token');
+    if (refreshToken) {
+      // End the server-side session; the local logout does not wait for it
+      axios
+        .post(
+          `${API_URL}/logout`,
+          { refresh_token: refreshToken },
+          token ? { headers: { Authorization: `Bearer ${token}` } } : {}
+        )
+        .catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('userRole');
   },
 
@@ -264,9 +322,11 @@ export const authService = {
     }
   },
 
-  // Check if token is valid and not expired
+  // Check if the session is still usable: a live access token, or a refresh token to renew it
   isTokenValid: () => {
-    return checkTokenExpiration();
+    const token = localStorage.getItem('token');
+    if (!token) return false;
+    return !isTokenExpired(token) || localStorage.getItem('refreshToken') !== null;
   }
 };
 
@@ -282,6 +342,37 @@ export const announcementService = {
     }
   },
 
+  // Get the latest visible announcements in compact form (landing page)
+  getLatestAnnouncements: async (limit = 10) => {
+    try {
+      const response = await api.get('/announcements/latest', { params: { limit } });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { detail: 'Network error' };
+    }
+  },
+
+  // Get one page of the announcements feed; pass the previous page's next_cursor
+  getAnnouncementFeed: async (cursor = null, limit = 20) => {
+    try {
+      const params = cursor ? { cursor, limit } : { limit };
+      const response = await api.get('/announcements/feed', { params });
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { detail: 'Network error' };
+    }
+  },
+
+  // Get every announcement, including scheduled and expired ones (Principal only)
+  getManagedAnnouncements: async () => {
+    try {
+      const response = await api.get('/announcements/manage');
+      return response.data;
+    } catch (error) {
+      throw error.response ? error.response.data : { detail: 'Network error' };
+    }
+  },
+
   // Create new announcement (Principal only)
   createAnnouncement: async (title, content, link = null, link_text = null) => {
     try {
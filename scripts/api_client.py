@@ -0,0 +1,145 @@
+"""Async API client used by the populate scripts' --async mode
+
+One httpx connection pool shared by every request, a bound on requests in
+flight, retries with exponential backoff for connection errors and
+429/5xx responses, and a progress line with throughput while work runs.
+Needs httpx (pip install httpx).
+"""
+import asyncio
+import random
+import sys
+import time
+import httpx
+
+# Responses worth retrying: throttling and transient server or proxy errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class Progress:
+    """Counts finished items and prints a throughput line at most once a second"""
+
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._printed = 0.0
+
+    def advance(self, count=1, failed=0):
+        self.done += count
+        self.failed += failed
+        now = time.perf_counter()
+        # The final line is printed by finish
+        if now - self._printed >= 1 and self.done < self.total:
+            self._printed = now
+            self._print(end="\r")
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed else 0.0
+
+    def _print(self, end):
+        sys.stdout.write(
+            f"{self.label}: {self.done}/{self.total} ({self.failed} failed) at {self.rate():.1f}/s{end}"
+        )
+        sys.stdout.flush()
+
+    def finish(self):
+        self._print(end="\n")
+        return {
+            "done": self.done,
+            "failed": self.failed,
+            "seconds": round(time.perf_counter() - self.started, 2),
+            "rate": round(self.rate(), 1)
+        }
+
+class AsyncApiClient:
+    def __init__(self, base_url, auth_token=None, concurrency=8, retries=3, backoff=0.5, timeout=30.0):
+        self.base_url = base_url
+        self.auth_token = auth_token
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = None
+        self._paths = None
+
+    async def __aenter__(self):
+        headers = {"Authorization": f"Bearer {self.auth_token}"} if self.auth_token else {}
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    def _delay(self, attempt, response=None):
+        # Honour Retry-After when the server sends one, else back off exponentially with jitter
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (0.5 + random.random())
+
+    async def request(self, method, url, **kwargs):
+        """Send one request, retrying transient failures; returns the last response or raises the last error"""
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    response = await self._client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    if attempt == self.retries:
+                        raise
+                    await asyncio.sleep(self._delay(attempt))
+                    continue
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                await asyncio.sleep(self._delay(attempt, response))
+
+    async def supports(self, method, path):
+        """Whether the server advertises ``method path`` in its OpenAPI schema"""
+        if self._paths is None:
+            try:
+                response = await self.request("GET", "/openapi.json")
+                self._paths = response.json().get("paths", {}) if response.status_code == 200 else {}
+            except (httpx.HTTPError, ValueError):
+                self._paths = {}
+        return method.lower() in self._paths.get(path, {})
+
+    async def get_all(self, url, page_size=100, **params):
+        """Every item of a skip/limit listing, page by page"""
+        items = []
+        while True:
+            response = await self.request("GET", url, params={**params, "skip": len(items), "limit": page_size})
+            response.raise_for_status()
+            page = response.json()
+            items.extend(page)
+            if len(page) < page_size:
+                return items
+
+    async def run_all(self, items, handle, label, total=None):
+        """Run ``handle(item)`` for every item, at most ``concurrency`` at a time
+
+        ``handle`` returns (succeeded, failed) counts, so an item can be a
+        batch of rows with ``total`` the number of rows; exceptions count the
+        item as one failure. Returns the progress summary.
+        """
+        progress = Progress(label, len(items) if total is None else total)
+
+        async def run(item):
+            try:
+                succeeded, failed = await handle(item)
+            except Exception as e:
+                print(f"\n✗ {label}: {str(e)}")
+                succeeded, failed = 0, 1
+            progress.advance(succeeded + failed, failed)
+
+        await asyncio.gather(*(run(item) for item in items))
+        return progress.finish()
+
+def chunked(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
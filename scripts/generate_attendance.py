@@ -1,4 +1,5 @@
 import requests
+import asyncio
 import random
 import json
 import argparse
@@ -11,6 +12,12 @@ parser.add_argument('--month', type=str, default='january', help='Month for atte
 parser.add_argument('--auth-token', type=str, help='Authentication token (if needed)')
 parser.add_argument('--dry-run', action='store_true', help='Generate data without sending to API')
 parser.add_argument('--working-days', type=int, default=29, help='Number of working days in the month')
+parser.add_argument('--async', dest='async_mode', action='store_true',
+                    help='Send concurrently over a shared connection pool (needs httpx)')
+parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight in --async mode')
+parser.add_argument('--retries', type=int, default=3, help='Retries of failed requests in --async mode')
+parser.add_argument('--batch-size', type=int, default=500,
+                    help='Records per request when the attendance bulk endpoint is available')
 args = parser.parse_args()
 
 # Configuration
@@ -23,6 +30,10 @@ DRY_RUN = args.dry_run
 ACADEMIC_YEAR = args.academic_year
 MONTH = args.month
 WORKING_DAYS = args.working_days
+ASYNC_MODE = args.async_mode
+CONCURRENCY = args.concurrency
+RETRIES = args.retries
+BATCH_SIZE = args.batch_size
 
 def set_working_days():
     """Set the working days for the month"""
@@ -40,9 +51,7 @@ def set_working_days():
     }
     
     try:
-        response = requests.post(f"{WORKING_DAYS_ENDPOINT}/{MONTH}/{ACADEMIC_YEAR}", 
-                                json={"working_days": WORKING_DAYS}, 
-                                headers=headers)
+        response = requests.post(WORKING_DAYS_ENDPOINT, json=data, headers=headers)
         if response.status_code in [200, 201]:
             print(f"✓ Working days set to {WORKING_DAYS} for {MONTH.capitalize()} {ACADEMIC_YEAR}")
             return True
@@ -137,45 +146,118 @@ def post_attendance(attendance_data):
         print(f"✗ Error setting attendance for student {student_id}: {str(e)}")
         return False
 
+async def populate_attendance_async():
+    """Set working days, read every student and send their attendance over one connection pool
+
+    Uses the attendance bulk endpoint when the server advertises it.
+    Returns the students, the created and failed counts and the profile counts.
+    """
+    from api_client import AsyncApiClient, chunked
+    
+    attendance_profiles = {"high": 0, "medium": 0, "low": 0, "very_low": 0}
+    async with AsyncApiClient(API_BASE_URL, AUTH_TOKEN, concurrency=CONCURRENCY, retries=RETRIES) as client:
+        print("\nSetting working days for the month...")
+        response = await client.request("POST", "/attendance/working-days", json={
+            "academic_year": ACADEMIC_YEAR,
+            "month": MONTH,
+            "working_days": WORKING_DAYS
+        })
+        if response.status_code in [200, 201]:
+            print(f"✓ Working days set to {WORKING_DAYS} for {MONTH.capitalize()} {ACADEMIC_YEAR}")
+        else:
+            print(f"✗ Failed to set working days: {response.status_code} - {response.text}")
+        
+        print("\nFetching students...")
+        students = await client.get_all("/students/")
+        print(f"Found {len(students)} students")
+        if not students:
+            return students, 0, 0, attendance_profiles
+        
+        records = []
+        for student in students:
+            attendance = generate_attendance_for_student(student["id"])
+            attendance_profiles[attendance["attendance_profile"]] += 1
+            records.append({"student_id": attendance["student_id"], "days_present": attendance["days_present"]})
+        
+        bulk_path = "/attendance/bulk/{academic_year}/{month}"
+        if await client.supports("put", bulk_path):
+            async def update_batch(batch):
+                response = await client.request(
+                    "PUT", f"/attendance/bulk/{ACADEMIC_YEAR}/{MONTH}", json={"records": batch}
+                )
+                if response.status_code != 200:
+                    print(f"\n✗ Failed to set attendance for {len(batch)} students: {response.status_code} - {response.text}")
+                    return 0, len(batch)
+                result = response.json()
+                for row in result["results"]:
+                    if row["status"] != "updated":
+                        print(f"\n✗ Failed to set attendance for student {row['student_id']}: {row['detail']}")
+                return result["updated"], result["failed"]
+            
+            summary = await client.run_all(
+                chunked(records, BATCH_SIZE), update_batch, "Updating attendance (bulk)", total=len(records)
+            )
+        else:
+            async def update_one(record):
+                response = await client.request(
+                    "PUT", f"/attendance/student/{record['student_id']}/{ACADEMIC_YEAR}/{MONTH}",
+                    json={"days_present": record["days_present"]}
+                )
+                if response.status_code in [200, 201]:
+                    return 1, 0
+                print(f"\n✗ Failed to set attendance for student {record['student_id']}: {response.status_code} - {response.text}")
+                return 0, 1
+            
+            summary = await client.run_all(records, update_one, "Updating attendance")
+    
+    print(f"Sent in {summary['seconds']}s ({summary['rate']} records/s)")
+    return students, summary["done"] - summary["failed"], summary["failed"], attendance_profiles
+
 if __name__ == "__main__":
     print(f"Generating attendance data for {MONTH.capitalize()} {ACADEMIC_YEAR}...")
     
-    if not DRY_RUN:
-        print("\nSetting working days for the month...")
-        set_working_days()
+    if ASYNC_MODE and not DRY_RUN:
+        students, attendance_created, attendance_failed, attendance_profiles = asyncio.run(populate_attendance_async())
+        if not students:
+            print("No students found. Please make sure you've created students first.")
+            exit(1)
+    else:
+        if not DRY_RUN:
+            print("\nSetting working days for the month...")
+            set_working_days()
     
-    print("\nFetching students...")
-    students = get_all_students()
+        print("\nFetching students...")
+        students = get_all_students()
     
-    if not students:
-        print("No students found. Please make sure you've created students first.")
-        exit(1)
+        if not students:
+            print("No students found. Please make sure you've created students first.")
+            exit(1)
     
-    print(f"Found {len(students)} students")
+        print(f"Found {len(students)} students")
     
-    attendance_created = 0
-    attendance_failed = 0
-    attendance_profiles = {"high": 0, "medium": 0, "low": 0, "very_low": 0}
+        attendance_created = 0
+        attendance_failed = 0
+        attendance_profiles = {"high": 0, "medium": 0, "low": 0, "very_low": 0}
     
-    print("\nGenerating attendance data...")
-    for student in students:
-        student_id = student["id"]
-        attendance = generate_attendance_for_student(student_id)
+        print("\nGenerating attendance data...")
+        for student in students:
+            student_id = student["id"]
+            attendance = generate_attendance_for_student(student_id)
         
-        # Update counts for reporting
-        attendance_profiles[attendance["attendance_profile"]] += 1
+            # Update counts for reporting
+            attendance_profiles[attendance["attendance_profile"]] += 1
         
-        if DRY_RUN:
-            attendance_percentage = round((attendance["days_present"] / WORKING_DAYS) * 100, 1)
-            print(f"[DRY RUN] Would set attendance for student {student_id}: " +
-                  f"{attendance['days_present']}/{WORKING_DAYS} days ({attendance_percentage}%)")
-            attendance_created += 1
-        else:
-            success = post_attendance(attendance)
-            if success:
+            if DRY_RUN:
+                attendance_percentage = round((attendance["days_present"] / WORKING_DAYS) * 100, 1)
+                print(f"[DRY RUN] Would set attendance for student {student_id}: " +
+                      f"{attendance['days_present']}/{WORKING_DAYS} days ({attendance_percentage}%)")
                 attendance_created += 1
             else:
-                attendance_failed += 1
+                success = post_attendance(attendance)
+                if success:
+                    attendance_created += 1
+                else:
+                    attendance_failed += 1
     
     # Print summary
     print("\n===== SUMMARY =====")
@@ -1,4 +1,5 @@
 import requests
+import asyncio
 import random
 import json
 from datetime import datetime, timedelta
@@ -10,6 +11,11 @@ parser.add_argument('--count', type=int, default=150, help='Number of students t
 parser.add_argument('--api-url', type=str, default='http://localhost:8000', help='Base URL for the API')
 parser.add_argument('--auth-token', type=str, help='Authentication token (if needed)')
 parser.add_argument('--dry-run', action='store_true', help='Generate data without sending to API')
+parser.add_argument('--async', dest='async_mode', action='store_true',
+                    help='Send concurrently over a shared connection pool (needs httpx)')
+parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight in --async mode')
+parser.add_argument('--retries', type=int, default=3, help='Retries of failed requests in --async mode')
+parser.add_argument('--batch-size', type=int, default=200, help='Students per request when /students/bulk is available')
 args = parser.parse_args()
 
 # Configuration
@@ -18,6 +24,10 @@ STUDENT_ENDPOINT = f"{API_BASE_URL}/students"
 NUM_STUDENTS = args.count
 AUTH_TOKEN = args.auth_token
 DRY_RUN = args.dry_run
+ASYNC_MODE = args.async_mode
+CONCURRENCY = args.concurrency
+RETRIES = args.retries
+BATCH_SIZE = args.batch_size
 
 # Lists for generating random data
 first_names = [
@@ -170,6 +180,39 @@ def post_student(student_data):
         print(f"✗ Error creating student {student_data['name']}: {str(e)}")
         return False
 
+async def post_students_async(students):
+    """Create students over one connection pool, through /students/bulk when the server advertises it"""
+    from api_client import AsyncApiClient, chunked
+    
+    async with AsyncApiClient(API_BASE_URL, AUTH_TOKEN, concurrency=CONCURRENCY, retries=RETRIES) as client:
+        if await client.supports("post", "/students/bulk"):
+            async def create_batch(batch):
+                response = await client.request("POST", "/students/bulk", json={"students": batch})
+                if response.status_code != 200:
+                    print(f"\n✗ Failed to create {len(batch)} students: {response.status_code} - {response.text}")
+                    return 0, len(batch)
+                result = response.json()
+                for row in result["results"]:
+                    if row["status"] != "created":
+                        print(f"\n✗ Failed to create student {row['admission_number']}: {row['detail']}")
+                return result["created"], result["failed"]
+            
+            summary = await client.run_all(
+                chunked(students, BATCH_SIZE), create_batch, "Creating students (bulk)", total=len(students)
+            )
+        else:
+            async def create_one(student):
+                response = await client.request("POST", "/students/", json=student)
+                if response.status_code in [200, 201]:
+                    return 1, 0
+                print(f"\n✗ Failed to create student {student['name']}: {response.status_code} - {response.text}")
+                return 0, 1
+            
+            summary = await client.run_all(students, create_one, "Creating students")
+    
+    print(f"Sent in {summary['seconds']}s ({summary['rate']} students/s)")
+    return summary["done"] - summary["failed"], summary["failed"]
+
 if __name__ == "__main__":
     print(f"Generating {NUM_STUDENTS} students for GJC Vemulawada...")
     
@@ -180,6 +223,9 @@ if __name__ == "__main__":
     group_counts = {group: 0 for group in groups}
     medium_counts = {"english": 0, "telugu": 0}
     
+    # Students waiting to be sent concurrently in --async mode
+    pending_students = []
+    
     for student_index in range(NUM_STUDENTS):
         student = generate_student()
         
@@ -190,6 +236,8 @@ if __name__ == "__main__":
         if DRY_RUN:
             print(f"[DRY RUN] Would create: {student['name']} - {student['group']} - {student['medium']}")
             students_created += 1
+        elif ASYNC_MODE:
+            pending_students.append(student)
         else:
             success = post_student(student)
             if success:
@@ -197,6 +245,9 @@ if __name__ == "__main__":
             else:
                 students_failed += 1
     
+    if pending_students:
+        students_created, students_failed = asyncio.run(post_students_async(pending_students))
+    
     # Print summary
     print("\n===== SUMMARY =====")
     print(f"Total students generated: {NUM_STUDENTS}")
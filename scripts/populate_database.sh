@@ -9,6 +9,11 @@ ACADEMIC_YEAR="2024-2025"
 DRY_RUN=false
 MONTHS=("january" "february" "march" "april" "may" "june" "july" "august" "september" "october" "november" "december")
 AUTH_TOKEN=""
+SEED=1
+MONGO_URL=""
+DROP=false
+VIA_API=false
+ASYNC_PARAM=""
 
 # Working days per month (approximate) - simple variables instead of associative array
 WD_JANUARY=25
@@ -52,6 +57,28 @@ while [[ $# -gt 0 ]]; do
       shift
       shift
       ;;
+    --seed)
+      SEED="$2"
+      shift
+      shift
+      ;;
+    --mongo-url)
+      MONGO_URL="$2"
+      shift
+      shift
+      ;;
+    --drop)
+      DROP=true
+      shift
+      ;;
+    --via-api)
+      VIA_API=true
+      shift
+      ;;
+    --async)
+      ASYNC_PARAM="--async"
+      shift
+      ;;
     *)
       echo "Unknown option: $1"
       exit 1
@@ -105,7 +132,11 @@ get_working_days() {
 echo "=========================================================="
 echo "  GJC Vemulawada Database Population Script"
 echo "=========================================================="
-echo "API URL: $API_URL"
+if [ "$VIA_API" = true ]; then
+  echo "API URL: $API_URL"
+else
+  echo "Target: MongoDB (direct seeding, seed $SEED)"
+fi
 echo "Student Count: $STUDENT_COUNT"
 echo "Academic Year: $ACADEMIC_YEAR"
 if [ "$DRY_RUN" = true ]; then
@@ -115,6 +146,26 @@ else
 fi
 echo ""
 
+# By default the database is seeded directly, which takes seconds instead of
+# one HTTP call per student per month; --via-api goes through the API instead
+if [ "$VIA_API" = false ]; then
+  if [ "$DRY_RUN" = true ]; then
+    echo "Dry run: would seed $STUDENT_COUNT students with a year of attendance and all exams."
+    exit 0
+  fi
+  SEED_PARAMS="--count $STUDENT_COUNT --academic-year $ACADEMIC_YEAR --seed $SEED"
+  if [ -n "$MONGO_URL" ]; then
+    SEED_PARAMS="$SEED_PARAMS --mongo-url $MONGO_URL"
+  fi
+  if [ "$DROP" = true ]; then
+    SEED_PARAMS="$SEED_PARAMS --drop"
+  fi
+  python scripts/seed_database.py $SEED_PARAMS
+  echo ""
+  echo "Database population completed!"
+  exit 0
+fi
+
 # Make scripts executable
 chmod +x scripts/generate_students.py
 chmod +x scripts/generate_attendance.py
@@ -130,7 +181,7 @@ if [ "$DRY_RUN" = true ]; then
   DRY_RUN_PARAM="--dry-run"
 fi
 
-BASE_PARAMS="--api-url $API_URL $AUTH_PARAM $DRY_RUN_PARAM"
+BASE_PARAMS="--api-url $API_URL $AUTH_PARAM $DRY_RUN_PARAM $ASYNC_PARAM"
 
 echo "Step 1: Creating $STUDENT_COUNT students..."
 echo "=========================================================="
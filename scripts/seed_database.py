@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+from pymongo import MongoClient
+
+# The college is generated by the backend's benchmark module, so seeded data
+# and benchmark data are the same for a given seed and size
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.college import ACADEMIC_YEAR, seed_college  # noqa: E402
+from config.settings import (  # noqa: E402
+    MONGODB_URL, DATABASE_NAME, STUDENTS_COLLECTION, ATTENDANCE_COLLECTION, EXAMS_COLLECTION
+)
+
+# Configure the script with command-line arguments
+parser = argparse.ArgumentParser(
+    description='Seed students, working days, a year of attendance and every exam type straight into MongoDB'
+)
+parser.add_argument('--count', type=int, default=150, help='Number of students to generate')
+parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed and count give the same data')
+parser.add_argument('--academic-year', type=str, default=ACADEMIC_YEAR, help='Academic year of attendance')
+parser.add_argument('--mongo-url', type=str, default=MONGODB_URL, help='MongoDB connection string')
+parser.add_argument('--database', type=str, default=DATABASE_NAME, help='Database to seed')
+parser.add_argument('--chunk-size', type=int, default=2000, help='Documents per insert_many call')
+parser.add_argument('--workers', type=int, default=4, help='Parallel insert threads')
+parser.add_argument('--no-attendance', action='store_true', help='Skip the monthly attendance records')
+parser.add_argument('--no-exams', action='store_true', help='Skip the exam records')
+parser.add_argument('--drop', action='store_true',
+                    help='Delete existing students, attendance and exams first (required when students exist)')
+args = parser.parse_args()
+
+def report(name, count, seconds):
+    """Print the throughput of one kind of document"""
+    rate = count / seconds if seconds else float("inf")
+    print(f"✓ {name.replace('_', ' ').capitalize()}: {count} documents in {seconds:.1f}s ({rate:,.0f}/s)")
+
+if __name__ == "__main__":
+    # Only the host is printed; the connection string carries credentials
+    print(f"Seeding {args.count} students into {args.database} on {urlsplit(args.mongo_url).hostname}...")
+
+    client = MongoClient(args.mongo_url)
+    db = client[args.database]
+
+    if args.drop:
+        for name in (STUDENTS_COLLECTION, ATTENDANCE_COLLECTION, EXAMS_COLLECTION):
+            db[name].delete_many({})
+        print("✓ Existing students, attendance and exams deleted")
+    elif db[STUDENTS_COLLECTION].estimated_document_count():
+        print("✗ Students already exist; pass --drop to replace them (seeded ids and admission numbers are fixed)")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    counts = seed_college(
+        db, args.count, seed=args.seed, academic_year=args.academic_year, chunk_size=args.chunk_size,
+        workers=args.workers, attendance=not args.no_attendance, exams=not args.no_exams, report=report
+    )
+    elapsed = time.perf_counter() - started
+
+    # Print summary
+    total = sum(counts.values())
+    print("\n===== SUMMARY =====")
+    for name, count in counts.items():
+        print(f"  {name.replace('_', ' ').capitalize()}: {count}")
+    print(f"Total: {total} documents in {elapsed:.1f}s ({total / elapsed:,.0f}/s)")